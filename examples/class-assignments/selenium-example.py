@@ -86,6 +86,25 @@ def extract_video_urls(driver):
     return list(set(video_urls))
 
 
+def wait_for_article(driver, timeout=10):
+    """Wait until the article has rendered instead of sleeping a fixed time"""
+    start = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            EC.all_of(
+                lambda d: d.execute_script("return document.readyState") == "complete",
+                EC.presence_of_element_located((By.TAG_NAME, "h1")),
+                EC.presence_of_element_located((By.CLASS_NAME, "article-content")),
+            )
+        )
+        status = "ready"
+    except TimeoutException:
+        status = "timed out"
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ Article {status} after {elapsed:.2f}s")
+    return elapsed
+
+
 def download_mp4_video(url, filename):
     try:
         response = requests.get(url, stream=True, allow_redirects=True)
@@ -118,7 +137,7 @@ def crawl():
     print(f"Navigating to {url}")
     driver.get(url)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    time.sleep(3)
+    timings = {"page load": wait_for_article(driver)}
 
     print("Extracting video URLs...")
     video_urls = extract_video_urls(driver)
@@ -151,7 +170,11 @@ def crawl():
             download_mp4_video(video_url, video_filename)
     else:
         print("No MP4 videos found to download")
-    
+
+    print("\nWait timing report:")
+    for label, elapsed in timings.items():
+        print(f"  {label}: {elapsed:.2f}s")
+
     driver.quit()
 
 
@@ -1,54 +1,155 @@
 #!/usr/bin/env python3
 
-import boto3
+import argparse
+import os
 import sys
-from botocore.exceptions import ClientError
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+DELETE_BATCH = 1000  # most keys delete_objects accepts per call
+MAX_ATTEMPTS = 4
+# Per-key errors worth another try; anything else (e.g. AccessDenied) is final
+RETRYABLE_ERRORS = {'InternalError', 'ServiceUnavailable', 'SlowDown', 'RequestTimeout', 'ThrottlingException'}
+
+
+class Purge:
+    """Counters shared by the delete workers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listed = 0
+        self.deleted = 0
+        self.retried = 0
+        self.failed = []
+        self.start = time.perf_counter()
+
+    def add(self, deleted, failed, retried):
+        with self.lock:
+            self.deleted += deleted
+            self.failed.extend(failed)
+            self.retried += retried
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.deleted / elapsed if elapsed else 0
+
+
+def delete_batch(s3_client, bucket_name, keys, purge):
+    """
+    Deletes up to 1000 keys with one delete_objects call; keys that failed
+    with a transient error are tried again with backoff. A connection error
+    or timeout (BotoCoreError) fails the whole call, so all its keys are
+    tried again.
+    """
+    pending = keys
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(0.2 * 2 ** attempt)
+            purge.add(0, [], len(pending))
+        try:
+            response = s3_client.delete_objects(
+                Bucket=bucket_name,
+                # Quiet: the response only lists the keys that failed
+                Delete={'Objects': [{'Key': key} for key in pending], 'Quiet': True}
+            )
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            errors = [{'Key': key, 'Code': code, 'Message': str(e)} for key in pending]
+        except BotoCoreError as e:
+            errors = [{'Key': key, 'Code': type(e).__name__, 'Message': str(e), 'Retryable': True} for key in pending]
+        else:
+            errors = response.get('Errors', [])
+            purge.add(len(pending) - len(errors), [], 0)
+        retryable = [error.get('Retryable') or error.get('Code') in RETRYABLE_ERRORS for error in errors]
+        pending = [error['Key'] for error, retry in zip(errors, retryable) if retry]
+        purge.add(0, [error for error, retry in zip(errors, retryable) if not retry], 0)
+        if not pending:
+            return
+    message = f'still failing after {MAX_ATTEMPTS} attempts'
+    purge.add(0, [{'Key': key, 'Code': 'RetriesExhausted', 'Message': message} for key in pending], 0)
+
+
+def iter_keys(s3_client, bucket_name, prefix='', older_than=None, purge=None):
+    """Yields the keys under prefix (last modified before older_than, if given), page by page."""
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if older_than is None or obj['LastModified'] < older_than:
+                if purge:
+                    purge.listed += 1
+                yield obj['Key']
+
+
+def clear_s3_bucket(bucket_name='test-bucket', prefix='', older_than_days=None, workers=8):
+    """Clear all files (or those under a prefix / older than N days) from S3 bucket using LocalStack"""
+
+    description = f"s3://{bucket_name}/{prefix}"
+    if older_than_days is not None:
+        description += f" older than {older_than_days:g} days"
+    print(f"Clearing files from {description}...")
 
-def clear_s3_bucket():
-    """Clear all files from S3 bucket using LocalStack"""
-    
-    print("Clearing all files from S3 bucket...")
-    
     s3_client = boto3.client(
         's3',
-        endpoint_url='http://localhost:4566',
+        endpoint_url=os.getenv('S3_ENDPOINT', 'http://localhost:4566'),
         aws_access_key_id='test',
         aws_secret_access_key='test',
-        region_name='us-east-1'
+        region_name='us-east-1',
+        config=Config(max_pool_connections=workers, retries={'max_attempts': 3, 'mode': 'standard'})
     )
-    
-    bucket_name = 'test-bucket'
-    
+
+    older_than = None
+    if older_than_days is not None:
+        older_than = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    purge = Purge()
     try:
-        # List all objects in the bucket
-        response = s3_client.list_objects_v2(Bucket=bucket_name)
-        
-        if 'Contents' not in response:
-            print("✅ Bucket is already empty")
+        # Listing is sequential; batches of 1000 keys are deleted concurrently
+        # while the next pages are listed. At most 2 batches per worker wait,
+        # so memory stays flat however large the bucket is.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            batch = []
+            batches = 0
+            for key in iter_keys(s3_client, bucket_name, prefix, older_than, purge):
+                batch.append(key)
+                if len(batch) < DELETE_BATCH:
+                    continue
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                in_flight.add(executor.submit(delete_batch, s3_client, bucket_name, batch, purge))
+                batch = []
+                batches += 1
+                if batches % 10 == 0:
+                    print(f"  🗑️  {purge.deleted} deleted, {purge.listed} listed ({purge.rate():.0f} files/s)")
+            if batch:
+                in_flight.add(executor.submit(delete_batch, s3_client, bucket_name, batch, purge))
+            for future in in_flight:
+                future.result()
+
+        if not purge.listed:
+            print("✅ Nothing to delete")
             return
-        
-        # Delete all objects
-        objects_to_delete = [{'Key': obj['Key']} for obj in response['Contents']]
-        
-        if objects_to_delete:
-            delete_response = s3_client.delete_objects(
-                Bucket=bucket_name,
-                Delete={'Objects': objects_to_delete}
-            )
-            
-            deleted_count = len(delete_response.get('Deleted', []))
-            print(f"✅ Successfully deleted {deleted_count} files from s3://{bucket_name}")
-            
-            # List deleted files
-            for deleted in delete_response.get('Deleted', []):
-                print(f"  - Deleted: {deleted['Key']}")
-        
+
+        elapsed = time.perf_counter() - purge.start
+        print(f"✅ Successfully deleted {purge.deleted} files from {description}")
+        print(f"   {elapsed:.1f}s, {purge.rate():.0f} files/s ({purge.retried} retried deletes)")
+
         # Check for any deletion errors
-        if 'Errors' in delete_response:
-            print("❌ Some files failed to delete:")
-            for error in delete_response['Errors']:
-                print(f"  - {error['Key']}: {error['Message']}")
-                
+        if purge.failed:
+            print(f"❌ {len(purge.failed)} files failed to delete:")
+            for error in purge.failed[:20]:
+                print(f"  - {error['Key']}: {error.get('Message', error.get('Code'))}")
+            if len(purge.failed) > 20:
+                print(f"  ... and {len(purge.failed) - 20} more")
+            sys.exit(1)
+
     except ClientError as e:
         error_code = e.response['Error']['Code']
         if error_code == 'NoSuchBucket':
@@ -62,4 +163,10 @@ def clear_s3_bucket():
         sys.exit(1)
 
 if __name__ == "__main__":
-    clear_s3_bucket()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Delete files from the simulator's S3 bucket")
+    parser.add_argument('--bucket', default=os.getenv('S3_BUCKET', 'test-bucket'))
+    parser.add_argument('--prefix', default='', help='only delete keys under this prefix')
+    parser.add_argument('--older-than', type=float, metavar='DAYS', help='only delete files last modified more than DAYS ago')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent delete_objects calls')
+    args = parser.parse_args()
+    clear_s3_bucket(args.bucket, args.prefix, args.older_than, args.workers)
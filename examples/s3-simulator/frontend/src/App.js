@@ -78,9 +78,12 @@ function isGitHubUsername(filename) {
   return githubUsernamePattern.test(nameWithoutExt) && nameWithoutExt.length <= 39 && nameWithoutExt.length >= 1;
 }
 
+const PAGE_SIZE = 1000;
+
 function App() {
   const [files, setFiles] = useState([]);
   const [bucket, setBucket] = useState('');
+  const [hasMore, setHasMore] = useState(false);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
@@ -88,12 +91,14 @@ function App() {
     setLoading(true);
     setError('');
     try {
-      const response = await fetch('http://localhost:8080/files');
+      // Only the first page; large buckets hold far more files than a list can show
+      const response = await fetch(`http://localhost:8080/files?limit=${PAGE_SIZE}`);
       const data = await response.json();
       
       if (response.ok) {
         setFiles(data.files || []);
         setBucket(data.bucket || '');
+        setHasMore(Boolean(data.nextCursor));
       } else {
         setError(data.error || 'Failed to fetch files');
       }
@@ -129,7 +134,7 @@ function App() {
       <Container maxWidth="md" sx={{ mt: 4 }}>
         <HeaderBox>
           <Typography variant="h4" component="h1">
-            Files ({files.length})
+            Files ({files.length}{hasMore ? '+' : ''})
           </Typography>
           <IconButton 
             onClick={fetchFiles} 
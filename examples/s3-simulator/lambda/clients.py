@@ -0,0 +1,15 @@
+import os
+import sys
+
+# aws_clients.py and server.py live in examples/simulator-common; the Docker
+# image copies them next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'simulator-common'))
+from aws_clients import shared_client  # noqa: E402
+
+# Read once; the bucket doesn't change while the server runs
+S3_BUCKET = os.getenv('S3_BUCKET', 'test-bucket')
+
+
+def get_client(service='s3'):
+    """Returns the shared client for `service`, creating it on first use."""
+    return shared_client(service, 'S3_ENDPOINT')
@@ -1,46 +1,80 @@
-import boto3
+import base64
+import binascii
+import itertools
 import os
 import json
 import time
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote_plus, urlsplit
 from botocore.exceptions import ClientError
+from clients import S3_BUCKET, get_client
+# From examples/simulator-common, put on sys.path by clients
+from server import BoundedThreadingHTTPServer, KeepAliveHTTPHandler, serve
+
+# Records of one event are processed on a shared, bounded pool
+EVENT_WORKERS = int(os.getenv('S3_EVENT_WORKERS', 8))
+# Set S3_LOG_EVENTS=1 to print every incoming event in full
+LOG_EVENTS = os.getenv('S3_LOG_EVENTS', '0') == '1'
+
+_executor = ThreadPoolExecutor(max_workers=EVENT_WORKERS, thread_name_prefix='s3-event')
+
+
+def process_record(record):
+    """
+    Handles one S3 event record. Size and ETag come from the event itself;
+    head_object is only called for (hand-made) events that lack the size.
+    Returns True when the record was handled.
+    """
+    bucket_name = record['s3']['bucket']['name']
+    s3_object = record['s3']['object']
+    # Keys arrive URL-encoded in S3 events
+    object_key = unquote_plus(s3_object['key'])
+    event_name = record['eventName']
+
+    lines = [
+        "🎯 S3 Event Triggered!",
+        f"   Event: {event_name}",
+        f"   Bucket: {bucket_name}",
+        f"   File: {object_key}",
+    ]
+    ok = True
+    size = s3_object.get('size')
+    if size is None and not event_name.startswith('ObjectRemoved'):
+        # Get object details
+        try:
+            response = get_client('s3').head_object(Bucket=bucket_name, Key=object_key)
+            size = response['ContentLength']
+            lines.append(f"   Modified: {response['LastModified']}")
+        except ClientError as e:
+            lines.append(f"   Error getting object details: {e}")
+            ok = False
+    if size is not None:
+        lines.append(f"   Size: {size} bytes")
+    if s3_object.get('eTag'):
+        lines.append(f"   ETag: {s3_object['eTag']}")
+    lines.append("-" * 50)
+    # One print per record, so lines of concurrent records don't interleave
+    print("\n".join(lines))
+    return ok
+
 
 def lambda_handler(event, context=None):
     """AWS Lambda handler for S3 events"""
-    print(f"Received event: {json.dumps(event, indent=2)}")
-    
-    s3_client = boto3.client(
-        's3',
-        endpoint_url=os.getenv('S3_ENDPOINT', 'http://localstack:4566'),
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
-        region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-    )
-    
+    if LOG_EVENTS:
+        print(f"Received event: {json.dumps(event, indent=2)}")
+
     try:
         if 'Records' in event:
-            for record in event['Records']:
-                bucket_name = record['s3']['bucket']['name']
-                object_key = record['s3']['object']['key']
-                event_name = record['eventName']
-                
-                print(f"🎯 S3 Event Triggered!")
-                print(f"   Event: {event_name}")
-                print(f"   Bucket: {bucket_name}")
-                print(f"   File: {object_key}")
-                
-                # Get object details
-                try:
-                    response = s3_client.head_object(Bucket=bucket_name, Key=object_key)
-                    size = response['ContentLength']
-                    modified = response['LastModified']
-                    print(f"   Size: {size} bytes")
-                    print(f"   Modified: {modified}")
-                except ClientError as e:
-                    print(f"   Error getting object details: {e}")
-                
-                print("-" * 50)
+            records = event['Records']
+            start = time.perf_counter()
+            if len(records) == 1:
+                results = [process_record(records[0])]
+            else:
+                results = list(_executor.map(process_record, records))
+            failed = results.count(False)
+            print(f"✅ Processed {len(records)} records ({failed} failed) "
+                  f"in {(time.perf_counter() - start) * 1000:.0f}ms")
         else:
             print("No S3 records found in event")
             
@@ -56,61 +90,169 @@ def lambda_handler(event, context=None):
         'body': json.dumps('Lambda function executed successfully')
     }
 
-class LambdaHTTPHandler(BaseHTTPRequestHandler):
+LIST_PAGE_SIZE = 1000  # keys per list_objects_v2 call (the S3 maximum)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_listing(s3_client, bucket_name, prefix='', delimiter='', start_after=''):
+    """
+    Yields (key, object) for every object under `prefix`, and (prefix, None)
+    for every common prefix when a delimiter is given, in key order. Only
+    one page of the listing is held in memory at a time.
+    """
+    params = {'Bucket': bucket_name, 'Prefix': prefix, 'PaginationConfig': {'PageSize': LIST_PAGE_SIZE}}
+    if delimiter:
+        params['Delimiter'] = delimiter
+    if start_after:
+        params['StartAfter'] = start_after
+    for page in s3_client.get_paginator('list_objects_v2').paginate(**params):
+        entries = [(obj['Key'], obj) for obj in page.get('Contents', [])]
+        entries.extend((common['Prefix'], None) for common in page.get('CommonPrefixes', []))
+        entries.sort(key=lambda entry: entry[0])
+        for key, obj in entries:
+            # Resuming after a common prefix lists its keys again, rolled up
+            # into that same prefix
+            if key > start_after:
+                yield key, obj
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """The key a cursor continues after; '' for no cursor. Raises ValueError for junk."""
+    if not cursor:
+        return ''
+    try:
+        # Strict: urlsafe_b64decode would skip invalid characters and could
+        # turn junk into '' (listing from the start)
+        key = base64.b64decode(cursor.encode('ascii'), altchars=b'-_', validate=True).decode('utf-8')
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not key:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return key
+
+
+def listing_json(bucket_name, prefix, delimiter, entries, limit=0):
+    """
+    JSON text of the /files response, piece by piece. With a limit, at most
+    `limit` files and prefixes are listed and `nextCursor` continues the
+    listing after them (null once everything was listed).
+    """
+    yield f'{{"bucket": {json.dumps(bucket_name)}, "prefix": {json.dumps(prefix)}, "files": ['
+    count = 0
+    files = 0
+    last_key = None
+    more = False
+    prefixes = []  # one level of a delimiter listing; small next to the files
+    for key, obj in entries:
+        if limit and count >= limit:
+            more = True
+            break
+        count += 1
+        last_key = key
+        if obj is None:
+            prefixes.append(key)
+            continue
+        yield (', ' if files else '') + json.dumps({
+            'key': key,
+            'size': obj['Size'],
+            'lastModified': obj['LastModified'].isoformat(),
+            'etag': obj['ETag']
+        })
+        files += 1
+    next_cursor = encode_cursor(last_key) if more else None
+    yield (f'], "prefixes": {json.dumps(prefixes)}, "delimiter": {json.dumps(delimiter)}, '
+           f'"count": {count}, "nextCursor": {json.dumps(next_cursor)}}}')
+
+
+class LambdaHTTPHandler(KeepAliveHTTPHandler):
     """HTTP handler to simulate Lambda invocation"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
     
+    def _send_json_stream(self, status, pieces):
+        """
+        Sends JSON text produced piece by piece with chunked encoding, so the
+        body never has to fit in memory. Once the headers are out an error can
+        only be reported by cutting the response short.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        buffer = []
+        buffered = 0
+        try:
+            for piece in pieces:
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= STREAM_CHUNK_SIZE:
+                    self._write_chunk(''.join(buffer))
+                    buffer = []
+                    buffered = 0
+        except Exception as e:
+            print(f"Error while streaming response: {e}")
+            self.close_connection = True
+            return
+        if buffer:
+            self._write_chunk(''.join(buffer))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
     def do_GET(self):
         """Handle GET requests to list S3 files"""
         try:
-            if self.path == '/files':
-                s3_client = boto3.client(
-                    's3',
-                    endpoint_url=os.getenv('S3_ENDPOINT', 'http://localstack:4566'),
-                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
-                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
-                    region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-                )
-                
-                bucket_name = os.getenv('S3_BUCKET', 'test-bucket')
+            url = urlsplit(self.path)
+            if url.path == '/files':
+                query = parse_qs(url.query)
+                prefix = query.get('prefix', [''])[0]
+                delimiter = query.get('delimiter', [''])[0]
+                try:
+                    limit = int(query.get('limit', ['0'])[0])
+                    start_after = decode_cursor(query.get('cursor', [''])[0])
+                    if limit < 0:
+                        raise ValueError(f'Invalid limit: {limit}')
+                except ValueError:
+                    self._send_json(400, {'error': 'Invalid limit or cursor'})
+                    return
+                bucket_name = S3_BUCKET
                 
                 try:
-                    response = s3_client.list_objects_v2(Bucket=bucket_name)
-                    files = []
-                    
-                    if 'Contents' in response:
-                        for obj in response['Contents']:
-                            files.append({
-                                'key': obj['Key'],
-                                'size': obj['Size'],
-                                'lastModified': obj['LastModified'].isoformat(),
-                                'etag': obj['ETag']
-                            })
-                    
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
-                        'files': files,
-                        'bucket': bucket_name
-                    }).encode('utf-8'))
-                    
+                    entries = iter_listing(get_client('s3'), bucket_name, prefix, delimiter, start_after)
+                    # Fetch the first page before answering, so a missing
+                    # bucket still gets a proper error response
+                    first = next(entries, None)
                 except ClientError as e:
-                    self.send_response(404)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json(404, {'error': str(e)})
+                    return
+                if first is not None:
+                    entries = itertools.chain([first], entries)
+                self._send_json_stream(200, listing_json(bucket_name, prefix, delimiter, entries, limit))
             else:
-                self.send_response(404)
-                self.end_headers()
+                self._send_empty(404)
                 
         except Exception as e:
             print(f"Error handling GET request: {e}")
-            self.send_response(500)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+            self._send_json(500, {'error': str(e)})
     
     def do_POST(self):
         try:
@@ -123,18 +265,11 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
             
             response = lambda_handler(event)
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self._send_json(200, response)
             
         except Exception as e:
             print(f"Error handling request: {e}")
-            self.send_response(500)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+            self._send_json(500, {'error': str(e)})
     
     def do_OPTIONS(self):
         """Handle preflight CORS requests"""
@@ -142,6 +277,7 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def log_message(self, format, *args):
@@ -153,13 +289,9 @@ def main():
     port = int(os.getenv('LAMBDA_PORT', 8080))
     print(f"🚀 Lambda function server starting on port {port}...")
     
-    server = HTTPServer(('0.0.0.0', port), LambdaHTTPHandler)
-    
-    try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\nShutting down lambda function...")
-        server.shutdown()
+    server = BoundedThreadingHTTPServer(('0.0.0.0', port), LambdaHTTPHandler)
+    serve(server)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The Lambda modules import each other as top-level modules (lambda/ is the
+# function's root in the image)
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda")
+)
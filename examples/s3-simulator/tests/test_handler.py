@@ -0,0 +1,36 @@
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from handler import LambdaHTTPHandler, decode_cursor, encode_cursor
+from server import BoundedThreadingHTTPServer
+
+
+@pytest.mark.parametrize("key", ["prices/0084/PriceFull.gz", "מחירים/קובץ.gz", "a"])
+def test_cursor_round_trip(key):
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+def test_no_cursor_lists_from_the_start():
+    assert decode_cursor("") == ""
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "====", "abc", "a+b/", "cHJpY2Vz!"])
+def test_junk_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_junk_cursor_gets_400():
+    server = BoundedThreadingHTTPServer(("127.0.0.1", 0), LambdaHTTPHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"http://127.0.0.1:{server.server_port}/files?cursor=%25%25%25")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
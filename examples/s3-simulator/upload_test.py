@@ -1,7 +1,27 @@
 import boto3
+import hashlib
 import os
 import sys
-from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+# Price files run from a few KB to several hundred MB: small files go up in
+# one PUT, large ones in 16MB parts, several parts at a time
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True,
+)
+FILE_WORKERS = 8
+MAX_PARTS = 10000  # S3 limit; s3transfer doubles the chunk size to stay under it
+# Crawl leftovers that don't belong in the bucket
+SKIPPED_SUFFIXES = ('.part', '.part.json', '.tmp')
+SKIPPED_PREFIXES = ('crawl_manifest', '.')
 
 def upload_file_to_s3():
     """Upload ShakedZrihen.txt to S3 bucket using LocalStack"""
@@ -51,5 +71,125 @@ def upload_file_to_s3():
         print(f"Unexpected error: {e}")
         sys.exit(1)
 
+def create_bulk_client():
+    return boto3.client(
+        's3',
+        endpoint_url=os.getenv('S3_ENDPOINT', 'http://localhost:4566'),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
+        region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1'),
+        # Every file worker runs up to max_concurrency part uploads
+        config=Config(max_pool_connections=FILE_WORKERS * TRANSFER_CONFIG.max_concurrency),
+    )
+
+def local_etag(path, size, config=TRANSFER_CONFIG):
+    """
+    The ETag S3 gives the file when uploaded with `config`: the MD5 for a
+    single PUT, or the MD5 of the part MD5s plus "-<parts>" for a multipart
+    upload.
+    """
+    if size < config.multipart_threshold:
+        md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(block)
+        return f'"{md5.hexdigest()}"'
+
+    chunk_size = config.multipart_chunksize
+    while -(-size // chunk_size) > MAX_PARTS:
+        chunk_size *= 2
+    part_digests = []
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            part_digests.append(hashlib.md5(chunk).digest())
+    return f'"{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}"'
+
+def iter_upload_files(directory):
+    """Yields (path, key) for the files under directory; keys start with its name."""
+    base = os.path.dirname(os.path.abspath(directory))
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.endswith(SKIPPED_SUFFIXES) or name.startswith(SKIPPED_PREFIXES):
+                continue
+            path = os.path.join(root, name)
+            yield path, os.path.relpath(os.path.abspath(path), base).replace(os.sep, '/')
+
+def list_remote_objects(s3_client, bucket_name, prefix):
+    """Key -> (size, etag) of the objects already under prefix."""
+    remote = {}
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            remote[obj['Key']] = (obj['Size'], obj['ETag'])
+    return remote
+
+def upload_one(s3_client, bucket_name, path, key, remote):
+    """Returns ('uploaded' | 'skipped', bytes)."""
+    size = os.path.getsize(path)
+    existing = remote.get(key)
+    # Only hash files that could be unchanged
+    if existing and existing[0] == size and existing[1] == local_etag(path, size):
+        return 'skipped', size
+    s3_client.upload_file(path, bucket_name, key, Config=TRANSFER_CONFIG)
+    return 'uploaded', size
+
+def bulk_upload_to_s3(directory, bucket_name=None):
+    """Upload every file under a crawl output directory (e.g. prices/<branch>)"""
+    bucket_name = bucket_name or os.getenv('S3_BUCKET', 'test-bucket')
+    if not os.path.isdir(directory):
+        print(f"Error: Directory '{directory}' not found!")
+        sys.exit(1)
+
+    s3_client = create_bulk_client()
+    files = list(iter_upload_files(directory))
+    prefix = os.path.basename(os.path.abspath(directory)) + '/'
+    print(f"Uploading {len(files)} files from {directory} to s3://{bucket_name}/{prefix}...")
+
+    try:
+        remote = list_remote_objects(s3_client, bucket_name, prefix)
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchBucket':
+            print(f"Error: Bucket '{bucket_name}' does not exist!")
+            print("Make sure LocalStack services are running with: docker-compose up")
+        else:
+            print(f"Error listing bucket: {e}")
+        sys.exit(1)
+
+    counts = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+    uploaded_bytes = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+        futures = {
+            executor.submit(upload_one, s3_client, bucket_name, path, key, remote): key
+            for path, key in files
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                status, size = future.result()
+            except (ClientError, BotoCoreError, S3UploadFailedError, OSError) as e:
+                counts['failed'] += 1
+                print(f"  ❌ {key}: {e}")
+                continue
+            counts[status] += 1
+            if status == 'uploaded':
+                uploaded_bytes += size
+                print(f"  ⬆️  {key} ({size / 2**20:.1f}MB)")
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {counts['uploaded']} uploaded, {counts['skipped']} unchanged (skipped), "
+          f"{counts['failed']} failed in {elapsed:.1f}s")
+    if uploaded_bytes:
+        print(f"   {uploaded_bytes / 2**20:.1f}MB at {uploaded_bytes / 2**20 / elapsed:.1f} MB/s")
+    if counts['failed']:
+        sys.exit(1)
+
 if __name__ == "__main__":
-    upload_file_to_s3()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'bulk':
+        if len(sys.argv) < 3:
+            print("Usage: python upload_test.py bulk <directory> [bucket]")
+            print("  e.g. python upload_test.py bulk ../simple-crawler/prices/084")
+            sys.exit(1)
+        bulk_upload_to_s3(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        upload_file_to_s3()
\ No newline at end of file
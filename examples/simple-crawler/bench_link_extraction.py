@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of the download-link extraction modes on saved listing pages.
+
+    python bench_link_extraction.py --save listing.html   # save the live page
+    python bench_link_extraction.py listing.html ...       # benchmark saved pages
+    python bench_link_extraction.py                        # synthetic page
+
+The in-browser query (`links_from_driver`) is not timed here since it needs a
+running Chrome; it skips both `driver.page_source` and parsing entirely.
+"""
+import argparse
+import statistics
+import time
+
+from utils.listing import EXTRACTION_MODES, extract_download_links
+from utils.session import get_session
+from utils.synthetic import listing_page
+
+URL = "https://prices.mega.co.il/"
+DOWNLOAD_BASE_URL = "https://prices.carrefour.co.il/"
+
+
+def bench(html: str, repeats: int) -> dict:
+    results = {}
+    expected = None
+    for mode in EXTRACTION_MODES:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            links = extract_download_links(html, DOWNLOAD_BASE_URL, mode=mode)
+            timings.append(time.perf_counter() - start)
+        if expected is None:
+            expected = links
+        elif links != expected:
+            raise AssertionError(f"{mode} extracted different links")
+        results[mode] = {
+            "links": len(links),
+            "median_ms": statistics.median(timings) * 1000,
+            "min_ms": min(timings) * 1000,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="Saved listing pages (.html)")
+    parser.add_argument("--save", help="Save the live listing page to this path")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.save:
+        response = get_session().get(URL)
+        response.raise_for_status()
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"Saved {URL} to {args.save}")
+        return
+
+    pages = {}
+    for path in args.pages:
+        with open(path, "r", encoding="utf-8") as f:
+            pages[path] = f.read()
+    if not pages:
+        pages[f"synthetic ({args.rows} rows)"] = listing_page(args.rows)
+
+    for name, html in pages.items():
+        print(f"\n{name}: {len(html) / 1024:.0f} KiB")
+        results = bench(html, args.repeats)
+        baseline = results["soup"]["median_ms"]
+        for mode, result in results.items():
+            print(
+                f"  {mode:<9} {result['median_ms']:8.2f} ms median "
+                f"({result['min_ms']:.2f} min, {result['links']} links, "
+                f"{baseline / result['median_ms']:.1f}x vs soup)"
+            )
+
+
+if __name__ == "__main__":
+    main()
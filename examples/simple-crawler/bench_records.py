@@ -0,0 +1,75 @@
+"""
+Compares the compact price records of `utils/records.py` with the nested
+dicts of the JSON conversion, on a sample price file.
+
+    python bench_records.py [PriceFull.xml] [--items 200000]
+
+Without a file a synthetic PriceFull file with --items items is generated.
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from utils import _elem_to_dict
+from utils.records import load_records
+from utils.synthetic import write_price_full
+
+
+def load_dicts(path):
+    return _elem_to_dict(ET.parse(path).getroot())
+
+
+def measure(label, load, path):
+    gc.collect()
+    start = time.perf_counter()
+    result = load(path)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = load(path)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(
+        f"{label:<16} {elapsed:7.2f}s  retained {retained / 2**20:8.1f} MiB  "
+        f"peak {peak / 2**20:8.1f} MiB"
+    )
+    return {"seconds": elapsed, "retained": retained, "peak": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", help="Decompressed price XML file")
+    parser.add_argument("--items", type=int, default=200_000)
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix=".xml")
+        os.close(handle)
+        write_price_full(path, args.items)
+    print(f"{path}: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    try:
+        dicts = measure("nested dicts", load_dicts, path)
+        records = measure("compact records", load_records, path)
+    finally:
+        if args.path is None:
+            os.remove(path)
+
+    print(
+        f"compact records keep {dicts['retained'] / records['retained']:.1f}x less "
+        f"memory and load {dicts['seconds'] / records['seconds']:.1f}x as fast"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Reproducible parse/download benchmarks on synthetic PriceFull/PromoFull files.
+
+    python bench_suite.py                          # 10K and 100K items
+    python bench_suite.py --sizes 10000 5000000 --repeats 3
+    python bench_suite.py --cases json_stream records --fail-on-regression
+
+Every case runs in a fresh process, so its peak RSS is its own. Results are
+appended to bench_history.jsonl and compared with the previous runs of the
+same case and size; a slowdown beyond --threshold is reported as a regression.
+
+Inputs go to --data-dir (BENCH_DATA_DIR) and results to --history
+(BENCH_HISTORY); both default to git-ignored paths next to this script.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+
+from utils import convert_xml_to_json, download_and_convert, extract_and_delete_gz
+from utils.listing import extract_download_links
+from utils.records import load_records
+from utils.session import configure_session
+from utils.synthetic import listing_page, write_price_full, write_promo_full
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, "prices", "bench-data")
+HISTORY_PATH = os.environ.get(
+    "BENCH_HISTORY", os.path.join(BENCH_DIR, "bench_history.jsonl")
+)
+DEFAULT_SIZES = (10_000, 100_000)
+LISTING_ROWS = 500
+ITEMS_PER_PROMOTION = 5
+
+
+def data_dir() -> str:
+    # Read on every call: spawned case processes inherit it via the environment
+    return os.environ.get("BENCH_DATA_DIR", DEFAULT_DATA_DIR)
+
+
+def sample_path(kind: str, items: int, gz: bool) -> str:
+    """Generates (once) and returns a synthetic file with `items` item codes."""
+    name = f"{'PriceFull' if kind == 'price' else 'PromoFull'}-{items}.xml"
+    path = os.path.join(data_dir(), name + (".gz" if gz else ""))
+    if not os.path.exists(path):
+        os.makedirs(data_dir(), exist_ok=True)
+        print(f"Generating {path}...")
+        tmp_path = f"{path}.{os.getpid()}.tmp{'.gz' if gz else ''}"
+        if kind == "price":
+            write_price_full(tmp_path, items)
+        else:
+            write_promo_full(
+                tmp_path, items // ITEMS_PER_PROMOTION, ITEMS_PER_PROMOTION
+            )
+        os.replace(tmp_path, path)
+    return path
+
+
+class _Case(ABC):
+    """
+    A benchmark case: prepare() returns the input size in bytes and a run
+    callable; untimed setup that has to happen before each run (e.g. copying
+    an input that run deletes) goes in before_each.
+    """
+
+    min_repeats = 1
+
+    def __init__(self, kind=None, sized=True):
+        self.kind = kind
+        self.sized = sized
+
+    @abstractmethod
+    def prepare(self, items, workdir):
+        """Returns (input bytes, run callable) for a sample of `items` items."""
+
+    def before_each(self):
+        pass
+
+
+class Gunzip(_Case):
+    def prepare(self, items, workdir):
+        self.source = sample_path(self.kind, items, gz=True)
+        self.target = os.path.join(workdir, os.path.basename(self.source))
+        return os.path.getsize(self.source), lambda: extract_and_delete_gz(self.target)
+
+    def before_each(self):
+        shutil.copyfile(self.source, self.target)
+
+
+class ConvertJson(_Case):
+    def __init__(self, kind, streaming, workers=1):
+        super().__init__(kind)
+        self.streaming = streaming
+        self.workers = workers
+
+    def prepare(self, items, workdir):
+        xml_path = os.path.join(workdir, "sample")
+        shutil.copyfile(sample_path(self.kind, items, gz=False), xml_path)
+        run = partial(
+            convert_xml_to_json,
+            xml_path,
+            streaming=self.streaming,
+            overwrite=True,
+            workers=self.workers or os.cpu_count(),
+        )
+        return os.path.getsize(xml_path), run
+
+
+class LoadRecords(_Case):
+    def prepare(self, items, workdir):
+        xml_path = sample_path(self.kind, items, gz=False)
+        return os.path.getsize(xml_path), partial(load_records, xml_path)
+
+
+class ExtractLinks(_Case):
+    min_repeats = 50  # a single page parses in milliseconds
+
+    def __init__(self):
+        super().__init__(sized=False)
+
+    def prepare(self, items, workdir):
+        html = listing_page(LISTING_ROWS)
+        run = partial(extract_download_links, html, "https://prices.example/")
+        return len(html.encode("utf-8")), run
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class FusedDownload(_Case):
+    """Download + gunzip + JSON conversion from a local HTTP server."""
+
+    def prepare(self, items, workdir):
+        source = sample_path(self.kind, items, gz=True)
+        handler = partial(_QuietHandler, directory=os.path.dirname(source))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        configure_session()
+        link = f"http://127.0.0.1:{server.server_port}/{os.path.basename(source)}"
+        self.output = os.path.join(workdir, os.path.basename(source)[:-3] + ".json")
+        return os.path.getsize(source), partial(download_and_convert, link, workdir)
+
+    def before_each(self):
+        if os.path.exists(self.output):
+            os.remove(self.output)
+
+
+CASES = {
+    "gunzip": Gunzip("price"),
+    "json_stream": ConvertJson("price", streaming=True),
+    "json_memory": ConvertJson("price", streaming=False),
+    "json_stream_promo": ConvertJson("promo", streaming=True),
+    "json_sharded": ConvertJson("price", streaming=True, workers=None),  # all cores
+    "records": LoadRecords("price"),
+    "download_fused": FusedDownload("price"),
+    "links": ExtractLinks(),
+}
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM starts fresh with the worker's exec; ru_maxrss can carry over the
+    # parent's peak from the fork
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _run_case(name, items, repeats):
+    """Runs in a fresh worker process."""
+    case = CASES[name]
+    workdir = os.path.join(data_dir(), f"run-{os.getpid()}")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            input_bytes, run = case.prepare(items, workdir)
+            latencies = []
+            for _ in range(max(repeats, case.min_repeats)):
+                case.before_each()
+                start = time.perf_counter()
+                run()
+                latencies.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"input_bytes": input_bytes, "latencies": latencies, "rss": _peak_rss_mb()}
+
+
+def _percentile(values, q):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def summarize(raw, items) -> dict:
+    latencies = raw["latencies"]
+    p50 = statistics.median(latencies)
+    result = {
+        "p50_s": p50,
+        "p90_s": _percentile(latencies, 90),
+        "p99_s": _percentile(latencies, 99),
+        "mb_per_s": raw["input_bytes"] / 2**20 / p50,
+        "peak_rss_mb": raw["rss"],
+        "input_mb": raw["input_bytes"] / 2**20,
+        "runs": len(latencies),
+    }
+    if items:
+        result["items_per_s"] = items / p50
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=BENCH_DIR,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(history, results, threshold, window=5):
+    """
+    Compares each p50 with the median p50 of the same case and size over the
+    last `window` runs on this machine.
+    """
+    machine = platform.node()
+    regressions = []
+    for key, result in results.items():
+        previous = [
+            run["results"][key]["p50_s"]
+            for run in history
+            if run.get("machine") == machine and key in run["results"]
+        ][-window:]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        change = result["p50_s"] / baseline - 1
+        result["vs_baseline"] = change
+        if change > threshold:
+            regressions.append((key, baseline, result["p50_s"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--data-dir", default=data_dir())
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    os.environ["BENCH_DATA_DIR"] = args.data_dir
+
+    runs = []
+    for name in args.cases:
+        if CASES[name].sized:
+            runs.extend((name, items) for items in args.sizes)
+        else:
+            runs.append((name, None))
+
+    results = {}
+    context = get_context("spawn")
+    for name, items in runs:
+        key = name if items is None else f"{name}@{items}"
+        # Generate inputs up front so their cost stays out of the measurements
+        if items and CASES[name].kind:
+            sample_path(CASES[name].kind, items, gz=True)
+            sample_path(CASES[name].kind, items, gz=False)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            raw = executor.submit(_run_case, name, items, args.repeats).result()
+        results[key] = summarize(raw, items)
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, results, args.threshold)
+
+    print(f"\n{'='*96}")
+    print(
+        f"{'case':<28} {'p50':>8} {'p90':>8} {'p99':>8} {'MB/s':>8} "
+        f"{'items/s':>11} {'peak RSS':>10} {'vs hist':>8}"
+    )
+    print(f"{'='*96}")
+    for key, r in results.items():
+        items_per_s = f"{r['items_per_s']:>11,.0f}" if "items_per_s" in r else " " * 11
+        change = f"{r['vs_baseline']:+8.0%}" if "vs_baseline" in r else " " * 8
+        print(
+            f"{key:<28} {r['p50_s']:8.3f} {r['p90_s']:8.3f} {r['p99_s']:8.3f} "
+            f"{r['mb_per_s']:8.1f} {items_per_s} {r['peak_rss_mb']:8.0f}MB {change}"
+        )
+
+    for key, baseline, p50, change in regressions:
+        slowdown = f"{baseline:.3f}s -> {p50:.3f}s ({change:+.0%})"
+        print(f"⚠️ Regression in {key}: {slowdown}")
+
+    if not args.no_save:
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "repeats": args.repeats,
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"\nResults appended to {args.history}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
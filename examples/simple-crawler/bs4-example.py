@@ -1,8 +1,8 @@
 import os
-import requests
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from utils import download_file_from_link, extract_and_delete_gz, convert_xml_to_json
+from utils.listing import extract_download_links
+from utils.manifest import CrawlManifest, Unchanged
+from utils.session import get_session
 
 
 def crawl():
@@ -10,31 +10,44 @@ def crawl():
     download_base_url = "https://prices.carrefour.co.il/" # this sometimes changes so if it failed take a look at the page and update the url
     headers = {"User-Agent": "Mozilla/5.0"}
 
-    response = requests.get(url, headers=headers)
+    session = get_session()
+    response = session.get(url, headers=headers)
     if response.status_code != 200:
         print(f"Failed to fetch page. Status code: {response.status_code}")
         return
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    price_tags = soup.find_all("a", class_="downloadBtn")
-    
+    download_links = extract_download_links(response.text, download_base_url)
+
     output_dir = "prices"
     os.makedirs(output_dir, exist_ok=True)
+    manifest = CrawlManifest()
+
+    if not download_links:
+        print("Download link not found.")
 
-    for a_tag in price_tags:
-        if a_tag and a_tag.has_attr("href"):
-            href = a_tag["href"]
-            link = urljoin(download_base_url, href)
-            print(f"Downloading {link}...")
-            output_path = download_file_from_link(link, output_dir)
-            print(f"Output path: {output_path}")
-            if output_path:
-                print(f"Extracting {output_path}...")
-                output_path = extract_and_delete_gz(output_path)
-                if output_path:
-                    convert_xml_to_json(output_path)
+    for link in download_links:
+        print(f"Downloading {link}...")
+        output_path = download_file_from_link(link, output_dir, session, manifest)
+        if isinstance(output_path, Unchanged):
+            continue
+        print(f"Output path: {output_path}")
+        if not output_path:
+            continue
+        json_path = None
+        try:
+            print(f"Extracting {output_path}...")
+            xml_path = extract_and_delete_gz(output_path)
+            if xml_path:
+                json_path = convert_xml_to_json(xml_path, overwrite=True)
+        except Exception as e:
+            print(f"❌ Error processing {output_path}: {e}")
+        # Only a converted file is recorded, so a failed one is fetched again
+        if json_path:
+            manifest.commit(link, json_path)
         else:
-            print("Download link not found.")
+            manifest.discard(link)
+
+    session.print_stats()
 
 
 if __name__ == "__main__":
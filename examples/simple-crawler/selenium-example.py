@@ -1,24 +1,50 @@
 import os
-import time
+import sys
 import platform
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+import requests
+from contextlib import ExitStack
+from functools import partial
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
-from utils import (
-    convert_xml_to_json,
-    download_file_from_link,
-    extract_and_delete_gz,
+from utils.listing import (
+    HttpListing,
+    ListingError,
+    extract_download_links,
+    links_from_driver,
 )
+from utils.manifest import CrawlManifest
+from utils.scheduler import CrawlJob, run_jobs
+from utils.pipeline import CrawlPipeline
+from utils.session import get_session
+from utils.startup import (
+    ProfileDirs,
+    WarmDriver,
+    cached_driver_path,
+    cold_launch,
+    get_startup_report,
+)
+from utils.waits import WaitTimer, listing_snapshot
+
+
+# Price sites to crawl; "download_base_url" sometimes changes, so if downloads
+# fail take a look at the page and update it
+CHAINS = {
+    "carrefour": {
+        "url": "https://prices.mega.co.il/",
+        "download_base_url": "https://prices.carrefour.co.il/",
+    },
+}
 
+CATEGORIES = {"pricefull": "PriceFull", "promofull": "PromoFull"}
 
-def init_chrome_options():
+
+def init_chrome_options(profile_dir=None):
     chrome_options = Options()
 
     # Set up headless Chrome
@@ -28,11 +54,24 @@ def init_chrome_options():
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--disable-dev-shm-usage")
 
+    # Reuse a profile (and its HTTP cache) across runs for faster warm starts
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        chrome_options.add_argument("--disk-cache-size=104857600")
+
     return chrome_options
 
 
 def get_chromedriver_path():
-    """Get the correct chromedriver path for the current system"""
+    """
+    Get the correct chromedriver path for the current system. The resolved
+    path is cached locally and only re-checked with webdriver-manager once a
+    day (see utils/startup.py).
+    """
+    return cached_driver_path(resolve_chromedriver_path)
+
+
+def resolve_chromedriver_path():
     try:
         # For macOS ARM64, we need to specify the architecture
         if platform.system() == "Darwin" and platform.machine() == "arm64":
@@ -53,6 +92,42 @@ def get_chromedriver_path():
         return "chromedriver"
 
 
+def create_driver(profile_dir=None):
+    """Start a headless Chrome driver, optionally on a reusable profile"""
+    chrome_options = init_chrome_options(profile_dir)
+
+    # Automatically download and manage Chrome driver
+    print("Setting up Chrome driver...")
+    try:
+        chromedriver_path = get_chromedriver_path()
+        service = Service(chromedriver_path)
+        return webdriver.Chrome(service=service, options=chrome_options)
+    except Exception as e:
+        print(f"Failed to initialize Chrome driver: {e}")
+        print("Trying alternative approach...")
+        # Alternative approach without service
+        return webdriver.Chrome(options=chrome_options)
+
+
+def open_branch(driver, url, branch, waits):
+    """Load the price site, select a branch and return its display name"""
+    print(f"Navigating to {url}")
+    driver.get(url)
+    waits.page_loaded("initial page load", (By.ID, "branch_filter"))
+
+    print(f"Selecting branch {branch}...")
+    select = Select(driver.find_element("id", "branch_filter"))
+    previous_listing = listing_snapshot(driver)
+    select.select_by_value(branch)
+    branch_name = select.first_selected_option.text.strip()
+    print(f"Selected branch: {branch_name}")
+
+    # Wait for the download table to show the branch's files
+    print("Waiting for page to update...")
+    waits.listing_updated(f"branch {branch} filter", previous_listing)
+    return branch_name
+
+
 def find_pagination_elements(driver):
     """Find pagination elements to determine total pages"""
     try:
@@ -122,23 +197,37 @@ def get_next_page_button(driver, current_page):
 
 def get_download_links_from_page(driver, download_base_url):
     """Extract download links from the current page"""
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    price_tags = soup.find_all("a", class_="downloadBtn")
-
-    download_links = []
-    for a_tag in price_tags:
-        if a_tag and a_tag.has_attr("href"):
-            href = a_tag["href"]
-            link = urljoin(download_base_url, href)
-            download_links.append(link)
-
-    return download_links
+    try:
+        # Only the hrefs leave the browser, not the whole page source
+        return links_from_driver(driver, download_base_url)
+    except WebDriverException as e:
+        print(f"In-browser link query failed ({e}), parsing page source...")
+        return extract_download_links(driver.page_source, download_base_url)
 
 
 def crawl_category(
-    driver, category_value, category_name, download_base_url, max_pages, branch_name
+    driver,
+    category_value,
+    category_name,
+    download_base_url,
+    max_pages,
+    branch_name,
+    download_workers=8,
+    parse_workers=None,
+    per_host_limit=4,
+    fused=True,
+    manifest=None,
+    output_format="json",
+    waits=None,
+    limiter=None,
+    pipeline=None,
 ):
-    """Crawl a specific category and return statistics"""
+    """
+    Crawl a specific category and return statistics. Pass a running
+    CrawlPipeline to share its pools with other categories; otherwise one is
+    started for this category (from the download/parse arguments).
+    """
+    waits = waits or WaitTimer(driver)
     print(f"\n{'='*60}")
     print(f"STARTING CRAWL FOR CATEGORY: {category_name}")
     print(f"{'='*60}")
@@ -147,12 +236,13 @@ def crawl_category(
     print(f"Selecting category filter: {category_name}...")
     try:
         category_select = Select(driver.find_element("id", "cat_filter"))
+        previous_listing = listing_snapshot(driver)
         category_select.select_by_value(category_value)
         print(f"Selected category: {category_name}")
 
-        # Wait for page to update after category selection
+        # Wait for the download table to show the category's files
         print("Waiting for page to update after category selection...")
-        time.sleep(3)
+        waits.listing_updated(f"{category_name} filter", previous_listing)
     except Exception as e:
         print(f"Error selecting category filter: {e}")
         print("Continuing without category filter...")
@@ -163,67 +253,78 @@ def crawl_category(
 
     total_successful = 0
     total_failed = 0
+    total_skipped = 0
     page_num = 1
+    batches = []
+
+    with ExitStack() as stack:
+        if pipeline is None:
+            pipeline = stack.enter_context(
+                CrawlPipeline(
+                    download_workers=download_workers,
+                    parse_workers=parse_workers,
+                    per_host_limit=per_host_limit,
+                    fused=fused,
+                    output_format=output_format,
+                    limiter=limiter,
+                )
+            )
 
-    while page_num <= max_pages:
-        print(f"\n{'-'*40}")
-        print(f"Processing Page {page_num} - {category_name}")
-        print(f"{'-'*40}")
+        while page_num <= max_pages:
+            print(f"\n{'-'*40}")
+            print(f"Processing Page {page_num} - {category_name}")
+            print(f"{'-'*40}")
 
-        # Get download links from current page
-        download_links = get_download_links_from_page(driver, download_base_url)
-        print(f"Found {len(download_links)} download links on page {page_num}")
+            # Get download links from current page
+            download_links = get_download_links_from_page(driver, download_base_url)
+            print(f"Found {len(download_links)} download links on page {page_num}")
 
-        if not download_links:
-            print(f"No download links found on page {page_num}. Stopping.")
-            break
+            if not download_links:
+                print(f"No download links found on page {page_num}. Stopping.")
+                break
 
-        # Download files from current page using existing utils functions
-        for i, link in enumerate(download_links, 1):
-            print(f"[{i}/{len(download_links)}] Downloading {link}...")
-            output_path = download_file_from_link(link, output_dir)
-            print(f"Output path: {output_path}")
+            # Download and parse the page's files in the background while the
+            # next page is listed. In fused mode each response is streamed
+            # straight into JSON without temporary files.
+            batches.append(pipeline.submit(download_links, output_dir, manifest))
 
-            if output_path:
-                try:
-                    print(f"Extracting {output_path}...")
-                    output_path = extract_and_delete_gz(output_path)
-                    if output_path:
-                        convert_xml_to_json(output_path)
-                        total_successful += 1
-                        print(f"✅ Successfully processed: {output_path}")
-                except Exception as e:
-                    print(f"❌ Error processing {output_path}: {e}")
-                    total_failed += 1
-            else:
-                total_failed += 1
-                print(f"❌ Failed to download: {link}")
+            print(f"Page {page_num} summary: {len(download_links)} files queued")
 
-        print(f"Page {page_num} summary: {len(download_links)} files processed")
+            # Try to navigate to next page
+            if page_num < max_pages:
+                try:
+                    print(f"Looking for next page button (page {page_num + 1})...")
+                    next_button = get_next_page_button(driver, page_num)
+
+                    if next_button and next_button.is_enabled():
+                        print(
+                            "Found next page button. "
+                            f"Clicking to navigate to page {page_num + 1}..."
+                        )
+                        previous_listing = listing_snapshot(driver)
+                        next_button.click()
+                        waits.listing_updated(
+                            f"{category_name} page {page_num + 1}",
+                            previous_listing,
+                            page_num + 1,
+                        )
+                        page_num += 1
+                    else:
+                        print("No next page button found or it's disabled. Stopping.")
+                        break
 
-        # Try to navigate to next page
-        if page_num < max_pages:
-            try:
-                print(f"Looking for next page button (page {page_num + 1})...")
-                next_button = get_next_page_button(driver, page_num)
-
-                if next_button and next_button.is_enabled():
-                    print(
-                        f"Found next page button. Clicking to navigate to page {page_num + 1}..."
-                    )
-                    next_button.click()
-                    time.sleep(3)  # Wait for page to load
-                    page_num += 1
-                else:
-                    print("No next page button found or it's disabled. Stopping.")
+                except Exception as e:
+                    print(f"Error navigating to next page: {e}")
                     break
-
-            except Exception as e:
-                print(f"Error navigating to next page: {e}")
+            else:
+                print(f"Reached maximum page limit ({max_pages}). Stopping.")
                 break
-        else:
-            print(f"Reached maximum page limit ({max_pages}). Stopping.")
-            break
+
+        for batch in batches:
+            successful, failed, skipped = batch.result()
+            total_successful += successful
+            total_failed += failed
+            total_skipped += skipped
 
     print(f"\n{'-'*40}")
     print(f"CATEGORY {category_name} COMPLETE")
@@ -231,6 +332,7 @@ def crawl_category(
     print(f"Total pages processed: {page_num}")
     print(f"Total successful downloads: {total_successful}")
     print(f"Total failed downloads: {total_failed}")
+    print(f"Total unchanged (skipped): {total_skipped}")
     print(f"Output directory: {output_dir}")
 
     return {
@@ -238,89 +340,350 @@ def crawl_category(
         "pages_processed": page_num,
         "successful_downloads": total_successful,
         "failed_downloads": total_failed,
+        "skipped_unchanged": total_skipped,
         "output_dir": output_dir,
     }
 
 
-def crawl():
-    url = "https://prices.mega.co.il/"
-    download_base_url = "https://prices.carrefour.co.il/"  # this sometimes changes so if it failed take a look at the page and update the url
-    max_pages = 2
+def crawl_category_http(
+    listing,
+    category_value,
+    category_name,
+    branch,
+    branch_name,
+    max_pages,
+    download_workers=8,
+    parse_workers=None,
+    per_host_limit=4,
+    fused=True,
+    manifest=None,
+    output_format="json",
+    pipeline=None,
+):
+    """
+    Crawl a category through direct listing requests, without a browser.
+    Like crawl_category, starts its own CrawlPipeline unless one is passed.
+    """
+    print(f"\n{'='*60}")
+    print(f"STARTING HTTP CRAWL FOR CATEGORY: {category_name}")
+    print(f"{'='*60}")
 
-    chrome_options = init_chrome_options()
+    output_dir = os.path.join("prices", branch_name)
+    os.makedirs(output_dir, exist_ok=True)
 
-    # Automatically download and manage Chrome driver
-    print("Setting up Chrome driver...")
-    try:
-        chromedriver_path = get_chromedriver_path()
-        service = Service(chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        print(f"Failed to initialize Chrome driver: {e}")
-        print("Trying alternative approach...")
-        # Alternative approach without service
-        driver = webdriver.Chrome(options=chrome_options)
+    total_successful = 0
+    total_failed = 0
+    total_skipped = 0
+    pages_processed = 0
+    batches = []
+
+    with ExitStack() as stack:
+        if pipeline is None:
+            pipeline = stack.enter_context(
+                CrawlPipeline(
+                    download_workers=download_workers,
+                    parse_workers=parse_workers,
+                    per_host_limit=per_host_limit,
+                    fused=fused,
+                    output_format=output_format,
+                )
+            )
 
-    try:
-        print(f"Navigating to {url}")
-        driver.get(url)
-
-        # Select branch with value "0084"
-        print("Selecting branch...")
-        select = Select(driver.find_element("id", "branch_filter"))
-        select.select_by_value("0084")
-        branch_name = select.first_selected_option.text.strip()
-        print(f"Selected branch: {branch_name}")
-
-        # Wait for page to update
-        print("Waiting for page to update...")
-        time.sleep(3)
-
-        # Define categories to crawl
-        categories = [
-            {"value": "pricefull", "name": "PriceFull"},
-            {"value": "promofull", "name": "PromoFull"},
-        ]
+        for download_links in listing.pages(branch, category_value, max_pages):
+            pages_processed += 1
+            print(f"Found {len(download_links)} links on page {pages_processed}")
+            batches.append(pipeline.submit(download_links, output_dir, manifest))
 
-        all_results = []
+        for batch in batches:
+            successful, failed, skipped = batch.result()
+            total_successful += successful
+            total_failed += failed
+            total_skipped += skipped
 
-        # Crawl each category
-        for category in categories:
-            result = crawl_category(
-                driver=driver,
+    print(f"CATEGORY {category_name} COMPLETE: {pages_processed} pages")
+
+    return {
+        "category": category_name,
+        "pages_processed": pages_processed,
+        "successful_downloads": total_successful,
+        "failed_downloads": total_failed,
+        "skipped_unchanged": total_skipped,
+        "output_dir": output_dir,
+    }
+
+
+def crawl_http(
+    url, download_base_url, branch, categories, max_pages, manifest, pipeline=None
+):
+    """
+    Crawl the categories of a branch without starting Chrome. Returns the
+    results of the categories crawled this way and the categories the
+    listing couldn't be used for, so the caller can fall back to Selenium
+    for just those.
+    """
+    listing = HttpListing(url, download_base_url)
+    try:
+        branch_name = listing.branch_names().get(branch)
+    except requests.RequestException as e:
+        print(f"HTTP listing failed: {e}")
+        return [], list(categories)
+    if not branch_name:
+        print(f"Branch {branch} not found in the static listing")
+        return [], list(categories)
+
+    results = []
+    fallback = []
+    for category in categories:
+        try:
+            result = crawl_category_http(
+                listing,
                 category_value=category["value"],
                 category_name=category["name"],
-                download_base_url=download_base_url,
-                max_pages=max_pages,
+                branch=branch,
                 branch_name=branch_name,
+                max_pages=max_pages,
+                manifest=manifest,
+                pipeline=pipeline,
             )
-            all_results.append(result)
+        except (ListingError, requests.RequestException) as e:
+            print(f"HTTP listing failed for {category['name']}: {e}")
+            fallback.append(category)
+            continue
+        if not result["pages_processed"]:
+            print(f"No {category['name']} download links in the static listing")
+            fallback.append(category)
+            continue
+        results.append(result)
+    return results, fallback
+
+
+def print_summary(all_results):
+    print(f"\n{'='*60}")
+    print(f"FINAL CRAWLING SUMMARY")
+    print(f"{'='*60}")
+
+    total_successful = sum(r["successful_downloads"] for r in all_results)
+    total_failed = sum(r["failed_downloads"] for r in all_results)
+    total_skipped = sum(r["skipped_unchanged"] for r in all_results)
+    total_pages = sum(r["pages_processed"] for r in all_results)
+
+    for result in all_results:
+        print(
+            f"{result['category']}: "
+            f"{result['successful_downloads']} successful, "
+            f"{result['failed_downloads']} failed, "
+            f"{result['skipped_unchanged']} unchanged, "
+            f"{result['pages_processed']} pages"
+        )
 
-        # Print final summary
-        print(f"\n{'='*60}")
-        print(f"FINAL CRAWLING SUMMARY")
-        print(f"{'='*60}")
+    print(
+        f"\nTOTAL: {total_successful} successful, {total_failed} failed, "
+        f"{total_skipped} unchanged, {total_pages} pages processed"
+    )
+    print(f"Categories processed: {len(all_results)}")
+    get_session().print_stats()
 
-        total_successful = sum(r["successful_downloads"] for r in all_results)
-        total_failed = sum(r["failed_downloads"] for r in all_results)
-        total_pages = sum(r["pages_processed"] for r in all_results)
 
-        for result in all_results:
-            print(
-                f"{result['category']}: {result['successful_downloads']} successful, {result['failed_downloads']} failed, {result['pages_processed']} pages"
+def crawl(use_browser=False, warm=False):
+    url = "https://prices.mega.co.il/"
+    # This sometimes changes, so if downloads fail take a look at the page and
+    # update the url
+    download_base_url = "https://prices.carrefour.co.il/"
+    max_pages = 2
+    branch = "0084"
+
+    # Define categories to crawl
+    categories = [
+        {"value": "pricefull", "name": "PriceFull"},
+        {"value": "promofull", "name": "PromoFull"},
+    ]
+    manifest = CrawlManifest()
+
+    # One set of download and parse pools for every page of every category
+    with CrawlPipeline(fused=True) as pipeline:
+        if not use_browser:
+            print("Listing files over HTTP (no browser)...")
+            http_results, categories = crawl_http(
+                url,
+                download_base_url,
+                branch,
+                categories,
+                max_pages,
+                manifest,
+                pipeline=pipeline,
             )
+            if not categories:
+                print_summary(http_results)
+                return
+            names = ", ".join(category["name"] for category in categories)
+            print(f"Falling back to Selenium for {names}...")
+        else:
+            http_results = []
 
-        print(
-            f"\nTOTAL: {total_successful} successful, {total_failed} failed, {total_pages} pages processed"
+        if warm:
+            driver = ProfileDirs().launch(create_driver)
+        else:
+            driver = cold_launch(create_driver)
+        waits = WaitTimer(driver)
+
+        try:
+            branch_name = open_branch(driver, url, branch, waits)
+
+            all_results = list(http_results)
+
+            # Crawl each category the HTTP listing didn't cover
+            for category in categories:
+                result = crawl_category(
+                    driver=driver,
+                    category_value=category["value"],
+                    category_name=category["name"],
+                    download_base_url=download_base_url,
+                    max_pages=max_pages,
+                    branch_name=branch_name,
+                    manifest=manifest,
+                    waits=waits,
+                    pipeline=pipeline,
+                )
+                all_results.append(result)
+
+            print_summary(all_results)
+            waits.report()
+            get_startup_report().report()
+
+        except Exception as e:
+            print(f"Error during crawling: {e}")
+        finally:
+            driver.quit()
+            print("Chrome driver closed.")
+
+
+def run_branch_job(driver, job, max_pages, manifest, pipeline=None):
+    """
+    Crawl one (chain, branch, category) job on an already running driver.
+    Jobs running in parallel share `pipeline`, so they use one set of
+    download and parse pools and the per-host download cap holds across all
+    of them.
+    """
+    chain = CHAINS[job.chain]
+    waits = WaitTimer(driver)
+    branch_name = open_branch(driver, chain["url"], job.branch, waits)
+    result = crawl_category(
+        driver=driver,
+        category_value=job.category,
+        category_name=CATEGORIES[job.category],
+        download_base_url=chain["download_base_url"],
+        max_pages=max_pages,
+        branch_name=branch_name,
+        manifest=manifest,
+        waits=waits,
+        pipeline=pipeline,
+    )
+    result["wait_seconds"] = waits.report()["seconds"]
+    return result
+
+
+def build_jobs(chains=None, branches=None, categories=None):
+    """
+    One job per chain, branch and category. Branches default to every option
+    of the chain's branch dropdown.
+    """
+    jobs = []
+    for chain in chains or CHAINS:
+        chain_branches = branches
+        if not chain_branches:
+            listing = HttpListing(**CHAINS[chain])
+            chain_branches = list(listing.branch_names())
+        for branch in chain_branches:
+            for category in categories or CATEGORIES:
+                jobs.append(CrawlJob(chain, branch, category))
+    return jobs
+
+
+def crawl_all(
+    jobs=None,
+    pool_size=4,
+    max_pages=2,
+    max_jobs_per_driver=20,
+    warm=False,
+    per_host_limit=4,
+):
+    """
+    Crawl many branches in parallel on a pool of reusable Chrome drivers.
+    With warm=True every browser runs on a reused profile and the next one
+    is already starting in the background when the pool recycles a driver.
+    All jobs share one CrawlPipeline: one per-host download cap and one
+    parse process per CPU for the whole run, started once.
+    """
+    jobs = jobs or build_jobs()
+    print(f"Scheduling {len(jobs)} jobs on {pool_size} Chrome drivers...")
+
+    driver_factory = partial(cold_launch, create_driver)
+    warm_driver = None
+    if warm:
+        # One extra profile for the spare browser starting in the background
+        profiles = ProfileDirs(size=pool_size + 1)
+        warm_driver = WarmDriver(
+            partial(profiles.launch, create_driver), workers=pool_size
         )
-        print(f"Categories processed: {len(all_results)}")
-
-    except Exception as e:
-        print(f"Error during crawling: {e}")
+        driver_factory = warm_driver.get
+
+    # Each job keeps as many downloads in flight as a single crawl would
+    pipeline = CrawlPipeline(
+        download_workers=8 * pool_size,
+        per_host_limit=per_host_limit,
+        fused=True,
+    )
+    try:
+        with pipeline:
+            summary = run_jobs(
+                jobs,
+                partial(
+                    run_branch_job,
+                    max_pages=max_pages,
+                    manifest=CrawlManifest(),
+                    pipeline=pipeline,
+                ),
+                driver_factory,
+                pool_size=pool_size,
+                max_jobs_per_driver=max_jobs_per_driver,
+            )
     finally:
-        driver.quit()
-        print("Chrome driver closed.")
+        if warm_driver:
+            warm_driver.close()
+
+    print(f"\n{'='*60}")
+    print("RUN SUMMARY")
+    print(f"{'='*60}")
+    for result in summary["results"]:
+        print(
+            f"{result['chain']}/{result['branch']} {result['category']}: "
+            f"{result['successful_downloads']} successful, "
+            f"{result['failed_downloads']} failed, "
+            f"{result['skipped_unchanged']} unchanged"
+        )
+    for failure in summary["failed_jobs"]:
+        print(f"❌ {failure['job']}: {failure['error']}")
+    print(
+        f"\nTOTAL: {summary['completed_jobs']}/{summary['jobs']} jobs, "
+        f"{summary['successful_downloads']} successful, "
+        f"{summary['failed_downloads']} failed, "
+        f"{summary['skipped_unchanged']} unchanged, "
+        f"{summary['pages_processed']} pages in {summary['elapsed_seconds']:.1f}s"
+    )
+    print(
+        f"Drivers started: {summary['drivers_started']}, "
+        f"recycled: {summary['drivers_recycled']}"
+    )
+    get_session().print_stats()
+    get_startup_report().report()
+    return summary
 
 
 if __name__ == "__main__":
-    crawl()
+    # Pass --warm to reuse Chrome profiles (and pre-start browsers in the pool)
+    warm = "--warm" in sys.argv
+    if "--all-branches" in sys.argv:
+        crawl_all(warm=warm)
+    else:
+        # Pass --browser to skip the HTTP listing and drive Chrome directly
+        crawl(use_browser="--browser" in sys.argv, warm=warm)
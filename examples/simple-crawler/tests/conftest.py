@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The crawler imports `utils` as a top-level package (run from this directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    Serves `server.files` with ETag, If-None-Match and Range support, and
+    misbehaves on request: drops the connection part way through a body,
+    ignores Range headers or announces a wrong Content-MD5.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path in server.statuses:
+            self._reply(server.statuses[self.path], b"")
+            return
+        body = server.files.get(self.path)
+        if body is None:
+            self._reply(404, b"")
+            return
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._reply(304, b"", {"ETag": etag})
+            return
+
+        status, start, headers = 200, 0, {"ETag": etag, "Accept-Ranges": "bytes"}
+        requested = self.headers.get("Range", "")
+        if (
+            requested.startswith("bytes=")
+            and self.headers.get("If-Range") == etag
+            and not server.ignore_range
+        ):
+            status, start = 206, int(requested[6:].split("-")[0])
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+        sent = body[start:]
+        checksum = hashlib.md5(sent).digest()
+        if server.bad_checksums:
+            server.bad_checksums -= 1
+            checksum = hashlib.md5(b"something else").digest()
+        headers["Content-MD5"] = base64.b64encode(checksum).decode()
+
+        drop_after = server.drop_after.pop(self.path, None)
+        self._reply(status, sent, headers, drop_after)
+
+    def _reply(self, status, body, headers=None, drop_after=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if drop_after is None:
+            self.wfile.write(body)
+            return
+        self.wfile.write(body[:drop_after])
+        self.wfile.flush()
+        self.connection.shutdown(socket.SHUT_RDWR)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """
+    A local HTTP server on a free port; add bodies to `server.files` by path
+    and build links with `server.url(path)`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    server.daemon_threads = True
+    server.files = {}
+    server.statuses = {}
+    server.requests = []
+    server.drop_after = {}
+    server.ignore_range = False
+    server.bad_checksums = 0
+    server.url = lambda path: f"http://127.0.0.1:{server.server_port}{path}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,132 @@
+import glob
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+from utils.columnar import (  # noqa: E402
+    PRICE_COLUMNS,
+    PROMO_COLUMNS,
+    convert_xml_to_columnar,
+    load_columnar,
+    write_columnar,
+)
+from utils.synthetic import write_price_full, write_promo_full  # noqa: E402
+
+ARROW_TYPES = {
+    "string": pa.string(),
+    "float64": pa.float64(),
+    "bool": pa.bool_(),
+}
+
+
+def column_types(path):
+    """Column -> type name; Parquet may store timestamps at a finer unit."""
+    if path.endswith(".arrow"):
+        schema = pa.ipc.open_file(pa.memory_map(path, "r")).schema
+    else:
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+    return {
+        field.name: (
+            "timestamp"
+            if pa.types.is_timestamp(field.type)
+            else {t: name for name, t in ARROW_TYPES.items()}[field.type]
+        )
+        for field in schema
+    }
+
+
+def price_items(path):
+    return [
+        {child.tag: (child.text or "").strip() for child in elem}
+        for elem in ET.parse(path).getroot().iter("Item")
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_price_round_trip(tmp_path, fmt):
+    xml_path = write_price_full(str(tmp_path / "PriceFull.xml"), 40)
+
+    [path] = convert_xml_to_columnar(xml_path, fmt)
+    assert path == f"{xml_path}.prices.{fmt}"
+    assert column_types(path) == PRICE_COLUMNS
+
+    df = load_columnar(str(tmp_path), kind="prices")
+    items = price_items(xml_path)
+    assert len(df) == len(items) == 40
+    for row, item in zip(df.itertuples(), items):
+        assert row.chain_id == "7290055700007"
+        assert row.store_id == "084"
+        assert row.item_code == item["ItemCode"]
+        assert row.item_name == item["ItemName"]
+        assert row.item_price == float(item["ItemPrice"])
+        assert row.quantity == float(item["Quantity"])
+        assert row.is_weighted == (item["bIsWeighted"] == "1")
+        assert row.allow_discount == (item["AllowDiscount"] == "1")
+        assert row.price_update_date == datetime.strptime(
+            item["PriceUpdateDate"], "%Y-%m-%d %H:%M:%S"
+        )
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_promo_round_trip(tmp_path, fmt):
+    xml_path = write_promo_full(
+        str(tmp_path / "PromoFull.xml"), 6, items_per_promotion=3
+    )
+
+    [path] = convert_xml_to_columnar(xml_path, fmt)
+    assert column_types(path) == PROMO_COLUMNS
+
+    df = load_columnar(path, kind="promos")
+    promotions = ET.parse(xml_path).getroot().iter("Promotion")
+    expected = [
+        (promo, item.findtext("ItemCode"))
+        for promo in promotions
+        for item in promo.iter("Item")
+    ]
+    assert len(df) == len(expected) == 18
+    for row, (promo, item_code) in zip(df.itertuples(), expected):
+        assert row.promotion_id == promo.findtext("PromotionId")
+        assert row.item_code == item_code
+        assert row.min_qty == float(promo.findtext("MinQty"))
+        assert row.discounted_price == float(promo.findtext("DiscountedPrice"))
+        assert row.start == datetime.strptime(
+            promo.findtext("PromotionStartDate"), "%Y-%m-%d"
+        )
+        assert row.end == datetime.strptime(
+            f"{promo.findtext('PromotionEndDate')} 23:59:00", "%Y-%m-%d %H:%M:%S"
+        )
+
+
+def test_default_arrow_output_is_memory_mappable(tmp_path):
+    xml_path = write_price_full(str(tmp_path / "PriceFull.xml"), 40)
+    [path] = convert_xml_to_columnar(xml_path, "arrow")
+
+    before = pa.total_allocated_bytes()
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    # Uncompressed buffers are read in place, without decoding into memory
+    assert table.num_rows == 40
+    assert pa.total_allocated_bytes() == before
+
+
+def test_failed_write_keeps_previous_output(tmp_path):
+    xml_path = write_price_full(str(tmp_path / "PriceFull.xml"), 40)
+    [path] = convert_xml_to_columnar(xml_path, "parquet")
+    with open(path, "rb") as f:
+        previous = f.read()
+
+    with open(xml_path, encoding="utf-8") as f:
+        truncated = f.read()[:-200]
+    with open(xml_path, "w", encoding="utf-8") as f:
+        f.write(truncated)
+    with pytest.raises(ET.ParseError):
+        write_columnar(xml_path, xml_path, "parquet", batch_size=10)
+
+    with open(path, "rb") as f:
+        assert f.read() == previous
+    assert not glob.glob(str(tmp_path / "*.part"))
@@ -0,0 +1,66 @@
+import pytest
+
+from utils.listing import HttpListing, ListingError
+
+BRANCH = "0084"
+CATEGORY = "pricefull"
+
+
+def page(names, pages=1):
+    rows = "".join(
+        f'<a class="btn downloadBtn" href="/files/{name}">x</a>' for name in names
+    )
+    buttons = "".join(
+        f"<button class='paginationBtn' data-page='{n}'>{n}</button>"
+        for n in range(1, pages + 1)
+    )
+    return f"<html><body>{rows}<div>{buttons}</div></body></html>".encode()
+
+
+def price_files(*numbers, branch=BRANCH):
+    return [f"PriceFull7290055700007-{branch}-2025081203{n:02d}.gz" for n in numbers]
+
+
+def serve(http_server, number, body, branch=BRANCH, category=CATEGORY):
+    http_server.files[f"/?page={number}&branch={branch}&cat={category}"] = body
+
+
+@pytest.fixture
+def listing(http_server):
+    return HttpListing(http_server.url("/"), http_server.url("/files/"))
+
+
+def test_pages_follow_the_pagination(listing, http_server):
+    serve(http_server, 1, page(price_files(1, 2), pages=3))
+    serve(http_server, 2, page(price_files(3, 4), pages=3))
+    serve(http_server, 3, page(price_files(5), pages=3))
+
+    pages = list(listing.pages(BRANCH, CATEGORY, max_pages=5))
+    assert [len(links) for links in pages] == [2, 2, 1]
+
+
+def test_single_page_listing_is_filtered_by_name(listing, http_server):
+    # The site ignores the filters, but everything fits on one page
+    names = price_files(1) + price_files(2, branch="0001")
+    serve(http_server, 1, page(names))
+
+    [links] = listing.pages(BRANCH, CATEGORY, max_pages=2)
+    assert links == [http_server.url("/files/" + price_files(1)[0])]
+
+
+def test_ignored_page_parameter_is_detected(listing, http_server):
+    first = page(price_files(1, 2), pages=4)
+    serve(http_server, 1, first)
+    serve(http_server, 2, first)
+
+    with pytest.raises(ListingError):
+        next(listing.pages(BRANCH, CATEGORY, max_pages=2))
+
+
+def test_ignored_filters_are_detected(listing, http_server):
+    names = price_files(1) + price_files(2, branch="0001")
+    serve(http_server, 1, page(names, pages=4))
+
+    # Even when only the first page is wanted, it is just part of the files
+    with pytest.raises(ListingError):
+        next(listing.pages(BRANCH, CATEGORY, max_pages=1))
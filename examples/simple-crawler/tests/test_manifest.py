@@ -0,0 +1,114 @@
+import gzip
+import os
+import sqlite3
+
+import pytest
+
+from utils.manifest import CrawlManifest
+from utils.pipeline import CrawlPipeline, process_links_concurrently
+from utils.synthetic import write_price_full
+
+
+@pytest.fixture(params=[False, True], ids=["staged", "fused"])
+def crawl(request, http_server, tmp_path):
+    """Crawls the server's /PriceFull.gz with a manifest kept between crawls."""
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite3"))
+    output_dir = tmp_path / "prices"
+    os.makedirs(output_dir)
+    link = http_server.url("/PriceFull.gz")
+
+    def crawl():
+        http_server.requests.clear()
+        return process_links_concurrently(
+            [link],
+            str(output_dir),
+            download_workers=1,
+            parse_workers=1,
+            fused=request.param,
+            manifest=manifest,
+        )
+
+    crawl.link = link
+    crawl.manifest = manifest
+    yield crawl
+    manifest.close()
+
+
+def price_file(tmp_path, items):
+    path = str(tmp_path / f"PriceFull-{items}.xml")
+    write_price_full(path, items)
+    with open(path, "rb") as f:
+        return gzip.compress(f.read())
+
+
+def sent_etag(http_server):
+    [(_, headers)] = http_server.requests
+    return headers.get("If-None-Match")
+
+
+def test_unchanged_file_is_skipped(crawl, http_server, tmp_path):
+    http_server.files["/PriceFull.gz"] = price_file(tmp_path, 10)
+    assert crawl() == (1, 0, 0)
+    etag = crawl.manifest.lookup(crawl.link)["etag"]
+
+    assert crawl() == (0, 0, 1)
+    assert sent_etag(http_server) == etag
+
+
+def test_changed_etag_downloads_again(crawl, http_server, tmp_path):
+    http_server.files["/PriceFull.gz"] = price_file(tmp_path, 10)
+    assert crawl() == (1, 0, 0)
+    etag = crawl.manifest.lookup(crawl.link)["etag"]
+
+    http_server.files["/PriceFull.gz"] = price_file(tmp_path, 20)
+    assert crawl() == (1, 0, 0)
+    assert sent_etag(http_server) == etag
+    assert crawl.manifest.lookup(crawl.link)["etag"] != etag
+
+
+def test_same_content_under_a_new_etag_is_skipped(crawl, http_server, tmp_path):
+    http_server.files["/PriceFull.gz"] = price_file(tmp_path, 10)
+    assert crawl() == (1, 0, 0)
+    # The server answers 200 again, e.g. after its ETags changed
+    with sqlite3.connect(crawl.manifest.path) as conn:
+        conn.execute("UPDATE files SET etag = ?", ('"stale"',))
+
+    assert crawl() == (0, 0, 1)
+    assert sent_etag(http_server) == '"stale"'
+    assert crawl.manifest.lookup(crawl.link)["etag"] != '"stale"'
+
+
+def test_failed_download_is_not_recorded(crawl, http_server, tmp_path):
+    http_server.statuses["/PriceFull.gz"] = 404
+    assert crawl() == (0, 1, 0)
+    assert crawl.manifest.lookup(crawl.link) is None
+
+
+def test_failed_conversion_is_not_recorded(crawl, http_server, tmp_path):
+    http_server.files["/PriceFull.gz"] = gzip.compress(b"<Root><Items><Item>")
+    assert crawl() == (0, 1, 0)
+    assert crawl.manifest.lookup(crawl.link) is None
+
+    # The next crawl downloads the file unconditionally instead of skipping it
+    http_server.files["/PriceFull.gz"] = price_file(tmp_path, 10)
+    assert crawl() == (1, 0, 0)
+    assert sent_etag(http_server) is None
+
+
+def test_pipeline_is_reused_across_pages(http_server, tmp_path):
+    output_dir = tmp_path / "prices"
+    os.makedirs(output_dir)
+    http_server.files["/PriceFull1.gz"] = price_file(tmp_path, 10)
+    http_server.files["/PriceFull2.gz"] = price_file(tmp_path, 20)
+    http_server.statuses["/PriceFull3.gz"] = 404
+
+    with CrawlPipeline(download_workers=2, parse_workers=1, fused=True) as pipeline:
+        parsers = pipeline._parsers
+        first = pipeline.submit([http_server.url("/PriceFull1.gz")], str(output_dir))
+        second = pipeline.submit(
+            [http_server.url("/PriceFull2.gz"), http_server.url("/PriceFull3.gz")],
+            str(output_dir),
+        )
+        assert first.result() == (1, 0, 0)
+        assert second.result() == (1, 1, 0)
+        assert pipeline._parsers is parsers
@@ -0,0 +1,79 @@
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from utils import _elem_to_dict
+from utils.records import PriceItem, PromotionItem, load_records
+from utils.synthetic import write_price_full, write_promo_full
+
+
+def as_dicts(path):
+    return _elem_to_dict(ET.parse(path).getroot())["Root"]
+
+
+def test_price_items_match_the_json_conversion(tmp_path):
+    path = write_price_full(str(tmp_path / "PriceFull.xml"), 30)
+    root = as_dicts(path)
+
+    records = load_records(path)
+    assert len(records) == len(records.items) == 30
+    for item, expected in zip(records.items, root["Items"]["Item"]):
+        assert type(item) is PriceItem
+        assert item.chain_id == root["ChainId"]
+        assert item.store_id == root["StoreId"]
+        assert item.item_code == expected["ItemCode"]
+        assert item.item_name == expected["ItemName"]
+        assert item.manufacturer == expected["ManufacturerName"]
+        assert item.unit_qty == expected["UnitQty"]
+        assert item.item_price == float(expected["ItemPrice"])
+        assert item.unit_of_measure_price == float(expected["UnitOfMeasurePrice"])
+        assert item.quantity == float(expected["Quantity"])
+        assert item.qty_in_package == float(expected["QtyInPackage"])
+        assert item.is_weighted is (expected["bIsWeighted"] == "1")
+        assert item.allow_discount is (expected["AllowDiscount"] == "1")
+        assert item.price_update_date == datetime.strptime(
+            expected["PriceUpdateDate"], "%Y-%m-%d %H:%M:%S"
+        )
+
+
+def test_promotion_items_match_the_json_conversion(tmp_path):
+    path = write_promo_full(str(tmp_path / "PromoFull.xml"), 4, items_per_promotion=3)
+    root = as_dicts(path)
+    expected = [
+        (promotion, item["ItemCode"])
+        for promotion in root["Promotions"]["Promotion"]
+        for item in promotion["PromotionItems"]["Item"]
+    ]
+
+    records = load_records(path)
+    assert len(records.promotions) == len(expected) == 12
+    for record, (promotion, item_code) in zip(records.promotions, expected):
+        assert type(record) is PromotionItem
+        assert record.promotion_id == promotion["PromotionId"]
+        assert record.item_code == item_code
+        assert record.reward_type == promotion["RewardType"]
+        assert record.min_qty == float(promotion["MinQty"])
+        assert record.discount_rate == float(promotion["DiscountRate"])
+        assert record.discounted_price == float(promotion["DiscountedPrice"])
+        assert record.start == datetime.strptime(
+            promotion["PromotionStartDate"] + " " + promotion["PromotionStartHour"],
+            "%Y-%m-%d %H:%M:%S",
+        )
+
+
+def test_repeated_codes_share_one_string(tmp_path):
+    path = write_price_full(str(tmp_path / "PriceFull.xml"), 10)
+
+    items = load_records(path).items
+    assert all(item.store_id is sys.intern("084") for item in items)
+    assert len({id(item.unit_qty) for item in items}) == 3
+
+
+def test_records_are_hashable(tmp_path):
+    path = write_price_full(str(tmp_path / "PriceFull.xml"), 10)
+
+    first = load_records(path).items
+    second = load_records(path).items
+    assert first == second
+    assert len(set(first) | set(second)) == 10
+    assert {first[0]: "seen"}[second[0]] == "seen"
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from utils.resumable import IntegrityError, fetch_to_file
+from utils.session import CrawlerSession
+
+BODY = bytes(range(256)) * 400
+
+
+@pytest.fixture
+def session():
+    return CrawlerSession(retries=0, timeout=5)
+
+
+def fetch(session, http_server, tmp_path, **kwargs):
+    http_server.files["/PriceFull.gz"] = BODY
+    output_path = str(tmp_path / "PriceFull.gz")
+    download = fetch_to_file(
+        session, http_server.url("/PriceFull.gz"), output_path, **kwargs
+    )
+    return download, output_path
+
+
+def ranges(http_server):
+    return [headers.get("Range") for _, headers in http_server.requests]
+
+
+def test_dropped_connection_resumes_with_range(session, http_server, tmp_path):
+    http_server.drop_after["/PriceFull.gz"] = 3 * session.chunk_size
+
+    download, output_path = fetch(session, http_server, tmp_path)
+
+    assert download.status_code == 206
+    assert download.path == output_path
+    assert download.size == len(BODY)
+    with open(output_path, "rb") as f:
+        assert f.read() == BODY
+    # The range reply carries the checksum of the range, not of the whole file
+    assert ranges(http_server) == [None, f"bytes={3 * session.chunk_size}-"]
+    assert os.listdir(tmp_path) == ["PriceFull.gz"]
+
+
+def test_range_answered_with_full_body_starts_over(session, http_server, tmp_path):
+    http_server.drop_after["/PriceFull.gz"] = 3 * session.chunk_size
+    http_server.ignore_range = True
+
+    download, output_path = fetch(session, http_server, tmp_path)
+
+    assert download.status_code == 200
+    with open(output_path, "rb") as f:
+        assert f.read() == BODY
+    assert ranges(http_server) == [None, f"bytes={3 * session.chunk_size}-"]
+
+
+def test_checksum_mismatch_downloads_again(session, http_server, tmp_path):
+    http_server.bad_checksums = 1
+
+    download, output_path = fetch(session, http_server, tmp_path)
+
+    with open(output_path, "rb") as f:
+        assert f.read() == BODY
+    assert ranges(http_server) == [None, None]
+
+
+def test_persistent_checksum_mismatch_keeps_no_file(session, http_server, tmp_path):
+    http_server.bad_checksums = 3
+
+    with pytest.raises(IntegrityError):
+        fetch(session, http_server, tmp_path, max_resumes=2)
+
+    assert len(http_server.requests) == 3
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,93 @@
+import os
+import shutil
+
+import pytest
+
+from utils import convert_xml_to_json
+from utils.columnar import convert_xml_to_columnar
+from utils.sharded import convert_xml_sharded
+from utils.synthetic import write_price_full, write_promo_full
+
+
+def price_file(path):
+    write_price_full(path, 600)
+
+
+def promo_file(path):
+    write_promo_full(path, 200)
+
+
+def trailing_sibling(path):
+    write_price_full(path, 600)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("</Items>\n", "</Items>\n<Trailer>done</Trailer>\n"))
+
+
+def two_containers(path):
+    write_price_full(path, 600)
+    with open(path, encoding="utf-8") as f:
+        items = f.read().split("</Item>\n")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("</Item>\n".join(items[:300]))
+        f.write('</Item>\n</Items>\n<Items Count="300">\n')
+        f.write("</Item>\n".join(items[300:]))
+
+
+def copies(tmp_path, write):
+    """The same file in two directories: one for each converter."""
+    paths = []
+    for name in ("single", "sharded"):
+        os.makedirs(tmp_path / name)
+        paths.append(str(tmp_path / name / "PriceFull.xml"))
+    write(paths[0])
+    shutil.copy(paths[0], paths[1])
+    return paths
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("write", [price_file, promo_file, trailing_sibling])
+def test_sharded_json_matches_in_memory(tmp_path, write):
+    single, sharded = copies(tmp_path, write)
+    expected = convert_xml_to_json(single, streaming=False)
+
+    output = convert_xml_sharded(sharded, "json", workers=2, min_shard_bytes=1)
+
+    assert output == sharded + ".json"
+    assert read(output) == read(expected)
+    assert sorted(os.listdir(os.path.dirname(sharded))) == [
+        "PriceFull.xml",
+        "PriceFull.xml.json",
+    ]
+
+
+def test_records_in_two_containers_are_not_sharded(tmp_path):
+    single, sharded = copies(tmp_path, two_containers)
+    expected = convert_xml_to_json(single, streaming=False)
+
+    assert convert_xml_sharded(sharded, "json", workers=2, min_shard_bytes=1) is None
+    assert not os.path.exists(sharded + ".json")
+    # What convert_xml_to_json falls back to
+    assert read(convert_xml_to_json(sharded)) == read(expected)
+
+
+@pytest.mark.parametrize(
+    "write", [price_file, promo_file, trailing_sibling, two_containers]
+)
+def test_sharded_parquet_matches_single_process(tmp_path, write):
+    pq = pytest.importorskip("pyarrow.parquet")
+    single, sharded = copies(tmp_path, write)
+    expected = convert_xml_to_columnar(single, "parquet")
+
+    output = convert_xml_sharded(sharded, "parquet", workers=2, min_shard_bytes=1)
+
+    assert [os.path.basename(path) for path in output] == [
+        os.path.basename(path) for path in expected
+    ]
+    for path, expected_path in zip(output, expected):
+        assert pq.read_table(path).equals(pq.read_table(expected_path))
@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import StaleElementReferenceException  # noqa: E402
+
+from utils.waits import (  # noqa: E402
+    LISTING_ELEMENT_JS,
+    LISTING_SIGNATURE_JS,
+    LOADING_VISIBLE_JS,
+    WaitTimer,
+    listing_snapshot,
+)
+
+
+class FakeElement:
+    def __init__(self):
+        self.stale = False
+
+    def is_enabled(self):
+        if self.stale:
+            raise StaleElementReferenceException()
+        return True
+
+
+class FakeDriver:
+    """Answers the listing scripts of utils.waits from plain attributes."""
+
+    def __init__(self, links):
+        self.links = links
+        self.element = FakeElement() if links else None
+        self.loading = False
+
+    def execute_script(self, script):
+        return {
+            LISTING_SIGNATURE_JS: "|".join(self.links),
+            LISTING_ELEMENT_JS: self.element,
+            LOADING_VISIBLE_JS: self.loading,
+        }[script]
+
+    def refresh(self, links, loading=False):
+        """The page replaced the listing, as an AJAX filter does."""
+        if self.element:
+            self.element.stale = True
+        self.element = FakeElement() if links else None
+        self.links = links
+        self.loading = loading
+
+
+def wait(driver, timeout=2):
+    return WaitTimer(driver, timeout=timeout, poll_frequency=0.01)
+
+
+@pytest.mark.parametrize(
+    "links", [["a.gz", "c.gz"], ["a.gz", "b.gz"], []], ids=["new", "same", "empty"]
+)
+def test_completed_refresh_ends_the_wait(links):
+    driver = FakeDriver(["a.gz", "b.gz"])
+    previous = listing_snapshot(driver)
+    driver.refresh(links)
+
+    waits = wait(driver)
+    assert waits.listing_updated("filter", previous)
+    ((_, elapsed, timed_out),) = waits.records
+    assert not timed_out and elapsed < 1
+
+
+def test_refresh_still_loading_keeps_waiting():
+    driver = FakeDriver(["a.gz", "b.gz"])
+    previous = listing_snapshot(driver)
+    driver.refresh([], loading=True)
+
+    assert not wait(driver, timeout=0.2).listing_updated("filter", previous)
+
+
+def test_untouched_listing_times_out():
+    driver = FakeDriver(["a.gz", "b.gz"])
+    previous = listing_snapshot(driver)
+
+    assert not wait(driver, timeout=0.2).listing_updated("filter", previous)
+
+
+def test_listing_that_was_empty_waits_for_links():
+    driver = FakeDriver([])
+    previous = listing_snapshot(driver)
+    assert not wait(driver, timeout=0.2).listing_updated("filter", previous)
+
+    driver.refresh(["a.gz"])
+    assert wait(driver).listing_updated("filter", previous)
@@ -0,0 +1,108 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from utils import convert_xml_to_json
+from utils.synthetic import write_price_full, write_promo_full
+
+DOCUMENTS = {
+    "empty elements": (
+        "<Root><Empty/><Blank></Blank><Spaces>  </Spaces>"
+        "<Items><Item><A/></Item><Item><A>1</A><B></B></Item></Items></Root>"
+    ),
+    "attributes and text": (
+        '<Root Version="1"><Items Count="2">'
+        '<Item Id="1">text<B X="y">z</B></Item>'
+        '<Item Id="2"> padded </Item><Item Id="3"/></Items></Root>'
+    ),
+    "repeated tags": (
+        "<Root><Tag>a</Tag><Tag>b</Tag><Tag>c</Tag><Items>"
+        "<Item><C>1</C><C>2</C><D>3</D></Item>"
+        "<Item><C>4</C></Item></Items></Root>"
+    ),
+    "single record": "<Root><Items><Item><Code>1</Code></Item></Items></Root>",
+    "no records": "<Root><Items Count='0'/><StoreId>084</StoreId></Root>",
+    "repeated tag around records": (
+        "<Root><Meta>1</Meta><Items><Item><A>1</A></Item><Item><A>2</A></Item>"
+        "</Items><Meta>2</Meta></Root>"
+    ),
+    "nested records": (
+        "<Root><Promotions><Promotion><PromotionId>1</PromotionId>"
+        "<PromotionItems><Item><ItemCode>1</ItemCode></Item>"
+        "<Item><ItemCode>2</ItemCode></Item></PromotionItems></Promotion>"
+        "<Promotion><PromotionId>2</PromotionId><PromotionItems>"
+        "<Item><ItemCode>3</ItemCode></Item></PromotionItems></Promotion>"
+        "</Promotions></Root>"
+    ),
+    "unicode": (
+        '<?xml version="1.0" encoding="utf-8"?><Root><Items>'
+        '<Item><ItemName>חלב 3% "טרי" &amp; זול</ItemName><Note>☕ \\ / \t</Note>'
+        "</Item><Item><ItemName>קפה</ItemName></Item></Items></Root>"
+    ),
+}
+
+
+def convert_both(tmp_path, write):
+    """Converts the same file with the streaming and the in-memory converter."""
+    outputs = []
+    for streaming in (True, False):
+        directory = tmp_path / ("streaming" if streaming else "in-memory")
+        os.makedirs(directory)
+        path = str(directory / "PriceFull.xml")
+        write(path)
+        with open(convert_xml_to_json(path, streaming=streaming), "rb") as f:
+            outputs.append(f.read())
+    return outputs
+
+
+@pytest.mark.parametrize("name", DOCUMENTS)
+def test_streaming_output_matches_in_memory(tmp_path, name):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(DOCUMENTS[name])
+
+    streamed, in_memory = convert_both(tmp_path, write)
+    assert streamed == in_memory
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda path: write_price_full(path, 500),
+        lambda path: write_promo_full(path, 100),
+    ],
+    ids=["PriceFull", "PromoFull"],
+)
+def test_streaming_price_files_match_in_memory(tmp_path, write):
+    streamed, in_memory = convert_both(tmp_path, write)
+    assert streamed == in_memory
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_failed_conversion_leaves_no_partial_file(tmp_path, streaming):
+    path = str(tmp_path / "PriceFull.xml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<Root><Items><Item><A>1</A></Item><Item><A>2")
+
+    with pytest.raises(ET.ParseError):
+        convert_xml_to_json(path, streaming=streaming)
+
+    assert os.listdir(tmp_path) == ["PriceFull.xml"]
+
+
+def test_failed_overwrite_keeps_the_previous_file(tmp_path):
+    path = str(tmp_path / "PriceFull.xml")
+    write_price_full(path, 10)
+    json_path = convert_xml_to_json(path)
+    with open(json_path, "rb") as f:
+        previous = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<Root><Items><Item>")
+
+    with pytest.raises(ET.ParseError):
+        convert_xml_to_json(path, overwrite=True)
+
+    with open(json_path, "rb") as f:
+        assert f.read() == previous
+    assert sorted(os.listdir(tmp_path)) == ["PriceFull.xml", "PriceFull.xml.json"]
@@ -1,9 +1,35 @@
 import gzip
+import hashlib
+import io
 import json
 import shutil
 import os
-import requests
 import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+from .columnar import write_columnar
+from .manifest import Unchanged
+from .resumable import ResumingReader, fetch_to_file
+from .session import get_session
+
+
+@contextmanager
+def _atomic_write(path):
+    """
+    Opens `<path>.<pid>.part` for writing and renames it to path once the
+    block completes, so a failed or killed conversion never leaves a truncated
+    file that a later run would take as done, and two processes converting
+    the same file don't write into one temp file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.part"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            yield out
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
 
 
 def extract_and_delete_gz(gz_path):
@@ -14,10 +40,19 @@ def extract_and_delete_gz(gz_path):
     # Determine output filename by removing ".gz"
     output_path = gz_path[:-3]
 
-    # Extract the .gz file
-    with gzip.open(gz_path, "rb") as f_in:
-        with open(output_path, "wb") as f_out:
-            shutil.copyfileobj(f_in, f_out)
+    # Extract the .gz file next to its final name, so a corrupt archive never
+    # leaves a half-written XML file behind
+    tmp_path = output_path + ".part"
+    try:
+        with gzip.open(gz_path, "rb") as f_in:
+            with open(tmp_path, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+    except (OSError, EOFError) as e:
+        print(f"❌ Corrupt or truncated archive {gz_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, output_path)
 
     print(f"Extracted to: {output_path}")
 
@@ -27,31 +62,310 @@ def extract_and_delete_gz(gz_path):
     return output_path
 
 
-def download_file_from_link(link, output_dir):
+def download_file_from_link(link, output_dir, session=None, manifest=None):
+    """
+    Downloads a link over the shared pooled session (or the given
+    `CrawlerSession`), reading it in `session.chunk_size` chunks.
+
+    The file only appears under its final name once it is complete and its
+    size/checksum are verified; interrupted downloads resume with Range
+    requests (see `utils/resumable.py`).
+
+    With a `CrawlManifest` the request is conditional (If-None-Match /
+    If-Modified-Since) and `Unchanged` is returned when the server answers
+    304 or the content hash matches the last processed download.
+    """
+    session = session or get_session()
     filename = os.path.basename(link)
     output_path = os.path.join(output_dir, filename)
-    response = requests.get(link, stream=True)
-    if response.status_code == 200:
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        print(f"Downloaded to {output_path}")
-        return output_path
-    else:
-        print(f"Failed to download. Status code: {response.status_code}")
+    headers = manifest.conditional_headers(link) if manifest else {}
+    download = fetch_to_file(session, link, output_path, headers)
+    if download.status_code == 304:
+        print(f"⏭️ Unchanged since last crawl: {link}")
+        return Unchanged(link)
+    if download.path is None:
+        print(f"Failed to download. Status code: {download.status_code}")
         return None
+    print(f"Downloaded to {output_path}")
+    if manifest:
+        return _stage_download(manifest, link, filename, download, output_path)
+    return output_path
+
+
+def _stage_download(manifest, link, filename, download, output_path):
+    content_hash = download.sha256.hexdigest()
+    manifest.stage(
+        link,
+        filename,
+        download.headers.get("ETag"),
+        download.headers.get("Last-Modified"),
+        download.size,
+        content_hash,
+    )
+    if manifest.has_content(link, content_hash):
+        # Same bytes as last time: keep the old output, refresh the validators
+        manifest.commit(link, manifest.lookup(link)["output_path"])
+        os.remove(output_path)
+        print(f"⏭️ Content unchanged since last crawl: {link}")
+        return Unchanged(link)
+    return output_path
+
+
+RECORD_TAGS = ("Item", "Promotion")
+
+
+class _StreamConflict(Exception):
+    """Raised when streaming cannot reproduce the in-memory JSON layout."""
+
+
+def _elem_to_dict(elem):
+    result = {elem.tag: {} if elem.attrib else None}
+    children = list(elem)
+    if children:
+        dd = {}
+        for dc in map(_elem_to_dict, children):
+            for k, v in dc.items():
+                if k in dd:
+                    if not isinstance(dd[k], list):
+                        dd[k] = [dd[k]]
+                    dd[k].append(v)
+                else:
+                    dd[k] = v
+        result = {elem.tag: dd}
+    if elem.attrib:
+        result[elem.tag].update(("@" + k, v) for k, v in elem.attrib.items())
+    if elem.text and elem.text.strip():
+        text = elem.text.strip()
+        if children or elem.attrib:
+            result[elem.tag]["#text"] = text
+        else:
+            result[elem.tag] = text
+    return result
+
+
+def _merge_child(children, tag, value):
+    if tag in children:
+        if not isinstance(children[tag], list):
+            children[tag] = [children[tag]]
+        children[tag].append(value)
+    else:
+        children[tag] = value
 
 
-def convert_xml_to_json(xml_file_path: str):
+class _Frame:
+    """An open XML element outside of any record, tracked while streaming."""
+
+    def __init__(self, elem, parent, depth):
+        self.elem = elem
+        self.parent = parent
+        self.depth = depth  # indent level of this element's JSON members
+        self.children = {}  # completed children not yet written
+        self.has_children = False
+        self.is_open = False  # "{" already written to the output
+        self.written = set()
+        self.members = 0
+        self.list_tag = None  # record tag currently being streamed
+        self.list_count = 0
+        self.list_first = None
+
+    def value(self):
+        """Build this element's value exactly like `_elem_to_dict` would."""
+        elem = self.elem
+        if self.has_children:
+            value = self.children
+        elif elem.attrib:
+            value = {}
+        else:
+            value = None
+        if elem.attrib:
+            value.update(("@" + k, v) for k, v in elem.attrib.items())
+        if elem.text and elem.text.strip():
+            text = elem.text.strip()
+            if self.has_children or elem.attrib:
+                value["#text"] = text
+            else:
+                value = text
+        return value
+
+
+class _StreamingJSONWriter:
+    """
+    Writes the same text as `json.dump(..., ensure_ascii=False, indent=2)`
+    while elements are still arriving from `iterparse`.
+    """
+
+    def __init__(self, out):
+        self.out = out
+
+    def _dumps(self, value, depth):
+        text = json.dumps(value, ensure_ascii=False, indent=2)
+        return text.replace("\n", "\n" + "  " * depth)
+
+    def write_member(self, frame, key, raw):
+        if key in frame.written:
+            raise _StreamConflict(key)
+        frame.written.add(key)
+        sep = ",\n" if frame.members else "\n"
+        key_json = json.dumps(key, ensure_ascii=False)
+        self.out.write(f"{sep}{'  ' * frame.depth}{key_json}: ")
+        self.out.write(raw)
+        frame.members += 1
+
+    def flush_children(self, frame):
+        for key, value in frame.children.items():
+            self.write_member(frame, key, self._dumps(value, frame.depth))
+        frame.children = {}
+
+    def finish_list(self, frame):
+        if frame.list_tag is None:
+            return
+        indent = "  " * frame.depth
+        if frame.list_count == 1:
+            self.write_member(frame, frame.list_tag, frame.list_first)
+        else:
+            self.out.write(f"\n{indent}]")
+        frame.list_tag = None
+        frame.list_count = 0
+        frame.list_first = None
+
+    def prepare_member(self, frame):
+        """Write everything that must precede a new streamed member of frame."""
+        self.finish_list(frame)
+        self.flush_children(frame)
+
+    def open(self, frame):
+        if frame.is_open:
+            return
+        self.open(frame.parent)
+        self.prepare_member(frame.parent)
+        self.write_member(frame.parent, frame.elem.tag, "{")
+        frame.is_open = True
+        self.flush_children(frame)
+
+    def add_record(self, frame, tag, value):
+        if frame.list_tag != tag:
+            self.prepare_member(frame)
+            if tag in frame.written:
+                raise _StreamConflict(tag)
+            frame.list_tag = tag
+            frame.list_first = self._dumps(value, frame.depth)
+        else:
+            item_indent = "  " * (frame.depth + 1)
+            if frame.list_count == 1:
+                # The first record turned out to be a list element, so it
+                # moves one level deeper than it was rendered
+                first = frame.list_first.replace("\n", "\n  ")
+                frame.list_first = None
+                self.write_member(frame, tag, "[")
+                self.out.write(f"\n{item_indent}{first}")
+            self.out.write(f",\n{item_indent}{self._dumps(value, frame.depth + 1)}")
+        frame.list_count += 1
+
+    def close(self, frame):
+        self.prepare_member(frame)
+        elem = frame.elem
+        for k, v in elem.attrib.items():
+            self.write_member(frame, "@" + k, json.dumps(v, ensure_ascii=False))
+        if elem.text and elem.text.strip():
+            self.write_member(
+                frame, "#text", json.dumps(elem.text.strip(), ensure_ascii=False)
+            )
+        self.out.write(f"\n{'  ' * (frame.depth - 1)}}}")
+
+
+def _stream_xml_to_json(xml_file_path, json_file_path, record_tags):
+    """
+    Converts XML to JSON with `iterparse`, writing each record element as soon
+    as it is parsed and clearing it afterwards, so memory stays flat.
+    """
+    with _atomic_write(json_file_path) as out:
+        writer = _StreamingJSONWriter(out)
+        top = _Frame(None, None, 1)
+        top.is_open = True
+        out.write("{")
+
+        stack = [top]
+        record_depth = 0
+        for event, elem in ET.iterparse(xml_file_path, events=("start", "end")):
+            if event == "start":
+                if record_depth:
+                    record_depth += 1
+                elif len(stack) > 1 and elem.tag in record_tags:
+                    writer.open(stack[-1])
+                    record_depth = 1
+                else:
+                    parent = stack[-1]
+                    parent.has_children = True
+                    stack.append(_Frame(elem, parent, parent.depth + 1))
+                continue
+
+            if record_depth:
+                record_depth -= 1
+                if record_depth:
+                    continue
+                # A complete record: write it out and drop it from the tree
+                frame = stack[-1]
+                writer.add_record(frame, elem.tag, _elem_to_dict(elem)[elem.tag])
+                frame.elem.remove(elem)
+                elem.clear()
+                continue
+
+            frame = stack.pop()
+            parent = stack[-1]
+            if frame.is_open:
+                writer.close(frame)
+            elif parent.is_open and elem.tag in parent.written:
+                raise _StreamConflict(elem.tag)
+            else:
+                _merge_child(parent.children, elem.tag, frame.value())
+            if parent.elem is not None:
+                parent.elem.remove(elem)
+            elem.clear()
+
+        writer.prepare_member(top)
+        out.write("\n}")
+
+
+def convert_xml_to_json(
+    xml_file_path: str,
+    streaming: bool = True,
+    record_tags=RECORD_TAGS,
+    overwrite: bool = False,
+    workers: int = 1,
+):
     """
     Converts an XML file (even if extensionless) to a JSON file.
-    Skips conversion if the JSON file already exists.
+    Skips conversion if the JSON file already exists, unless `overwrite`.
+
+    With `streaming` (the default) the file is parsed incrementally and every
+    `record_tags` element (`<Item>`, `<Promotion>`) is written as soon as it is
+    parsed, so memory does not grow with the file size. The output is
+    identical to the in-memory conversion.
+
+    With `workers` > 1 a large file is split at record boundaries and parsed
+    on that many processes (see `utils/sharded.py`), again with identical
+    output; small or irregular files are converted in one process.
     """
     json_file_path = xml_file_path + ".json"
-    if os.path.exists(json_file_path):
+    if os.path.exists(json_file_path) and not overwrite:
         print(f"✅ JSON already exists: {json_file_path}")
         return json_file_path
 
+    if workers > 1:
+        from .sharded import convert_xml_sharded
+
+        if convert_xml_sharded(xml_file_path, "json", workers, record_tags):
+            return json_file_path
+
+    if streaming:
+        try:
+            _stream_xml_to_json(xml_file_path, json_file_path, record_tags)
+            print(f"✅ Converted to JSON: {json_file_path}")
+            return json_file_path
+        except _StreamConflict as e:
+            # Repeated tags split around records can't be merged once written
+            print(f"⚠️ Cannot stream {xml_file_path} ({e}), converting in memory")
+
     # Step 1: Read XML
     with open(xml_file_path, "r", encoding="utf-8") as f:
         xml_data = f.read()
@@ -60,34 +374,152 @@ def convert_xml_to_json(xml_file_path: str):
     root = ET.fromstring(xml_data)
 
     # Step 3: Convert recursively
-    def elem_to_dict(elem):
-        result = {elem.tag: {} if elem.attrib else None}
-        children = list(elem)
-        if children:
-            dd = {}
-            for dc in map(elem_to_dict, children):
-                for k, v in dc.items():
-                    if k in dd:
-                        if not isinstance(dd[k], list):
-                            dd[k] = [dd[k]]
-                        dd[k].append(v)
-                    else:
-                        dd[k] = v
-            result = {elem.tag: dd}
-        if elem.attrib:
-            result[elem.tag].update(("@" + k, v) for k, v in elem.attrib.items())
-        if elem.text and elem.text.strip():
-            text = elem.text.strip()
-            if children or elem.attrib:
-                result[elem.tag]["#text"] = text
-            else:
-                result[elem.tag] = text
-        return result
-
-    parsed_dict = elem_to_dict(root)
+    parsed_dict = _elem_to_dict(root)
 
     # Step 4: Save to JSON
-    with open(json_file_path, "w", encoding="utf-8") as json_file:
+    with _atomic_write(json_file_path) as json_file:
         json.dump(parsed_dict, json_file, ensure_ascii=False, indent=2)
 
     print(f"✅ Converted to JSON: {json_file_path}")
+    return json_file_path
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class _HashingReader(io.RawIOBase):
+    """Passes a raw stream through while hashing and counting its bytes."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        if n:
+            self.digest.update(memoryview(buffer)[:n])
+            self.size += n
+        return n
+
+
+def _open_xml_stream(raw, buffer_size):
+    """Wraps a raw byte stream so reading it yields decompressed XML."""
+    stream = io.BufferedReader(raw, buffer_size=buffer_size)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def _response_raw(response):
+    response.raw.decode_content = True
+    # Let io wrappers see a clean EOF instead of a closed file
+    response.raw.auto_close = False
+    return response.raw
+
+
+def download_and_convert(
+    link,
+    output_dir,
+    session=None,
+    record_tags=RECORD_TAGS,
+    manifest=None,
+    output_format="json",
+):
+    """
+    Streams a price file from the HTTP response through a gzip decompressor
+    straight into the incremental XML-to-JSON converter. Neither the .gz nor
+    the decompressed XML is written to disk.
+
+    Produces the same JSON file as `download_file_from_link` followed by
+    `extract_and_delete_gz` and `convert_xml_to_json`. With a `CrawlManifest`
+    the request is conditional, an existing JSON file is replaced when the
+    file changed, and `Unchanged` is returned on 304. A 200 response whose
+    body hashes the same as last time also returns `Unchanged`; the hash is
+    only known once the stream is parsed, so unlike `download_file_from_link`
+    this path still parses it (rewriting identical output).
+
+    `output_format="parquet"` or `"arrow"` writes typed columnar files with
+    `write_columnar` instead of JSON.
+    """
+    session = session or get_session()
+    filename = os.path.basename(link)
+    if filename.endswith(".gz"):
+        filename = filename[:-3]
+    output_base = os.path.join(output_dir, filename)
+    json_file_path = output_base + ".json"
+    if (
+        output_format == "json"
+        and manifest is None
+        and os.path.exists(json_file_path)
+    ):
+        print(f"✅ JSON already exists: {json_file_path}")
+        return json_file_path
+
+    headers = manifest.conditional_headers(link) if manifest else {}
+    with session.get(link, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            print(f"⏭️ Unchanged since last crawl: {link}")
+            return Unchanged(link)
+        if response.status_code != 200:
+            print(f"Failed to download. Status code: {response.status_code}")
+            return None
+        # A dropped connection resumes with a Range request mid-parse
+        with ResumingReader(session, link, response, _response_raw) as body:
+            raw = _HashingReader(body)
+            xml_stream = _open_xml_stream(raw, session.chunk_size)
+            if output_format != "json":
+                paths = write_columnar(xml_stream, output_base, output_format)
+                # A store without records yields no files; report the base name
+                output_path = paths[0] if paths else output_base
+                converted = True
+            else:
+                output_path = json_file_path
+                converted = _stream_or_flag(
+                    xml_stream, json_file_path, record_tags, link
+                )
+
+    if not converted:
+        # The stream was consumed, so the in-memory fallback fetches it again
+        with session.get(link, stream=True) as response:
+            response.raise_for_status()
+            with ResumingReader(session, link, response, _response_raw) as body:
+                raw = _HashingReader(body)
+                root = ET.parse(_open_xml_stream(raw, session.chunk_size)).getroot()
+
+        with _atomic_write(json_file_path) as json_file:
+            json.dump(_elem_to_dict(root), json_file, ensure_ascii=False, indent=2)
+        print(f"✅ Converted to JSON: {json_file_path}")
+
+    if manifest:
+        content_hash = raw.digest.hexdigest()
+        manifest.stage(
+            link,
+            os.path.basename(link),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            raw.size,
+            content_hash,
+        )
+        if manifest.has_content(link, content_hash):
+            # Same bytes as last time: refresh the validators, count it as unchanged
+            manifest.commit(link, manifest.lookup(link)["output_path"])
+            print(f"⏭️ Content unchanged since last crawl: {link}")
+            return Unchanged(link)
+        manifest.commit(link, output_path)
+
+    return output_path
+
+
+def _stream_or_flag(xml_stream, json_file_path, record_tags, label):
+    """Streams to JSON; returns False when the in-memory fallback is needed."""
+    try:
+        _stream_xml_to_json(xml_stream, json_file_path, record_tags)
+    except _StreamConflict as e:
+        print(f"⚠️ Cannot stream {label} ({e}), converting in memory")
+        return False
+    print(f"✅ Converted to JSON: {json_file_path}")
+    return True
@@ -0,0 +1,426 @@
+import glob
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+# Flat, typed columns for each record kind. The header fields (chain, store)
+# come from the top of the file and are repeated on every row.
+PRICE_COLUMNS = {
+    "chain_id": "string",
+    "sub_chain_id": "string",
+    "store_id": "string",
+    "item_code": "string",
+    "item_name": "string",
+    "manufacturer": "string",
+    "item_price": "float64",
+    "unit_of_measure_price": "float64",
+    "quantity": "float64",
+    "unit_qty": "string",
+    "unit_of_measure": "string",
+    "is_weighted": "bool",
+    "qty_in_package": "float64",
+    "allow_discount": "bool",
+    "item_status": "string",
+    "price_update_date": "timestamp",
+}
+
+PROMO_COLUMNS = {
+    "chain_id": "string",
+    "sub_chain_id": "string",
+    "store_id": "string",
+    "promotion_id": "string",
+    "promotion_description": "string",
+    "item_code": "string",
+    "reward_type": "string",
+    "min_qty": "float64",
+    "discounted_price": "float64",
+    "discount_rate": "float64",
+    "start": "timestamp",
+    "end": "timestamp",
+    "promotion_update_date": "timestamp",
+}
+
+FORMAT_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# compression="auto": Parquet is compressed, Arrow IPC is left uncompressed so
+# the files can be memory-mapped without decoding
+DEFAULT_COMPRESSION = {"parquet": "zstd", "arrow": None}
+
+_TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y%m%d%H%M",
+)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Columnar output needs pyarrow: pip install -r requirements.txt"
+        ) from e
+    return pa, pq
+
+
+def _compression(fmt, compression):
+    return DEFAULT_COMPRESSION[fmt] if compression == "auto" else compression
+
+
+def _part_path(path):
+    # Unique per process, like _atomic_write, so a killed or failed write
+    # never replaces (or truncates) the previous output
+    return f"{path}.{os.getpid()}.part"
+
+
+def _schema(pa, columns):
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("s"),
+    }
+    return pa.schema([(name, types[t]) for name, t in columns.items()])
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("1", "true", "yes"):
+        return True
+    if value in ("0", "false", "no"):
+        return False
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _to_timestamp(value, hour=None):
+    # Update dates repeat across most rows of a file, so parse each only once
+    if not value:
+        return None
+    value = value.strip().split(".")[0]
+    if hour and len(value) <= 10:
+        value = f"{value} {hour.strip()}"
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value.replace("T", " "), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _fields(elem):
+    """Direct children of elem as a lowercase tag -> text mapping."""
+    return {child.tag.lower(): (child.text or "").strip() for child in elem}
+
+
+def _header_columns(header):
+    return {
+        "chain_id": header.get("chainid"),
+        "sub_chain_id": header.get("subchainid"),
+        "store_id": header.get("storeid"),
+    }
+
+
+def _price_rows(header, elem):
+    fields = _fields(elem)
+    row = _header_columns(header)
+    row.update(
+        {
+            "item_code": fields.get("itemcode"),
+            "item_name": fields.get("itemname") or fields.get("itemnm"),
+            "manufacturer": fields.get("manufacturername"),
+            "item_price": _to_float(fields.get("itemprice")),
+            "unit_of_measure_price": _to_float(fields.get("unitofmeasureprice")),
+            "quantity": _to_float(fields.get("quantity")),
+            "unit_qty": fields.get("unitqty"),
+            "unit_of_measure": fields.get("unitofmeasure"),
+            "is_weighted": _to_bool(fields.get("bisweighted")),
+            "qty_in_package": _to_float(fields.get("qtyinpackage")),
+            "allow_discount": _to_bool(fields.get("allowdiscount")),
+            "item_status": fields.get("itemstatus"),
+            "price_update_date": _to_timestamp(fields.get("priceupdatedate")),
+        }
+    )
+    yield row
+
+
+def _promo_rows(header, elem):
+    fields = _fields(elem)
+    base = _header_columns(header)
+    base.update(
+        {
+            "promotion_id": fields.get("promotionid"),
+            "promotion_description": fields.get("promotiondescription"),
+            "reward_type": fields.get("rewardtype"),
+            "min_qty": _to_float(fields.get("minqty")),
+            "discounted_price": _to_float(fields.get("discountedprice")),
+            "discount_rate": _to_float(fields.get("discountrate")),
+            "start": _to_timestamp(
+                fields.get("promotionstartdate"), fields.get("promotionstarthour")
+            ),
+            "end": _to_timestamp(
+                fields.get("promotionenddate"), fields.get("promotionendhour")
+            ),
+            "promotion_update_date": _to_timestamp(
+                fields.get("promotionupdatedate")
+            ),
+        }
+    )
+    # One row per promoted item code
+    item_codes = [
+        (sub.text or "").strip()
+        for sub in elem.iter()
+        if sub.tag.lower() == "itemcode"
+    ]
+    for item_code in item_codes or [None]:
+        yield dict(base, item_code=item_code)
+
+
+RECORD_KINDS = {
+    "Item": ("prices", _price_rows),
+    "Promotion": ("promos", _promo_rows),
+}
+KIND_COLUMNS = {"prices": PRICE_COLUMNS, "promos": PROMO_COLUMNS}
+
+
+def iter_price_records(source):
+    """
+    Streams (kind, row) pairs from a price XML file path or byte stream.
+    Records are cleared as soon as they are converted, so memory stays flat.
+    """
+    header = {}
+    stack = []
+    record_depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if record_depth or (stack and elem.tag in RECORD_KINDS):
+                record_depth += 1
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if record_depth:
+            record_depth -= 1
+            if record_depth:
+                continue
+            kind, to_rows = RECORD_KINDS[elem.tag]
+            for row in to_rows(header, elem):
+                yield kind, row
+        elif len(elem) == 0 and elem.text and elem.text.strip():
+            header[elem.tag.lower()] = elem.text.strip()
+
+        if stack:
+            stack[-1].remove(elem)
+        elem.clear()
+
+
+class _ColumnarWriter:
+    """
+    Buffers rows into column batches and appends them to `<path>.<pid>.part`,
+    which close() renames to path and abort() removes.
+    """
+
+    def __init__(self, path, columns, fmt, compression, batch_size):
+        pa, pq = _import_pyarrow()
+        self.pa = pa
+        self.path = path
+        self.schema = _schema(pa, columns)
+        self.batch_size = batch_size
+        self.rows = 0
+        self._columns = {name: [] for name in columns}
+        self._sink = None
+        self._tmp_path = _part_path(path)
+        compression = _compression(fmt, compression)
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(
+                self._tmp_path, self.schema, compression=compression
+            )
+        else:
+            self._sink = pa.OSFile(self._tmp_path, "wb")
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+
+    def append(self, row):
+        for name, values in self._columns.items():
+            values.append(row[name])
+        self.rows += 1
+        if len(self._columns["chain_id"]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._columns["chain_id"]:
+            return
+        batch = self.pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_batch(batch)
+        self._columns = {name: [] for name in self._columns}
+
+    def _close_file(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def close(self):
+        self.flush()
+        self._close_file()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        try:
+            self._close_file()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+def write_columnar(
+    source, output_base, fmt="parquet", compression="auto", batch_size=50_000
+):
+    """
+    Writes `<output_base>.<kind><suffix>` for every record kind found in
+    source, an XML file path or byte stream.
+    """
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    writers = {}
+    try:
+        for kind, row in iter_price_records(source):
+            if kind not in writers:
+                path = f"{output_base}.{kind}{FORMAT_SUFFIXES[fmt]}"
+                writers[kind] = (
+                    path,
+                    _ColumnarWriter(
+                        path, KIND_COLUMNS[kind], fmt, compression, batch_size
+                    ),
+                )
+            writers[kind][1].append(row)
+    except BaseException:
+        for _, writer in writers.values():
+            writer.abort()
+        raise
+
+    paths = []
+    for path, writer in writers.values():
+        writer.close()
+        print(f"✅ Wrote {writer.rows} rows to {path}")
+        paths.append(path)
+    return paths
+
+
+def concat_columnar(paths, output_path, fmt="parquet", compression="auto"):
+    """Appends the record batches of paths, in order, into one output file."""
+    pa, pq = _import_pyarrow()
+    compression = _compression(fmt, compression)
+    tmp_path = _part_path(output_path)
+    writer = sink = None
+    try:
+        for path in paths:
+            if fmt == "parquet":
+                source = pq.ParquetFile(path)
+                batches = source.iter_batches()
+                schema = source.schema_arrow
+            else:
+                source = pa.ipc.open_file(pa.memory_map(path, "r"))
+                batches = map(source.get_batch, range(source.num_record_batches))
+                schema = source.schema
+            if writer is None:
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(
+                        tmp_path, schema, compression=compression
+                    )
+                else:
+                    sink = pa.OSFile(tmp_path, "wb")
+                    options = pa.ipc.IpcWriteOptions(compression=compression)
+                    writer = pa.ipc.new_file(sink, schema, options=options)
+            for batch in batches:
+                writer.write_batch(batch)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+        if sink is not None:
+            sink.close()
+        os.replace(tmp_path, output_path)
+    return output_path
+
+
+def convert_xml_to_columnar(
+    xml_file_path: str,
+    fmt: str = "parquet",
+    compression: Optional[str] = "auto",
+    batch_size: int = 50_000,
+    workers: int = 1,
+) -> list[str]:
+    """
+    Flattens the Item/Promotion records of a price XML file into typed columns
+    and writes them as Parquet (`fmt="parquet"`) or Arrow IPC (`fmt="arrow"`).
+
+    Args:
+        xml_file_path: Decompressed price file
+        fmt: "parquet" or "arrow"
+        compression: Codec for the column data; "auto" uses zstd for Parquet
+            and none for Arrow, so Arrow files memory-map without decoding
+        batch_size: Rows buffered in memory before a batch is written
+        workers: Processes for a large file, split at record boundaries
+            (see `utils/sharded.py`)
+
+    Returns:
+        Paths written, e.g. `<xml_file_path>.prices.parquet`
+    """
+    if workers > 1:
+        from .sharded import convert_xml_sharded
+
+        paths = convert_xml_sharded(
+            xml_file_path, fmt, workers, compression=compression
+        )
+        if paths is not None:
+            return paths
+    return write_columnar(xml_file_path, xml_file_path, fmt, compression, batch_size)
+
+
+def load_columnar(path: str, kind: str = "prices"):
+    """
+    Loads every `*.<kind>.parquet` / `*.<kind>.arrow` file under path (or a
+    single file) into one pandas DataFrame. Files are memory-mapped.
+    """
+    pa, pq = _import_pyarrow()
+    if os.path.isdir(path):
+        paths = sorted(
+            glob.glob(os.path.join(path, f"*.{kind}.parquet"))
+            + glob.glob(os.path.join(path, f"*.{kind}.arrow"))
+        )
+    else:
+        paths = [path]
+
+    tables = []
+    for file_path in paths:
+        if file_path.endswith(".arrow"):
+            source = pa.memory_map(file_path, "r")
+            tables.append(pa.ipc.open_file(source).read_all())
+        else:
+            tables.append(pq.read_table(file_path, memory_map=True))
+
+    if not tables:
+        return _schema(pa, KIND_COLUMNS[kind]).empty_table().to_pandas()
+    return pa.concat_tables(tables).to_pandas()
@@ -0,0 +1,213 @@
+import os
+from html.parser import HTMLParser
+from typing import Iterator, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .session import CrawlerSession, get_session
+
+# Runs inside the browser and returns only the hrefs, so the listing page is
+# never serialized out of the browser as a whole
+DOWNLOAD_LINKS_JS = (
+    "return Array.from(document.querySelectorAll('a.downloadBtn[href]'),"
+    " a => a.getAttribute('href'));"
+)
+
+EXTRACTION_MODES = ("scan", "strainer", "soup")
+
+
+class _DownloadLinkScanner(HTMLParser):
+    """Collects `a.downloadBtn` hrefs from start-tag events, without a tree."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        attrs = dict(attrs)
+        if "downloadBtn" in (attrs.get("class") or "").split() and attrs.get("href"):
+            self.hrefs.append(attrs["href"])
+
+
+class _PaginationScanner(HTMLParser):
+    """Collects the `data-page` numbers of the `button.paginationBtn` tags."""
+
+    def __init__(self):
+        super().__init__()
+        self.pages = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "button":
+            return
+        attrs = dict(attrs)
+        page = attrs.get("data-page") or ""
+        if "paginationBtn" in (attrs.get("class") or "").split() and page.isdigit():
+            self.pages.add(int(page))
+
+
+def reported_pages(html: str) -> int:
+    """The number of listing pages the page's pagination offers (at least 1)."""
+    scanner = _PaginationScanner()
+    scanner.feed(html)
+    scanner.close()
+    return max(scanner.pages, default=1)
+
+
+def _download_hrefs(html: str, mode: str) -> list[str]:
+    if mode == "scan":
+        scanner = _DownloadLinkScanner()
+        scanner.feed(html)
+        scanner.close()
+        return scanner.hrefs
+    if mode == "strainer":
+        # Only anchors are turned into tree nodes
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a"))
+    elif mode == "soup":
+        soup = BeautifulSoup(html, "html.parser")
+    else:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+    return [
+        a_tag["href"]
+        for a_tag in soup.find_all("a", class_="downloadBtn")
+        if a_tag.has_attr("href")
+    ]
+
+
+def extract_download_links(
+    html: str, download_base_url: str, mode: str = "scan"
+) -> list[str]:
+    """
+    Extract the absolute `a.downloadBtn` links from a listing page.
+
+    mode "scan" only listens to start tags, "strainer" builds a tree of the
+    anchors alone and "soup" parses the whole page (the old behaviour).
+    """
+    return [urljoin(download_base_url, href) for href in _download_hrefs(html, mode)]
+
+
+def links_from_driver(driver, download_base_url: str) -> list[str]:
+    """Extract the download links with a query inside the browser."""
+    hrefs = driver.execute_script(DOWNLOAD_LINKS_JS) or []
+    return [urljoin(download_base_url, href) for href in hrefs]
+
+
+def parse_branch_options(html: str) -> dict[str, str]:
+    """Map each `#branch_filter` option value to its display name."""
+    only_select = SoupStrainer("select", id="branch_filter")
+    soup = BeautifulSoup(html, "html.parser", parse_only=only_select)
+    select = soup.find("select", id="branch_filter")
+    if select is None:
+        return {}
+    return {
+        option["value"]: option.get_text(strip=True)
+        for option in select.find_all("option")
+        if option.get("value")
+    }
+
+
+def link_matches(link: str, branch: str, category: str) -> bool:
+    """
+    Price file names carry their category and store, e.g.
+    `PriceFull7290055700007-0084-202508120300.gz`, so a listing can be
+    filtered without the site's dropdowns.
+    """
+    filename = os.path.basename(link).lower()
+    return filename.startswith(category.lower()) and f"-{branch}-" in filename
+
+
+class ListingError(Exception):
+    """The site ignored the listing's query parameters, so it isn't complete."""
+
+
+class HttpListing:
+    """
+    Enumerates download links by requesting the listing page directly instead
+    of driving a browser through the branch/category dropdowns and the
+    pagination buttons.
+
+    Filter and page values are sent as query parameters; links are also
+    filtered by file name, so a single-page listing works whether the site
+    filters on the server or only in the browser. A listing of several pages
+    is only used once the parameters are known to work (see `pages()`).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        download_base_url: str,
+        session: Optional[CrawlerSession] = None,
+        page_param: str = "page",
+        branch_param: Optional[str] = "branch",
+        category_param: Optional[str] = "cat",
+    ):
+        self.url = url
+        self.download_base_url = download_base_url
+        self.session = session or get_session()
+        self.page_param = page_param
+        self.branch_param = branch_param
+        self.category_param = category_param
+
+    def fetch(self, branch=None, category=None, page=1) -> str:
+        params = {self.page_param: page}
+        if branch and self.branch_param:
+            params[self.branch_param] = branch
+        if category and self.category_param:
+            params[self.category_param] = category
+        response = self.session.get(self.url, params=params)
+        response.raise_for_status()
+        return response.text
+
+    def branch_names(self) -> dict[str, str]:
+        return parse_branch_options(self.fetch())
+
+    def pages(self, branch: str, category: str, max_pages: int) -> Iterator[list]:
+        """
+        Yields the matching links of each listing page. Stops at max_pages,
+        at the last page the pagination offers, at a page without matches,
+        or when a page repeats links already seen.
+
+        Before anything is yielded, the query parameters are checked against
+        the pages the listing spans: a listing of several pages must only
+        hold the requested branch and category, and its page 2 must differ
+        from page 1. Otherwise the file names that happen to match on the
+        first page are only part of the files, and ListingError is raised.
+        """
+        first = self.fetch(branch, category, 1)
+        first_links = extract_download_links(first, self.download_base_url)
+        reported = reported_pages(first)
+        if reported > 1 and not all(
+            link_matches(link, branch, category) for link in first_links
+        ):
+            raise ListingError(
+                f"{self.url} ignored the {branch}/{category} filter parameters"
+            )
+        last_page = min(max_pages, reported)
+        fetched = [first_links]
+        if last_page > 1:
+            second_links = extract_download_links(
+                self.fetch(branch, category, 2), self.download_base_url
+            )
+            if second_links == first_links:
+                raise ListingError(f"{self.url} ignored the page parameter")
+            fetched.append(second_links)
+
+        seen = set()
+        for page in range(1, last_page + 1):
+            if page <= len(fetched):
+                page_links = fetched[page - 1]
+            else:
+                page_links = extract_download_links(
+                    self.fetch(branch, category, page), self.download_base_url
+                )
+            links = [
+                link
+                for link in page_links
+                if link_matches(link, branch, category) and link not in seen
+            ]
+            if not links:
+                return
+            seen.update(links)
+            yield links
@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+DEFAULT_MANIFEST_PATH = os.path.join("prices", "crawl_manifest.sqlite3")
+
+
+class Unchanged:
+    """Returned instead of a path when the server says a file has not changed."""
+
+    def __init__(self, link: str):
+        self.link = link
+
+    def __repr__(self):
+        return f"Unchanged({self.link!r})"
+
+
+class CrawlManifest:
+    """
+    Persistent record of every price file the crawler has processed, keyed by
+    link. Stores the ETag, Last-Modified, size and SHA-256 of each download so
+    re-crawls can send conditional requests and skip unchanged files.
+
+    Metadata of a fresh download is only staged; call `commit` once the file
+    has been processed so a failed conversion is retried on the next crawl.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Worker processes open their own connection to the same file
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    link TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER,
+                    content_hash TEXT,
+                    output_path TEXT,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def lookup(self, link: str) -> Optional[dict]:
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT filename, etag, last_modified, size, content_hash, "
+                "output_path FROM files WHERE link = ?",
+                (link,),
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        keys = (
+            "filename",
+            "etag",
+            "last_modified",
+            "size",
+            "content_hash",
+            "output_path",
+        )
+        return dict(zip(keys, row))
+
+    def conditional_headers(self, link: str) -> dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for a known link."""
+        entry = self.lookup(link)
+        # Without the processed output there is nothing to skip to
+        if not entry or not (
+            entry["output_path"] and os.path.exists(entry["output_path"])
+        ):
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def has_content(self, link: str, content_hash: str) -> bool:
+        """True if the processed file for link had exactly this content."""
+        entry = self.lookup(link)
+        return bool(
+            entry
+            and entry["content_hash"] == content_hash
+            and entry["output_path"]
+            and os.path.exists(entry["output_path"])
+        )
+
+    def stage(self, link, filename, etag, last_modified, size, content_hash):
+        """Remember a download's metadata until it has been processed."""
+        with self._lock:
+            self._pending[link] = (filename, etag, last_modified, size, content_hash)
+
+    def discard(self, link: str):
+        with self._lock:
+            self._pending.pop(link, None)
+
+    def commit(self, link: str, output_path: str):
+        """Persist the staged metadata of link once output_path is written."""
+        with self._lock:
+            staged = self._pending.pop(link, None)
+            if staged is None:
+                return
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (link, filename, etag, "
+                    "last_modified, size, content_hash, output_path, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        link,
+                        *staged,
+                        output_path,
+                        datetime.now(timezone.utc).isoformat(),
+                    ),
+                )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
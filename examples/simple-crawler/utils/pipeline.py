@@ -0,0 +1,311 @@
+import os
+import threading
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Optional
+from urllib.parse import urlparse
+
+from . import (
+    convert_xml_to_json,
+    download_and_convert,
+    download_file_from_link,
+    extract_and_delete_gz,
+)
+from .columnar import convert_xml_to_columnar
+from .manifest import CrawlManifest, Unchanged
+from .session import get_session
+
+
+class HostLimiter:
+    """Caps how many downloads may hit the same host at once."""
+
+    def __init__(self, per_host_limit: int):
+        self.per_host_limit = per_host_limit
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def for_link(self, link: str) -> threading.BoundedSemaphore:
+        host = urlparse(link).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self.per_host_limit
+                )
+            return self._semaphores[host]
+
+
+def _download(link, output_dir, limiter, manifest):
+    with limiter.for_link(link):
+        return download_file_from_link(link, output_dir, manifest=manifest)
+
+
+def _download_and_convert(
+    parsers, link, output_dir, limiter, manifest, output_format
+):
+    # The host slot is held while a worker process streams and parses the file
+    with limiter.for_link(link):
+        output_path, http_stats = parsers.submit(
+            _fused_job, link, output_dir, manifest, output_format
+        ).result()
+    # The worker's requests don't show up in this process's session otherwise
+    get_session().add_worker_stats(http_stats)
+    return output_path
+
+
+def _fused_job(link, output_dir, manifest, output_format):
+    """Runs in a worker process; also returns the HTTP stats of this file."""
+    session = get_session()
+    before = session.stats()
+    output_path = download_and_convert(
+        link,
+        output_dir,
+        session=session,
+        manifest=manifest,
+        output_format=output_format,
+    )
+    return output_path, session.stats_since(before)
+
+
+def _extract_and_convert(gz_path, overwrite, output_format):
+    """Runs in a worker process: the CPU-bound half of the pipeline."""
+    xml_path = extract_and_delete_gz(gz_path)
+    if not xml_path:
+        return None
+    if output_format != "json":
+        paths = convert_xml_to_columnar(xml_path, output_format)
+        return paths[0] if paths else xml_path
+    return convert_xml_to_json(xml_path, overwrite=overwrite)
+
+
+class CrawlPipeline:
+    """
+    The download threads and parse processes of one crawl. Pages are handed
+    to `submit()` as they are listed, so the pools start once per crawl
+    instead of once per page, and a slow file on one page doesn't hold back
+    the next. Use it as a context manager; the pools are shut down on exit.
+    """
+
+    def __init__(
+        self,
+        download_workers: int = 8,
+        parse_workers: Optional[int] = None,
+        per_host_limit: int = 4,
+        fused: bool = False,
+        output_format: str = "json",
+        limiter: Optional[HostLimiter] = None,
+    ):
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers or os.cpu_count()
+        self.fused = fused
+        self.output_format = output_format
+        self.limiter = limiter or HostLimiter(per_host_limit)
+        self._downloaders = None
+        self._parsers = None
+        self._batches = None
+
+    def __enter__(self):
+        self._downloaders = ThreadPoolExecutor(max_workers=self.download_workers)
+        self._parsers = ProcessPoolExecutor(max_workers=self.parse_workers)
+        # Only waits on the other two pools, one thread per batch in flight
+        self._batches = ThreadPoolExecutor(max_workers=self.download_workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._batches:
+            self._batches.shutdown()
+            self._batches = None
+        if self._downloaders:
+            self._downloaders.shutdown()
+            self._downloaders = None
+        if self._parsers:
+            self._parsers.shutdown()
+            self._parsers = None
+
+    def submit(
+        self,
+        links: list[str],
+        output_dir: str,
+        manifest: Optional[CrawlManifest] = None,
+    ) -> Future:
+        """
+        Starts downloading and converting one batch of links on the running
+        pools and returns right away. Safe to call from several threads.
+
+        Returns:
+            A future of the batch's (successful, failed, skipped) counts;
+            every link is counted exactly once
+        """
+        if self._batches is None:
+            raise RuntimeError("CrawlPipeline is not running; use it in a with block")
+        run = _run_fused if self.fused else _run_staged
+        return self._batches.submit(
+            run,
+            links,
+            output_dir,
+            self.limiter,
+            manifest,
+            self.output_format,
+            self._downloaders,
+            self._parsers,
+        )
+
+    def process(
+        self,
+        links: list[str],
+        output_dir: str,
+        manifest: Optional[CrawlManifest] = None,
+    ) -> tuple[int, int, int]:
+        """Like submit(), but waits for the batch and returns its counts."""
+        return self.submit(links, output_dir, manifest).result()
+
+
+def process_links_concurrently(
+    links: list[str],
+    output_dir: str,
+    download_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    per_host_limit: int = 4,
+    fused: bool = False,
+    manifest: Optional[CrawlManifest] = None,
+    output_format: str = "json",
+    limiter: Optional[HostLimiter] = None,
+) -> tuple[int, int, int]:
+    """
+    Downloads links on a thread pool and hands every finished file to a
+    process pool for extraction and XML-to-JSON conversion. The pools only
+    live for this call; crawls that process many pages should keep one
+    CrawlPipeline open instead.
+
+    Args:
+        links: Download URLs
+        output_dir: Directory the files are saved to
+        download_workers: Threads used for network-bound downloads
+        parse_workers: Processes used for parsing (defaults to the CPU count)
+        per_host_limit: Maximum concurrent downloads against a single host
+        fused: Stream each response through gzip and the XML parser in a
+            worker process (`download_and_convert`) instead of saving the .gz
+            and the decompressed XML first
+        manifest: Crawl manifest used to skip files unchanged since the last
+            crawl; processed files are recorded in it
+        output_format: "json", or "parquet" / "arrow" for typed columnar files
+        limiter: A HostLimiter shared with other crawls running at the same
+            time, so their downloads count against one per-host cap
+            (per_host_limit is ignored then)
+
+    Returns:
+        (successful, failed, skipped) counts; every link is counted exactly once
+    """
+    with CrawlPipeline(
+        download_workers=download_workers,
+        parse_workers=parse_workers,
+        per_host_limit=per_host_limit,
+        fused=fused,
+        output_format=output_format,
+        limiter=limiter,
+    ) as pipeline:
+        return pipeline.process(links, output_dir, manifest)
+
+
+def _run_staged(
+    links, output_dir, limiter, manifest, output_format, downloaders, parsers
+):
+    successful = 0
+    failed = 0
+    skipped = 0
+    download_futures = {
+        downloaders.submit(_download, link, output_dir, limiter, manifest): link
+        for link in links
+    }
+    parse_futures = {}
+
+    # Parsing starts as soon as each download lands
+    for future in as_completed(download_futures):
+        link = download_futures[future]
+        try:
+            output_path = future.result()
+        except Exception as e:
+            print(f"❌ Error downloading {link}: {e}")
+            output_path = None
+
+        if isinstance(output_path, Unchanged):
+            skipped += 1
+        elif output_path:
+            parse_future = parsers.submit(
+                _extract_and_convert,
+                output_path,
+                manifest is not None,
+                output_format,
+            )
+            parse_futures[parse_future] = (link, output_path)
+        else:
+            failed += 1
+            print(f"❌ Failed to download: {link}")
+
+    for future in as_completed(parse_futures):
+        link, output_path = parse_futures[future]
+        try:
+            json_path = future.result()
+        except Exception as e:
+            json_path = None
+            print(f"❌ Error processing {output_path}: {e}")
+        else:
+            if not json_path:
+                print(f"❌ Could not extract: {output_path}")
+
+        if json_path:
+            successful += 1
+            print(f"✅ Successfully processed: {json_path}")
+            if manifest:
+                manifest.commit(link, json_path)
+        else:
+            failed += 1
+            if manifest:
+                manifest.discard(link)
+
+    return successful, failed, skipped
+
+
+def _run_fused(
+    links, output_dir, limiter, manifest, output_format, downloaders, parsers
+):
+    successful = 0
+    failed = 0
+    skipped = 0
+    futures = {
+        downloaders.submit(
+            _download_and_convert,
+            parsers,
+            link,
+            output_dir,
+            limiter,
+            manifest,
+            output_format,
+        ): link
+        for link in links
+    }
+    for future in as_completed(futures):
+        link = futures[future]
+        try:
+            json_path = future.result()
+        except Exception as e:
+            print(f"❌ Error processing {link}: {e}")
+            failed += 1
+            continue
+
+        if isinstance(json_path, Unchanged):
+            skipped += 1
+        elif json_path:
+            successful += 1
+            print(f"✅ Successfully processed: {json_path}")
+        else:
+            failed += 1
+            print(f"❌ Failed to download: {link}")
+
+    return successful, failed, skipped
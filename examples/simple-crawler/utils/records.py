@@ -0,0 +1,92 @@
+import sys
+
+from .columnar import PRICE_COLUMNS, PROMO_COLUMNS, iter_price_records
+
+# Codes and short labels repeat across many rows (every row of a file shares
+# its chain and store), so one shared string object is kept per value
+INTERNED_FIELDS = {
+    "chain_id",
+    "sub_chain_id",
+    "store_id",
+    "item_code",
+    "manufacturer",
+    "unit_qty",
+    "unit_of_measure",
+    "item_status",
+    "promotion_id",
+    "reward_type",
+}
+
+
+class _Record:
+    """
+    Fixed-field record without a per-instance __dict__. Records compare and
+    hash by their field values, so they can go in sets and be dict keys;
+    don't change a record's fields while it is in one.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            value = row[name]
+            if name in INTERNED_FIELDS and value is not None:
+                value = sys.intern(value)
+            setattr(self, name, value)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, n) for n in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class PriceItem(_Record):
+    """One `<Item>`: prices and quantities as floats, dates as datetimes."""
+
+    __slots__ = tuple(PRICE_COLUMNS)
+
+
+class PromotionItem(_Record):
+    """One promoted item code of a `<Promotion>`."""
+
+    __slots__ = tuple(PROMO_COLUMNS)
+
+
+RECORD_TYPES = {"prices": PriceItem, "promos": PromotionItem}
+
+
+class PriceRecords:
+    """The compact records of one or more price files."""
+
+    def __init__(self):
+        self.items = []
+        self.promotions = []
+
+    def __len__(self):
+        return len(self.items) + len(self.promotions)
+
+    def extend(self, source):
+        """Adds the records of an XML file path or byte stream."""
+        lists = {"prices": self.items, "promos": self.promotions}
+        for kind, row in iter_price_records(source):
+            lists[kind].append(RECORD_TYPES[kind](row))
+        return self
+
+
+def load_records(source) -> PriceRecords:
+    """
+    Builds compact `PriceItem` / `PromotionItem` records straight from the
+    XML stream of a price file, with numbers parsed once and codes interned,
+    instead of the nested string dicts of `convert_xml_to_json`.
+    """
+    return PriceRecords().extend(source)
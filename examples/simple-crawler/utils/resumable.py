@@ -0,0 +1,307 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from typing import Optional
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+PART_SUFFIX = ".part"
+
+# A dropped connection or stalled read; the bytes received so far are kept
+RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+    ProtocolError,
+    ReadTimeoutError,
+)
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+
+class IntegrityError(Exception):
+    """The downloaded bytes do not match the size or checksum announced."""
+
+
+class Download:
+    """Outcome of `fetch_to_file`; `path` is only set for a complete file."""
+
+    def __init__(self, status_code, headers, path=None, size=0, sha256=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def _validator(headers) -> Optional[str]:
+    """A validator for If-Range; weak ETags are not allowed there."""
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _resumable(response) -> bool:
+    # Ranges count encoded bytes, so only identity-encoded bodies can resume
+    return (
+        response.headers.get("Accept-Ranges", "bytes").lower() != "none"
+        and not response.headers.get("Content-Encoding")
+        and _validator(response.headers) is not None
+    )
+
+
+def _content_range(response):
+    """(first byte, total size or None) of a 206 response."""
+    match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), None if total == "*" else int(total)
+
+
+def _expected_size(response) -> Optional[int]:
+    if response.headers.get("Content-Encoding"):
+        return None
+    if response.status_code == 206:
+        return _content_range(response)[1]
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _announced_checksums(headers) -> dict[str, bytes]:
+    """Checksums from Content-MD5 and Digest headers, keyed by hashlib name."""
+    checksums = {}
+    if headers.get("Content-MD5"):
+        checksums["md5"] = headers["Content-MD5"]
+    for part in headers.get("Digest", "").split(","):
+        algorithm, _, value = part.strip().partition("=")
+        algorithm = {"sha-256": "sha256", "md5": "md5"}.get(algorithm.lower())
+        if algorithm and value:
+            checksums[algorithm] = value
+    decoded = {}
+    for algorithm, value in checksums.items():
+        try:
+            decoded[algorithm] = base64.b64decode(value, validate=True)
+        except ValueError:
+            continue
+    return decoded
+
+
+def _file_digest(path, algorithm, chunk_size=1024 * 1024):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest
+
+
+def _verify(path, size, expected_size, sha256, response):
+    if expected_size is not None and size != expected_size:
+        raise IntegrityError(f"got {size} of {expected_size} bytes")
+    if response.status_code == 206:
+        # The checksums of a partial response describe the range, not the file
+        return
+    headers = response.headers
+    for algorithm, expected in _announced_checksums(headers).items():
+        if algorithm == "sha256":
+            actual = sha256.digest()
+        else:
+            actual = _file_digest(path, algorithm).digest()
+        if actual != expected:
+            raise IntegrityError(f"{algorithm} checksum mismatch")
+
+
+def _load_state(state_path, link):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("url") == link else None
+
+
+def _save_state(state_path, state):
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _discard(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def fetch_to_file(
+    session, link, output_path, headers=None, max_resumes: int = 5
+) -> Download:
+    """
+    Downloads link into `<output_path>.part` and renames it to output_path
+    only once its size and any announced checksum (Content-MD5, Digest) are
+    verified, so a truncated file is never left under the final name. A
+    resumed download only has its size checked, as the checksums sent with a
+    206 cover the range rather than the whole file.
+
+    A dropped connection resumes with a Range request (guarded by If-Range)
+    from the bytes already on disk, up to max_resumes times. The partial file
+    and its `.part.json` state survive the process, so the next crawl also
+    resumes instead of starting from zero.
+
+    headers (e.g. conditional ones) are only sent when starting from scratch.
+    Any status other than 200/206 is returned as is, without a path.
+    """
+    part_path = output_path + PART_SUFFIX
+    state_path = part_path + ".json"
+    state = _load_state(state_path, link)
+    if state is None:
+        _discard(part_path, state_path)
+    attempts = 0
+
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset and state:
+            request_headers = {
+                "Range": f"bytes={offset}-",
+                "If-Range": state["validator"],
+            }
+            print(f"🔁 Resuming {link} from byte {offset}")
+        else:
+            offset = 0
+            request_headers = dict(headers or {})
+
+        try:
+            with session.get(link, stream=True, headers=request_headers) as response:
+                if response.status_code == 416:
+                    # The partial file no longer fits the remote one
+                    _discard(part_path, state_path)
+                    state = None
+                    attempts += 1
+                    if attempts > max_resumes:
+                        return Download(response.status_code, response.headers)
+                    continue
+                if response.status_code == 206 and offset:
+                    start, _ = _content_range(response)
+                    if start != offset:
+                        raise IntegrityError(f"range starts at {start}, not {offset}")
+                    mode = "ab"
+                    sha256 = _file_digest(part_path, "sha256")
+                elif response.status_code == 200:
+                    # Full body: either a fresh start or the file changed remotely
+                    offset = 0
+                    mode = "wb"
+                    sha256 = hashlib.sha256()
+                    state = None
+                    if _resumable(response):
+                        state = {
+                            "url": link,
+                            "validator": _validator(response.headers),
+                        }
+                        _save_state(state_path, state)
+                    else:
+                        _discard(state_path)
+                else:
+                    return Download(response.status_code, response.headers)
+
+                expected_size = _expected_size(response)
+                size = offset
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=session.chunk_size):
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        size += len(chunk)
+                _verify(part_path, size, expected_size, sha256, response)
+        except RESUMABLE_ERRORS as e:
+            attempts += 1
+            if not state or attempts > max_resumes:
+                raise
+            print(f"⚠️ Download of {link} interrupted ({e})")
+            time.sleep(min(0.5 * 2**attempts, 10))
+            continue
+        except IntegrityError as e:
+            # Corrupt partial data cannot be resumed; start over from zero
+            _discard(part_path, state_path)
+            state = None
+            attempts += 1
+            if attempts > max_resumes:
+                raise
+            print(f"⚠️ Discarding download of {link}: {e}")
+            continue
+
+        os.replace(part_path, output_path)
+        _discard(state_path)
+        return Download(
+            response.status_code, response.headers, output_path, size, sha256
+        )
+
+
+class ResumingReader(io.RawIOBase):
+    """
+    Raw byte stream over a streaming response that re-requests the rest of
+    the body with a Range request when the connection drops, so a parser
+    reading it never notices the interruption.
+    """
+
+    def __init__(self, session, link, response, prepare_raw, max_resumes=5):
+        self.session = session
+        self.link = link
+        self.response = response
+        self.prepare_raw = prepare_raw
+        self.max_resumes = max_resumes
+        self.validator = _validator(response.headers)
+        self.resumable = _resumable(response)
+        self.expected_size = _expected_size(response)
+        self.raw = prepare_raw(response)
+        self.position = 0
+        self.resumes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            try:
+                n = self.raw.readinto(buffer)
+            except RESUMABLE_ERRORS as e:
+                self._resume(e)
+                continue
+            self.position += n
+            if n == 0 and self.expected_size not in (None, self.position):
+                raise IntegrityError(
+                    f"{self.link}: got {self.position} of {self.expected_size} bytes"
+                )
+            return n
+
+    def _resume(self, error):
+        self.response.close()
+        while True:
+            self.resumes += 1
+            if not self.resumable or self.resumes > self.max_resumes:
+                raise error
+            print(f"🔁 Resuming {self.link} from byte {self.position} ({error})")
+            time.sleep(min(0.5 * 2**self.resumes, 10))
+            try:
+                self.response = self.session.get(
+                    self.link,
+                    stream=True,
+                    headers={
+                        "Range": f"bytes={self.position}-",
+                        "If-Range": self.validator,
+                    },
+                )
+                break
+            except RESUMABLE_ERRORS as e:
+                error = e
+        start, _ = _content_range(self.response)
+        if self.response.status_code != 206 or start != self.position:
+            self.response.close()
+            raise IntegrityError(f"{self.link} changed while it was being read")
+        self.raw = self.prepare_raw(self.response)
+
+    def close(self):
+        self.response.close()
+        super().close()
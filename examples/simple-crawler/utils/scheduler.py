@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+CrawlJob = namedtuple("CrawlJob", ["chain", "branch", "category"])
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.jobs_done = 0
+
+
+class DriverPool:
+    """
+    A fixed-size pool of long-lived WebDriver sessions. A driver is recycled
+    (quit and replaced on next use) after `max_jobs_per_driver` jobs or as
+    soon as a job crashes it.
+    """
+
+    def __init__(self, driver_factory, size: int = 4, max_jobs_per_driver: int = 20):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_jobs_per_driver = max_jobs_per_driver
+        self.drivers_started = 0
+        self.drivers_recycled = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._idle.put(None)  # slot without a running driver yet
+
+    def acquire(self) -> _PooledDriver:
+        pooled = self._idle.get()
+        if pooled is None:
+            try:
+                pooled = _PooledDriver(self.driver_factory())
+            except Exception:
+                self._idle.put(None)
+                raise
+            with self._lock:
+                self.drivers_started += 1
+        return pooled
+
+    def release(self, pooled: _PooledDriver, crashed: bool = False):
+        pooled.jobs_done += 1
+        if crashed or pooled.jobs_done >= self.max_jobs_per_driver:
+            self._quit(pooled)
+            with self._lock:
+                self.drivers_recycled += 1
+            self._idle.put(None)
+        else:
+            self._idle.put(pooled)
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Error closing Chrome driver: {e}")
+
+    def close(self):
+        for _ in range(self.size):
+            pooled = self._idle.get()
+            if pooled is not None:
+                self._quit(pooled)
+
+
+def run_jobs(
+    jobs: list[CrawlJob],
+    run_job,
+    driver_factory,
+    pool_size: int = 4,
+    max_jobs_per_driver: int = 20,
+    retries: int = 1,
+) -> dict:
+    """
+    Runs every job on a pool of reusable WebDriver sessions.
+
+    Args:
+        jobs: (chain, branch, category) jobs
+        run_job: Callable (driver, job) -> the result dict of `crawl_category`
+        driver_factory: Callable that starts a new WebDriver
+        pool_size: Number of drivers, and so of jobs running at once
+        max_jobs_per_driver: Jobs after which a driver is recycled
+        retries: Extra attempts, each on a fresh driver, for a crashed job
+
+    Returns:
+        Aggregated run summary with totals and every per-job result
+    """
+    pool = DriverPool(driver_factory, pool_size, max_jobs_per_driver)
+    start = time.perf_counter()
+
+    def attempt(job):
+        error = None
+        for attempt_num in range(retries + 1):
+            try:
+                pooled = pool.acquire()
+            except Exception as e:
+                print(f"❌ Could not start a driver for {job}: {e}")
+                error = e
+                continue
+            try:
+                result = run_job(pooled.driver, job)
+            except Exception as e:
+                pool.release(pooled, crashed=True)
+                print(f"❌ {job} failed on attempt {attempt_num + 1}: {e}")
+                error = e
+                continue
+            pool.release(pooled)
+            return dict(result, chain=job.chain, branch=job.branch)
+        return {"job": job, "error": str(error)}
+
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            outcomes = list(executor.map(attempt, jobs))
+    finally:
+        pool.close()
+
+    results = [o for o in outcomes if "error" not in o]
+    errors = [o for o in outcomes if "error" in o]
+    return {
+        "jobs": len(jobs),
+        "completed_jobs": len(results),
+        "failed_jobs": errors,
+        "successful_downloads": sum(r["successful_downloads"] for r in results),
+        "failed_downloads": sum(r["failed_downloads"] for r in results),
+        "skipped_unchanged": sum(r.get("skipped_unchanged", 0) for r in results),
+        "pages_processed": sum(r["pages_processed"] for r in results),
+        "drivers_started": pool.drivers_started,
+        "drivers_recycled": pool.drivers_recycled,
+        "elapsed_seconds": time.perf_counter() - start,
+        "results": results,
+    }
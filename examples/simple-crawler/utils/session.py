@@ -0,0 +1,150 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_CHUNK_SIZE = 8192
+DEFAULT_USER_AGENT = "Mozilla/5.0"
+
+
+class CrawlerSession:
+    """
+    A pooled keep-alive HTTP session shared by every download in the crawler.
+
+    Connections to the same host are reused, and failed requests (5xx
+    responses, connection errors and timeouts) are retried with exponential
+    backoff.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = 30,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.user_agent = user_agent
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry_strategy = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False,
+        )
+        self.reset()
+
+    def reset(self):
+        """Start over with a fresh connection pool and zeroed statistics."""
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": self.user_agent})
+        self.adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.retry_strategy,
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        # Requests made by worker processes on their own copy of the session
+        self._stats_lock = threading.Lock()
+        self._worker_stats = {"requests": 0, "connections_opened": 0}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.head(url, **kwargs)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return how many requests were sent and how many reused a connection,
+        including those reported with `add_worker_stats`.
+        """
+        pools = self.adapter.poolmanager.pools
+        with self._stats_lock:
+            requests_sent = self._worker_stats["requests"]
+            connections_opened = self._worker_stats["connections_opened"]
+        for key in pools.keys():
+            pool = pools[key]
+            requests_sent += pool.num_requests
+            connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0),
+        }
+
+    def add_worker_stats(self, stats: dict[str, int]):
+        """Count requests a worker process made (see `stats_since`)."""
+        with self._stats_lock:
+            self._worker_stats["requests"] += stats["requests"]
+            self._worker_stats["connections_opened"] += stats["connections_opened"]
+
+    def stats_since(self, before: dict[str, int]) -> dict[str, int]:
+        """Requests and new connections since an earlier `stats()` snapshot."""
+        after = self.stats()
+        return {
+            "requests": after["requests"] - before["requests"],
+            "connections_opened": after["connections_opened"]
+            - before["connections_opened"],
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(
+            f"🔌 HTTP: {stats['requests']} requests over "
+            f"{stats['connections_opened']} connections "
+            f"({stats['connections_reused']} reused)"
+        )
+
+    def close(self):
+        self.session.close()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> CrawlerSession:
+    """Return the shared session, creating it with defaults on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CrawlerSession()
+        return _session
+
+
+def _reset_session_after_fork():
+    # A forked worker keeps the configuration but must not share the
+    # parent's pooled sockets
+    global _session_lock
+    _session_lock = threading.Lock()
+    if _session is not None:
+        _session.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session_after_fork)
+
+
+def configure_session(**kwargs) -> CrawlerSession:
+    """Replace the shared session with one built from `CrawlerSession` kwargs."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = CrawlerSession(**kwargs)
+        return _session
@@ -0,0 +1,308 @@
+import io
+import json
+import mmap
+import os
+import re
+import shutil
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from . import RECORD_TAGS, _atomic_write, _elem_to_dict
+from .columnar import FORMAT_SUFFIXES, concat_columnar, write_columnar
+
+# Below this much record data per shard, process start-up outweighs the gain
+MIN_SHARD_BYTES = 8 * 2**20
+SHARDS_PER_WORKER = 2  # a little slack so one slow shard doesn't idle the rest
+
+_PLACEHOLDER = "ShardedRecords__"
+
+
+class _ShardLayout:
+    """
+    Byte layout of a price file: the text before the first record (`prefix`),
+    the record region split at record starts, and the text after the last
+    record (`suffix`). prefix + any slice of the region + suffix is again a
+    well-formed document with the same header and a subset of the records.
+    """
+
+    def __init__(self, tag, prefix, suffix, bounds):
+        self.tag = tag
+        self.prefix = prefix
+        self.suffix = suffix
+        self.bounds = bounds  # [(start, end)] byte ranges of the record region
+
+
+def _start_pattern(tag):
+    return re.compile(rb"<" + re.escape(tag.encode()) + rb"[\s/>]")
+
+
+def _find_layout(path, record_tags, shards) -> Optional[_ShardLayout]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # The record tag that occurs first is the outer one (a Promotion
+        # contains Items, not the other way around)
+        found = []
+        for tag in record_tags:
+            match = _start_pattern(tag).search(mm)
+            if match:
+                found.append((match.start(), tag))
+        if not found:
+            return None
+        first, tag = min(found)
+        closing = f"</{tag}>".encode()
+        last = mm.rfind(closing)
+        if last < first:
+            return None
+        region_end = last + len(closing)
+
+        pattern = _start_pattern(tag)
+        starts = [first]
+        for i in range(1, shards):
+            target = first + (region_end - first) * i // shards
+            match = pattern.search(mm, max(target, starts[-1] + 1), region_end)
+            if match and match.start() > starts[-1]:
+                starts.append(match.start())
+        bounds = list(zip(starts, starts[1:] + [region_end]))
+        return _ShardLayout(tag, mm[:first], mm[region_end:], bounds)
+
+
+class _ShardReader(io.RawIOBase):
+    """Reads prefix + file[start:end] + suffix as one byte stream."""
+
+    def __init__(self, path, prefix, start, end, suffix):
+        self.file = open(path, "rb")
+        self.file.seek(start)
+        self.pieces = [io.BytesIO(prefix), _LimitedReader(self.file, end - start)]
+        self.pieces.append(io.BytesIO(suffix))
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.pieces:
+            n = self.pieces[0].readinto(buffer)
+            if n:
+                return n
+            self.pieces.pop(0)
+        return 0
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+class _LimitedReader:
+    def __init__(self, f, remaining):
+        self.f = f
+        self.remaining = remaining
+
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self.remaining]
+        n = self.f.readinto(view)
+        self.remaining -= n
+        return n
+
+
+class _ShardConflict(Exception):
+    """The record region holds more than the records of one container."""
+
+
+def _json_shard(
+    path, layout, start, end, fragment_path, indent, expected_others, expected_elements
+):
+    """
+    Runs in a worker process: writes the JSON of each record of one shard,
+    exactly as `json.dump(..., indent=2)` formats list members at `indent`.
+
+    Raises _ShardConflict when the shard doesn't look like the skeleton plus
+    records of one container, e.g. when the record region spans the end of
+    one container and the start of the next.
+    """
+    tag = layout.tag
+    count = 0
+    elements = 0  # elements outside the records
+    stack = []
+    container = None
+    with open(fragment_path, "w", encoding="utf-8") as out, _ShardReader(
+        path, layout.prefix, start, end, layout.suffix
+    ) as source:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if elem.tag != tag:
+                if not any(ancestor.tag == tag for ancestor in stack):
+                    elements += 1
+                if elem is container and len(elem) != expected_others:
+                    # Records were removed; what is left came from prefix/suffix
+                    raise _ShardConflict("other elements between records")
+                continue
+            if container is None:
+                container = parent
+            if parent is None or parent is not container:
+                raise _ShardConflict(f"<{tag}> records in more than one container")
+            text = json.dumps(_elem_to_dict(elem)[tag], ensure_ascii=False, indent=2)
+            if count:
+                out.write(",\n")
+            out.write(indent + text.replace("\n", "\n" + indent))
+            count += 1
+            parent.remove(elem)
+            elem.clear()
+    if elements != expected_elements:
+        raise _ShardConflict("records are not inside one container")
+    return count
+
+
+def _skeleton(layout):
+    """
+    The document without its records, with a placeholder where they were.
+    Returns (json text, number of other children of the records' container,
+    number of elements besides the placeholder).
+    """
+    root = ET.fromstring(layout.prefix + f"<{_PLACEHOLDER}/>".encode() + layout.suffix)
+    for parent in root.iter():
+        tags = [child.tag for child in parent]
+        if _PLACEHOLDER in tags:
+            if layout.tag in tags:
+                raise _ShardConflict(f"<{layout.tag}> outside the record region")
+            text = json.dumps(_elem_to_dict(root), ensure_ascii=False, indent=2)
+            return text, len(parent) - 1, sum(1 for _ in root.iter()) - 1
+    raise _ShardConflict("records are not inside one container")
+
+
+def _shard_count(layout_size, workers, min_shard_bytes):
+    return max(1, min(workers * SHARDS_PER_WORKER, layout_size // min_shard_bytes))
+
+
+def _convert_json(xml_file_path, layout, executor):
+    skeleton, expected_others, expected_elements = _skeleton(layout)
+    marker = f'"{_PLACEHOLDER}": null'
+    position = skeleton.index(marker)
+    line_start = skeleton.rindex("\n", 0, position) + 1
+    indent = skeleton[line_start:position] + "  "
+
+    json_file_path = xml_file_path + ".json"
+    fragments = [f"{json_file_path}.shard{i:03d}" for i in range(len(layout.bounds))]
+    jobs = [
+        (
+            xml_file_path,
+            layout,
+            start,
+            end,
+            fragment,
+            indent,
+            expected_others,
+            expected_elements,
+        )
+        for (start, end), fragment in zip(layout.bounds, fragments)
+    ]
+    try:
+        counts = list(executor.map(_json_shard, *zip(*jobs)))
+        if sum(counts) < 2:
+            # A single record is not written as a list
+            raise _ShardConflict("fewer than two records")
+
+        with _atomic_write(json_file_path) as out:
+            out.write(skeleton[:position])
+            out.write(f'"{layout.tag}": [\n')
+            written = 0
+            for fragment, count in zip(fragments, counts):
+                if not count:
+                    continue
+                if written:
+                    out.write(",\n")
+                with open(fragment, "r", encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                written += count
+            out.write(f"\n{indent[:-2]}]")
+            out.write(skeleton[position + len(marker) :])
+    finally:
+        for fragment in fragments:
+            if os.path.exists(fragment):
+                os.remove(fragment)
+    return json_file_path
+
+
+def _columnar_shard(path, layout, start, end, output_base, fmt, compression):
+    with _ShardReader(path, layout.prefix, start, end, layout.suffix) as source:
+        return write_columnar(source, output_base, fmt, compression)
+
+
+def _convert_columnar(xml_file_path, layout, fmt, compression, executor):
+    shard_bases = [
+        f"{xml_file_path}.shard{i:03d}" for i in range(len(layout.bounds))
+    ]
+    jobs = [
+        (xml_file_path, layout, start, end, base, fmt, compression)
+        for (start, end), base in zip(layout.bounds, shard_bases)
+    ]
+    shard_paths = list(executor.map(_columnar_shard, *zip(*jobs)))
+    paths = []
+    try:
+        suffix = FORMAT_SUFFIXES[fmt]
+        for kind in ("prices", "promos"):
+            parts = [
+                path
+                for paths_of_shard in shard_paths
+                for path in paths_of_shard
+                if path.endswith(f".{kind}{suffix}")
+            ]
+            if parts:
+                output_path = f"{xml_file_path}.{kind}{suffix}"
+                concat_columnar(parts, output_path, fmt, compression)
+                paths.append(output_path)
+    finally:
+        for paths_of_shard in shard_paths:
+            for path in paths_of_shard:
+                os.remove(path)
+    return paths
+
+
+def convert_xml_sharded(
+    xml_file_path: str,
+    output_format: str = "json",
+    workers: Optional[int] = None,
+    record_tags=RECORD_TAGS,
+    min_shard_bytes: int = MIN_SHARD_BYTES,
+    compression: Optional[str] = "auto",
+):
+    """
+    Converts one large decompressed price file on several processes.
+
+    The file is split at record (`<Item>` / `<Promotion>`) starts into byte
+    ranges; each worker parses prefix + its range + suffix and writes its
+    records, and the parts are merged in file order. JSON output is
+    identical to `convert_xml_to_json`; "parquet"/"arrow" output matches
+    `convert_xml_to_columnar`.
+
+    Returns the output path(s), or None when the file is too small to split
+    or its layout can't be split safely; convert it in one process then.
+    """
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(xml_file_path)
+    shards = _shard_count(size, workers, min_shard_bytes)
+    if shards < 2:
+        return None
+    layout = _find_layout(xml_file_path, record_tags, shards)
+    if layout is None or len(layout.bounds) < 2:
+        return None
+
+    workers = min(workers, len(layout.bounds))
+    print(f"🧩 Converting {xml_file_path} in {len(layout.bounds)} shards...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            if output_format == "json":
+                output = _convert_json(xml_file_path, layout, executor)
+            else:
+                output = _convert_columnar(
+                    xml_file_path, layout, output_format, compression, executor
+                )
+        except (_ShardConflict, ET.ParseError) as e:
+            print(f"⚠️ Cannot shard {xml_file_path} ({e})")
+            return None
+    print(f"✅ Converted {xml_file_path} on {workers} workers")
+    return output
@@ -0,0 +1,196 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "simple-crawler")
+DRIVER_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "chromedriver.json")
+PROFILE_BASE_DIR = os.path.join(DEFAULT_CACHE_DIR, "chrome-profiles")
+DRIVER_CACHE_TTL = 24 * 3600  # seconds between webdriver-manager checks
+
+
+class StartupReport:
+    """Times every startup step and compares cold and warm starts."""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, step: str, seconds: float, warm: bool):
+        with self._lock:
+            self.records.append((step, seconds, warm))
+        print(f"🚀 {step} ({'warm' if warm else 'cold'}): {seconds:.2f}s")
+
+    def report(self) -> dict:
+        steps = defaultdict(lambda: {"cold": [], "warm": []})
+        for step, seconds, warm in self.records:
+            steps[step]["warm" if warm else "cold"].append(seconds)
+
+        print(f"\n{'-'*40}")
+        print("STARTUP TIMING REPORT")
+        print(f"{'-'*40}")
+        summary = {}
+        for step, runs in steps.items():
+            summary[step] = {}
+            for kind in ("cold", "warm"):
+                if runs[kind]:
+                    average = sum(runs[kind]) / len(runs[kind])
+                    summary[step][kind] = average
+                    runs_count = len(runs[kind])
+                    print(f"{step:<24} {kind}: {average:6.2f}s avg of {runs_count}")
+        return summary
+
+
+_report = StartupReport()
+
+
+def get_startup_report() -> StartupReport:
+    return _report
+
+
+def _driver_version(driver_path: str) -> Optional[str]:
+    try:
+        output = subprocess.run(
+            [driver_path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = output.strip().splitlines()
+    return lines[0] if lines else None
+
+
+def cached_driver_path(
+    resolve,
+    cache_path: str = DRIVER_CACHE_PATH,
+    ttl: float = DRIVER_CACHE_TTL,
+    report: Optional[StartupReport] = None,
+) -> str:
+    """
+    Returns the chromedriver path stored in cache_path while it is younger than
+    ttl and still on disk; otherwise calls resolve() (e.g. webdriver-manager,
+    which may hit the network) and stores the new path and driver version.
+    """
+    report = report or _report
+    start = time.perf_counter()
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached["resolved_at"] < ttl and os.path.exists(
+            cached["path"]
+        ):
+            report.add("driver path", time.perf_counter() - start, warm=True)
+            return cached["path"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    driver_path = resolve()
+    entry = {
+        "path": driver_path,
+        "version": _driver_version(driver_path),
+        "resolved_at": time.time(),
+    }
+    if os.path.isabs(driver_path):  # don't cache the bare "chromedriver" fallback
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    print(f"Chrome driver {entry['version'] or 'version unknown'}: {driver_path}")
+    report.add("driver path", time.perf_counter() - start, warm=False)
+    return driver_path
+
+
+def cold_launch(start_browser, report: Optional[StartupReport] = None):
+    """
+    Calls start_browser() without a reusable profile and records it as a cold
+    "browser launch", the baseline for ProfileDirs.launch's warm starts.
+    """
+    report = report or _report
+    start = time.perf_counter()
+    driver = start_browser()
+    report.add("browser launch", time.perf_counter() - start, warm=False)
+    return driver
+
+
+class ProfileDirs:
+    """
+    Reusable Chrome profile directories, one per concurrently running
+    browser (Chrome locks a profile while it uses it). A reused profile keeps
+    its HTTP cache, so later starts load the site's scripts and styles from
+    disk.
+    """
+
+    def __init__(self, size: int = 1, base_dir: str = PROFILE_BASE_DIR):
+        self._free = queue.Queue()
+        for i in range(size):
+            self._free.put(os.path.join(base_dir, f"profile-{i}"))
+
+    def launch(self, start_browser, report: Optional[StartupReport] = None):
+        """
+        Calls start_browser(profile_dir) with a free profile directory and
+        returns the driver; the directory is freed again when it quits.
+        """
+        report = report or _report
+        profile_dir = self._free.get()
+        warm = os.path.isdir(profile_dir)
+        start = time.perf_counter()
+        try:
+            driver = start_browser(profile_dir)
+        except Exception:
+            self._free.put(profile_dir)
+            raise
+        report.add("browser launch", time.perf_counter() - start, warm=warm)
+
+        quit_browser = driver.quit
+
+        def quit():
+            try:
+                quit_browser()
+            finally:
+                self._free.put(profile_dir)
+
+        driver.quit = quit
+        return driver
+
+
+class WarmDriver:
+    """
+    Keeps one browser starting in the background, so the next caller of get()
+    receives an already running driver instead of waiting for a cold start.
+    Use `get` as the driver factory of a `DriverPool`; `workers` lets the
+    pool's first drivers start in parallel rather than one after another.
+    """
+
+    def __init__(
+        self, driver_factory, workers: int = 1, report: Optional[StartupReport] = None
+    ):
+        self.driver_factory = driver_factory
+        self.report = report or _report
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._spare = self._executor.submit(driver_factory)
+
+    def get(self):
+        with self._lock:
+            spare = self._spare
+            warm = spare.done()
+            self._spare = self._executor.submit(self.driver_factory)
+        start = time.perf_counter()
+        driver = spare.result()
+        self.report.add("driver handoff", time.perf_counter() - start, warm=warm)
+        return driver
+
+    def close(self):
+        with self._lock:
+            spare = self._spare
+            self._spare = None
+        try:
+            spare.result().quit()
+        except Exception as e:
+            print(f"Error closing spare Chrome driver: {e}")
+        self._executor.shutdown()
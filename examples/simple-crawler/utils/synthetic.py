@@ -0,0 +1,182 @@
+import gzip
+import random
+from datetime import datetime, timedelta
+
+# Same layout as the chains' PriceFull / PromoFull files
+CHAIN_ID = "7290055700007"
+
+_UNITS = (
+    ("גרם", "100 גרם", 500),
+    ("מיליליטר", "100 מ\"ל", 1000),
+    ("יחידה", "יחידה", 1),
+)
+_MANUFACTURERS = [f"יצרן {n}" for n in range(300)]
+_WORDS = ("חלב", "לחם", "גבינה", "יוגורט", "קפה", "שוקולד", "אורז", "פסטה")
+_BATCH = 5_000  # items formatted per write
+
+
+def _header(f, store_id, container, count):
+    f.write(
+        "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<Root>\n"
+        "<XmlDocVersion>1.0</XmlDocVersion>\n<DllVerNo>8.0.1.3</DllVerNo>\n"
+        f"<ChainId>{CHAIN_ID}</ChainId>\n<SubChainId>1</SubChainId>\n"
+        f"<StoreId>{store_id}</StoreId>\n<BikoretNo>5</BikoretNo>\n"
+        f"<{container} Count=\"{count}\">\n"
+    )
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    return open(path, "w", encoding="utf-8")
+
+
+def _item_code(n):
+    return 7290000000000 + n
+
+
+def _price_item(n, rng, updated):
+    unit_qty, unit_of_measure, quantity = _UNITS[n % len(_UNITS)]
+    price = rng.randint(100, 20_000) / 100
+    name = f"{_WORDS[n % len(_WORDS)]} {_WORDS[(n // 10) % len(_WORDS)]} {n}"
+    manufacturer = _MANUFACTURERS[n % len(_MANUFACTURERS)]
+    return (
+        "<Item>\n"
+        f"<PriceUpdateDate>{updated}</PriceUpdateDate>\n"
+        f"<ItemCode>{_item_code(n)}</ItemCode>\n<ItemType>1</ItemType>\n"
+        f"<ItemName>{name}</ItemName>\n"
+        f"<ManufacturerName>{manufacturer}</ManufacturerName>\n"
+        "<ManufactureCountry>IL</ManufactureCountry>\n"
+        f"<ManufacturerItemDescription>{name}</ManufacturerItemDescription>\n"
+        f"<UnitQty>{unit_qty}</UnitQty>\n<Quantity>{quantity:.2f}</Quantity>\n"
+        f"<bIsWeighted>{int(n % 17 == 0)}</bIsWeighted>\n"
+        f"<UnitOfMeasure>{unit_of_measure}</UnitOfMeasure>\n"
+        "<QtyInPackage>1</QtyInPackage>\n"
+        f"<ItemPrice>{price:.2f}</ItemPrice>\n"
+        f"<UnitOfMeasurePrice>{price * 100 / quantity:.2f}</UnitOfMeasurePrice>\n"
+        f"<AllowDiscount>{int(n % 9 != 0)}</AllowDiscount>\n"
+        "<ItemStatus>1</ItemStatus>\n</Item>\n"
+    )
+
+
+def _update_dates(rng, count=50):
+    """A small pool of update times, so dates repeat like in real files."""
+    start = datetime(2025, 8, 1, 3, 0)
+    return [
+        (start + timedelta(minutes=rng.randint(0, 60 * 24 * 10))).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        for _ in range(count)
+    ]
+
+
+def write_price_full(path: str, items: int, store_id: str = "084", seed: int = 0):
+    """
+    Writes a synthetic PriceFull file with `items` items; gzip-compressed when
+    path ends with ".gz". The same seed always produces the same file.
+    """
+    rng = random.Random(seed)
+    dates = _update_dates(rng)
+    with _open(path) as f:
+        _header(f, store_id, "Items", items)
+        for start in range(0, items, _BATCH):
+            f.write(
+                "".join(
+                    _price_item(n, rng, dates[n % len(dates)])
+                    for n in range(start, min(start + _BATCH, items))
+                )
+            )
+        f.write("</Items>\n</Root>\n")
+    return path
+
+
+def _promotion(n, rng, items_per_promotion, item_range):
+    start = datetime(2025, 8, 1) + timedelta(days=n % 30)
+    end = start + timedelta(days=rng.randint(7, 60))
+    reward_type = 1 + n % 3
+    description = f"{_WORDS[n % len(_WORDS)]} ב-{n % 50 + 5}"
+    first = rng.randrange(max(item_range - items_per_promotion, 1))
+    promoted = "".join(
+        f"<Item>\n<ItemCode>{_item_code(first + k)}</ItemCode>\n"
+        "<ItemType>1</ItemType>\n<IsGiftItem>0</IsGiftItem>\n</Item>\n"
+        for k in range(items_per_promotion)
+    )
+    return (
+        "<Promotion>\n"
+        f"<PromotionId>{1_000_000 + n}</PromotionId>\n"
+        "<AllowMultipleDiscounts>1</AllowMultipleDiscounts>\n"
+        f"<PromotionDescription>{description}</PromotionDescription>\n"
+        f"<PromotionUpdateDate>{start:%Y-%m-%d} 09:00:00</PromotionUpdateDate>\n"
+        f"<PromotionStartDate>{start:%Y-%m-%d}</PromotionStartDate>\n"
+        "<PromotionStartHour>00:00:00</PromotionStartHour>\n"
+        f"<PromotionEndDate>{end:%Y-%m-%d}</PromotionEndDate>\n"
+        "<PromotionEndHour>23:59:00</PromotionEndHour>\n"
+        f"<RewardType>{reward_type}</RewardType>\n<DiscountType>1</DiscountType>\n"
+        f"<DiscountRate>{rng.randint(5, 50) * 100}</DiscountRate>\n"
+        f"<MinQty>{1 + n % 3:.2f}</MinQty>\n"
+        f"<DiscountedPrice>{rng.randint(100, 5_000) / 100:.2f}</DiscountedPrice>\n"
+        f"<PromotionItems Count=\"{items_per_promotion}\">\n{promoted}"
+        "</PromotionItems>\n</Promotion>\n"
+    )
+
+
+def write_promo_full(
+    path: str,
+    promotions: int,
+    items_per_promotion: int = 5,
+    store_id: str = "084",
+    seed: int = 0,
+):
+    """Writes a synthetic PromoFull file; gzip-compressed for a ".gz" path."""
+    rng = random.Random(seed)
+    item_range = max(promotions * items_per_promotion, 1)
+    with _open(path) as f:
+        _header(f, store_id, "Promotions", promotions)
+        for start in range(0, promotions, _BATCH):
+            f.write(
+                "".join(
+                    _promotion(n, rng, items_per_promotion, item_range)
+                    for n in range(start, min(start + _BATCH, promotions))
+                )
+            )
+        f.write("</Promotions>\n</Root>\n")
+    return path
+
+
+_LISTING_ROW = (
+    '<tr class="fileRow">\n'
+    '  <td class="fileName">{name}</td>\n'
+    '  <td><span class="badge">{category}</span></td>\n'
+    "  <td>{store} - סניף {n}</td>\n"
+    "  <td>2025-08-12 03:00</td>\n"
+    '  <td><a class="btn downloadBtn" href="/{store}/{name}">הורדה</a></td>\n'
+    "</tr>"
+)
+
+
+def _listing_row(n):
+    category = ("PriceFull", "PromoFull")[n % 2]
+    return _LISTING_ROW.format(
+        name=f"{category}{CHAIN_ID}-{n:04d}-202508120300.gz",
+        category=category,
+        store=f"{n:04d}",
+        n=n,
+    )
+
+
+def listing_page(rows: int = 500) -> str:
+    """A listing page shaped like the price site, with `rows` files."""
+    options = "".join(
+        f'<option value="{n:04d}">{n:04d} - סניף {n}</option>' for n in range(rows)
+    )
+    body = "".join(_listing_row(n) for n in range(rows))
+    pagination = "".join(
+        f"<button class='paginationBtn' data-page='{n}'>{n}</button>"
+        for n in range(1, 11)
+    )
+    return (
+        "<html><head><script src='/app.js'></script></head><body>"
+        f"<select id='branch_filter'>{options}</select>"
+        f"<table class='files'>{body}</table>"
+        f"<div class='pagination'>{pagination}</div></body></html>"
+    )
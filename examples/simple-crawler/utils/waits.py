@@ -0,0 +1,142 @@
+import time
+from typing import Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Cheap fingerprint of the download table, computed inside the browser
+LISTING_SIGNATURE_JS = (
+    "return Array.from(document.querySelectorAll('a.downloadBtn'),"
+    " a => a.getAttribute('href')).join('|');"
+)
+
+
+# The node an AJAX refresh replaces: the first download link, else the table
+LISTING_ELEMENT_JS = (
+    "return document.querySelector('a.downloadBtn')"
+    " || document.querySelector('table');"
+)
+
+# Visible loading indicators (spinners, overlays, busy regions)
+LOADING_VISIBLE_JS = (
+    "return Array.from(document.querySelectorAll("
+    "'.loading, .loader, .spinner, [aria-busy=\"true\"]'),"
+    " e => e.offsetParent !== null).some(Boolean);"
+)
+
+
+def listing_signature(driver) -> str:
+    return driver.execute_script(LISTING_SIGNATURE_JS) or ""
+
+
+def listing_snapshot(driver) -> tuple:
+    """(signature, element) of the listing, taken before a filter or click."""
+    return listing_signature(driver), driver.execute_script(LISTING_ELEMENT_JS)
+
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def listing_present(driver):
+    return bool(listing_signature(driver))
+
+
+def listing_changed(previous_signature):
+    """
+    The download-link table now shows different, non-empty links; the table
+    is briefly empty while an AJAX refresh replaces it.
+    """
+
+    def condition(driver):
+        signature = listing_signature(driver)
+        return bool(signature) and signature != previous_signature
+
+    return condition
+
+
+def loading_finished(driver):
+    return not driver.execute_script(LOADING_VISIBLE_JS)
+
+
+def listing_refreshed(previous_element):
+    """
+    The listing element seen before the action was replaced and nothing is
+    loading any more, so a refresh that found the same links (or none) counts.
+    """
+    return EC.all_of(EC.staleness_of(previous_element), loading_finished)
+
+
+def page_number_is(page_num):
+    """The pagination bar marks page_num as the current page."""
+
+    def condition(driver):
+        return driver.execute_script(
+            "const b = document.querySelector("
+            "'button.paginationBtn.active, button.paginationBtn[aria-current]');"
+            "return b ? b.getAttribute('data-page') : null;"
+        ) == str(page_num)
+
+    return condition
+
+
+class WaitTimer:
+    """
+    Polls for concrete DOM readiness instead of sleeping a fixed time, and
+    records how long every wait actually took for a per-run timing report.
+    """
+
+    def __init__(self, driver, timeout: float = 10, poll_frequency: float = 0.1):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.records = []
+
+    def until(self, label: str, condition, timeout: Optional[float] = None) -> bool:
+        """Wait for condition; returns False (and records it) on timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            WebDriverWait(
+                self.driver, timeout, poll_frequency=self.poll_frequency
+            ).until(condition)
+            timed_out = False
+        except TimeoutException:
+            timed_out = True
+        elapsed = time.perf_counter() - start
+        self.records.append((label, elapsed, timed_out))
+        status = "timed out" if timed_out else "ready"
+        print(f"⏱️ {label}: {status} after {elapsed:.2f}s")
+        return not timed_out
+
+    def page_loaded(self, label: str = "page load", locator=None) -> bool:
+        conditions = [document_ready]
+        if locator:
+            conditions.append(EC.presence_of_element_located(locator))
+        return self.until(label, EC.all_of(*conditions))
+
+    def listing_updated(self, label: str, previous: tuple, page_num=None):
+        """
+        Wait until the download links change, the listing in the
+        `listing_snapshot` previous was refreshed, or page_num becomes current.
+        """
+        previous_signature, previous_element = previous
+        conditions = [listing_changed(previous_signature)]
+        if previous_element is not None:
+            conditions.append(listing_refreshed(previous_element))
+        if page_num is not None:
+            conditions.append(EC.all_of(page_number_is(page_num), listing_present))
+        return self.until(label, EC.any_of(*conditions))
+
+    def report(self) -> dict:
+        total = sum(elapsed for _, elapsed, _ in self.records)
+        timeouts = sum(1 for _, _, timed_out in self.records if timed_out)
+        print(f"\n{'-'*40}")
+        print("WAIT TIMING REPORT")
+        print(f"{'-'*40}")
+        for label, elapsed, timed_out in self.records:
+            suffix = " (timed out)" if timed_out else ""
+            print(f"{label:<40} {elapsed:6.2f}s{suffix}")
+        print(f"Total: {len(self.records)} waits, {total:.2f}s, {timeouts} timeouts")
+        return {"waits": len(self.records), "seconds": total, "timeouts": timeouts}
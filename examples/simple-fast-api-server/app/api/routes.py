@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from rag.chain import qa_chain
+from rag.chain import get_qa_chain
 
 router = APIRouter()
 
@@ -13,7 +13,7 @@ def health():
 
 @router.get("/ask")
 def ask(q: str = Query(..., description="question to ask")):
-    response = qa_chain.invoke(q)
+    response = get_qa_chain().invoke(q)
     sources = [doc.page_content for doc in response["source_documents"]]
     return JSONResponse(
         {
@@ -1,5 +1,16 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from api.routes import router
+from rag.chain import get_qa_chain
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the saved index before taking requests, not at import
+    get_qa_chain()
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
@@ -4,3 +4,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Saved FAISS index; build it with `python -m rag.build_index`
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(APP_DIR, "rag_index"))
+# "openai", or "fake" for deterministic local embeddings without an API key
+RAG_EMBEDDINGS = os.getenv("RAG_EMBEDDINGS", "openai")
+RAG_EMBEDDING_CACHE = os.getenv(
+    "RAG_EMBEDDING_CACHE", os.path.join(APP_DIR, "embedding_cache.sqlite3")
+)
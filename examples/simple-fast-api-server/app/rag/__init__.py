@@ -2,4 +2,6 @@ import os
 from core.config import OPENAI_API_KEY
 
 
-os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
+# Not needed with RAG_EMBEDDINGS=fake
+if OPENAI_API_KEY:
+    os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
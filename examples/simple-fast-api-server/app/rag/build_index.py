@@ -0,0 +1,33 @@
+"""
+Builds or updates the saved FAISS index from load_documents().
+
+    cd app && python -m rag.build_index
+
+Only new or changed documents are embedded; run it whenever the documents
+change, before (re)starting the API.
+"""
+
+import time
+
+from core.config import RAG_INDEX_DIR
+from rag.embeddings import get_embeddings
+from rag.index import build_index
+
+
+def main():
+    start = time.perf_counter()
+    _, stats = build_index()
+    print(
+        f"Index at {RAG_INDEX_DIR}: {stats['documents']} documents "
+        f"({stats['added']} embedded, {stats['removed']} removed, "
+        f"{stats['unchanged']} unchanged) in {time.perf_counter() - start:.1f}s"
+    )
+    cache = get_embeddings().stats()
+    print(
+        f"Embedding cache: {cache['memory_hits'] + cache['disk_hits']} hits, "
+        f"{cache['misses']} misses ({cache['hit_rate']:.0%} hit rate)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,27 @@
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
+from functools import lru_cache
+
+from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
-from rag.documents import load_documents
+from rag.embeddings import get_embeddings
+from rag.index import build_index, index_matches, load_index
 
 
+@lru_cache(maxsize=1)
 def get_qa_chain():
-    docs = load_documents()
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.from_documents(docs, embeddings)
+    """
+    Loads the saved index (built by `python -m rag.build_index`) the first
+    time it is needed; builds and saves it only if there is none yet, or if
+    it was built with a different embedder.
+    """
+    embeddings = get_embeddings()
+    if index_matches(embeddings):
+        vectorstore = load_index(embeddings)
+    else:
+        print("No saved index for these embeddings, building it now...")
+        vectorstore, _ = build_index(embeddings=embeddings)
     retriever = vectorstore.as_retriever(search_kwargs={"k": 2})
     return RetrievalQA.from_chain_type(
         llm=ChatOpenAI(model="gpt-4"),
         retriever=retriever,
         return_source_documents=True,
     )
-
-
-qa_chain = get_qa_chain()
@@ -0,0 +1,164 @@
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from core.config import RAG_EMBEDDING_CACHE, RAG_EMBEDDINGS
+
+FAKE_EMBEDDING_SIZE = 256
+SQLITE_MAX_PARAMS = 500  # keys per SELECT ... IN (...)
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_name(embeddings):
+    """Cache namespace of an embedder: its class, model and dimensions."""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.model
+    name = getattr(embeddings, "model", None) or getattr(embeddings, "size", "")
+    dimensions = getattr(embeddings, "dimensions", None)
+    key = f"{type(embeddings).__name__}:{name}"
+    return f"{key}:{dimensions}" if dimensions else key
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedder with a disk cache (SQLite) keyed by model name and
+    text hash, behind an in-memory LRU. Only texts missing from both are
+    embedded, in batches of `batch_size`, so re-indexing unchanged documents
+    and repeated questions don't call the model at all. Vectors are stored
+    as float32, the precision FAISS keeps anyway.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        path=RAG_EMBEDDING_CACHE,
+        memory_size=10_000,
+        batch_size=256,
+    ):
+        self.embeddings = embeddings
+        self.model = model_name(embeddings)
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        # One connection shared by the request threads, guarded by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._db.commit()
+
+    def embed_documents(self, texts):
+        return self._embed(texts, self.model, self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        # Some models embed queries differently, so they get their own keys
+        return self._embed(
+            [text],
+            self.model + ":query",
+            lambda batch: [self.embeddings.embed_query(t) for t in batch],
+        )[0]
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits["memory"] + self.hits["disk"]
+            total = hits + self.misses
+            return {
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+
+    def _embed(self, texts, model, embed_batch):
+        keys = [(model, text_hash(text)) for text in texts]
+        found = {}
+        with self._lock:
+            for key in set(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.hits["memory"] += sum(1 for key in keys if key in found)
+            on_disk = self._load(model, [key for key in set(keys) if key not in found])
+            self.hits["disk"] += sum(1 for key in keys if key in on_disk)
+            found.update(on_disk)
+            for key, vector in on_disk.items():
+                self._remember(key, vector)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            missing_keys = list(missing)
+            vectors = []
+            for start in range(0, len(missing_keys), self.batch_size):
+                batch = [
+                    missing[key]
+                    for key in missing_keys[start : start + self.batch_size]
+                ]
+                vectors.extend(embed_batch(batch))
+            computed = dict(zip(missing_keys, vectors))
+            with self._lock:
+                self.misses += sum(1 for key in keys if key in computed)
+                self._store(computed)
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+            found.update(computed)
+        return [list(found[key]) for key in keys]
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _load(self, model, keys):
+        found = {}
+        hashes = [text_hash for _, text_hash in keys]
+        for start in range(0, len(hashes), SQLITE_MAX_PARAMS):
+            chunk = hashes[start : start + SQLITE_MAX_PARAMS]
+            rows = self._db.execute(
+                "SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                [model, *chunk],
+            )
+            for hash_, blob in rows:
+                found[(model, hash_)] = array("f", blob)
+        return found
+
+    def _store(self, vectors):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [
+                    (model, hash_, array("f", vector).tobytes())
+                    for (model, hash_), vector in vectors.items()
+                ],
+            )
+
+
+@lru_cache(maxsize=1)
+def get_embeddings():
+    """The process-wide cached embedder selected by RAG_EMBEDDINGS."""
+    if RAG_EMBEDDINGS == "fake":
+        embeddings = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    else:
+        from langchain_openai import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings()
+    return CachedEmbeddings(embeddings)
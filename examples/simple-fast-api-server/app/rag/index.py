@@ -0,0 +1,160 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from core.config import RAG_INDEX_DIR
+from rag.documents import load_documents
+from rag.embeddings import get_embeddings, model_name
+
+# Which embedder built the index; vectors of another one don't compare
+MODEL_FILE = "embeddings.json"
+
+
+def document_id(doc):
+    """Content hash of a document; unchanged documents keep their id."""
+    payload = json.dumps(
+        {"content": doc.page_content, "metadata": doc.metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_exists(index_dir=RAG_INDEX_DIR):
+    return os.path.exists(os.path.join(index_dir, "index.faiss"))
+
+
+def index_model(index_dir=RAG_INDEX_DIR):
+    """Model name of the embedder that built the saved index, if recorded."""
+    try:
+        with open(os.path.join(index_dir, MODEL_FILE), encoding="utf-8") as f:
+            return json.load(f).get("model")
+    except (OSError, ValueError):
+        return None
+
+
+def index_matches(embeddings, index_dir=RAG_INDEX_DIR):
+    """True if there is a saved index built with `embeddings`."""
+    return index_exists(index_dir) and index_model(index_dir) == model_name(embeddings)
+
+
+def load_index(embeddings=None, index_dir=RAG_INDEX_DIR):
+    embeddings = embeddings or get_embeddings()
+    # Resolve the link once, so a save swapping in a new version meanwhile
+    # can't mix files of two versions
+    index_dir = os.path.realpath(index_dir)
+    saved_model = index_model(index_dir)
+    if saved_model != model_name(embeddings):
+        raise ValueError(
+            f"Index at {index_dir} was built with {saved_model or 'an unknown model'}, "
+            f"not {model_name(embeddings)}; rebuild it with `python -m rag.build_index`"
+        )
+    # The docstore pickle is our own build output, not user input
+    return FAISS.load_local(
+        index_dir,
+        embeddings,
+        allow_dangerous_deserialization=True,
+    )
+
+
+def _version(path):
+    """Sort key of a `<index_dir>.v<ns>-<pid>` directory, None for other names."""
+    stamp = path.rsplit(".v", 1)[-1]
+    try:
+        ns, pid = stamp.split("-")
+        return int(ns), int(pid)
+    except ValueError:
+        return None
+
+
+def save_index(vectorstore, index_dir=RAG_INDEX_DIR):
+    """
+    Saves the index to a new `<index_dir>.v<ns>-<pid>` directory and then
+    points the `index_dir` symlink at it with an atomic rename, so `index_dir`
+    always resolves to a complete index (except once, when an index saved as
+    a plain directory by older code is moved aside for the link). Workers
+    saving at the same time each write their own version; the last swap wins.
+    The version replaced here is kept for loads still reading it; older ones
+    are removed, so a load that has resolved `index_dir` two saves ago can fail.
+    """
+    version_dir = f"{index_dir}.v{time.time_ns()}-{os.getpid()}"
+    tmp_dir = f"{version_dir}.tmp"
+    vectorstore.save_local(tmp_dir)
+    with open(os.path.join(tmp_dir, MODEL_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model": model_name(vectorstore.embeddings)}, f)
+    # Only complete versions carry the .v name that _version() matches
+    os.rename(tmp_dir, version_dir)
+
+    old_version = os.path.realpath(index_dir) if os.path.islink(index_dir) else None
+    if os.path.isdir(index_dir) and not os.path.islink(index_dir):
+        old_version = f"{index_dir}.v0-{os.getpid()}"
+        try:
+            os.rename(index_dir, old_version)
+        except FileNotFoundError:
+            pass
+    link = f"{index_dir}.{os.getpid()}.link"
+    if os.path.lexists(link):
+        os.remove(link)
+    # Relative, so the index can be moved or mounted elsewhere as a whole
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, index_dir)
+
+    keep = _version(old_version) if old_version else _version(version_dir)
+    for path in glob.glob(f"{glob.escape(index_dir)}.v*"):
+        version = _version(path)
+        if version is not None and keep is not None and version < keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_index(docs=None, embeddings=None, index_dir=RAG_INDEX_DIR):
+    """
+    Brings the saved index in line with `docs` (default: load_documents()).
+    Documents are keyed by content hash: only new or changed documents are
+    embedded, and removed ones are deleted; an index built with a different
+    embedder is rebuilt from scratch. Returns (vectorstore, stats).
+    Raises ValueError when there are no documents to index.
+    """
+    docs = load_documents() if docs is None else docs
+    if not docs:
+        raise ValueError("No documents to index")
+    embeddings = embeddings or get_embeddings()
+    wanted = {}
+    for doc in docs:
+        wanted.setdefault(document_id(doc), doc)
+
+    vectorstore = None
+    if index_matches(embeddings, index_dir):
+        vectorstore = load_index(embeddings, index_dir)
+    elif index_exists(index_dir):
+        print(
+            f"Index at {index_dir} was built with {index_model(index_dir)}, "
+            f"rebuilding it with {model_name(embeddings)}"
+        )
+    existing = set(vectorstore.index_to_docstore_id.values()) if vectorstore else set()
+    new_ids = [doc_id for doc_id in wanted if doc_id not in existing]
+    stale_ids = [doc_id for doc_id in existing if doc_id not in wanted]
+    stats = {
+        "documents": len(wanted),
+        "added": len(new_ids),
+        "removed": len(stale_ids),
+        "unchanged": len(wanted) - len(new_ids),
+    }
+    if not new_ids and not stale_ids:
+        return vectorstore, stats
+
+    new_docs = [wanted[doc_id] for doc_id in new_ids]
+    if vectorstore is None:
+        vectorstore = FAISS.from_documents(new_docs, embeddings, ids=new_ids)
+    else:
+        if stale_ids:
+            vectorstore.delete(stale_ids)
+        if new_docs:
+            vectorstore.add_documents(new_docs, ids=new_ids)
+    save_index(vectorstore, index_dir)
+    return vectorstore, stats
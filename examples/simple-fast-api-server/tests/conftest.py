@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app imports its modules as top-level packages (`cd app && ...`)
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+)
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+
+from rag.embeddings import CachedEmbeddings  # noqa: E402
+
+TEXTS = ["codename_fox", "codename_hawk", "codename_lion"]
+
+
+def cached(tmp_path):
+    return CachedEmbeddings(
+        DeterministicFakeEmbedding(size=32), path=str(tmp_path / "cache.sqlite3")
+    )
+
+
+def test_repeated_texts_are_cache_hits(tmp_path):
+    embeddings = cached(tmp_path)
+    first = embeddings.embed_documents(TEXTS)
+    query = embeddings.embed_query("where was codename_fox?")
+    assert embeddings.stats()["misses"] == len(TEXTS) + 1
+
+    assert embeddings.embed_documents(TEXTS) == first
+    assert embeddings.embed_query("where was codename_fox?") == query
+    stats = embeddings.stats()
+    assert stats["misses"] == len(TEXTS) + 1
+    assert stats["memory_hits"] == len(TEXTS) + 1
+
+
+def test_fresh_instance_reads_from_disk(tmp_path):
+    first = cached(tmp_path).embed_documents(TEXTS)
+
+    embeddings = cached(tmp_path)
+    # Stored as float32
+    for vector, expected in zip(embeddings.embed_documents(TEXTS), first):
+        assert vector == pytest.approx(expected, rel=1e-6)
+    stats = embeddings.stats()
+    assert stats["misses"] == 0
+    assert stats["disk_hits"] == len(TEXTS)
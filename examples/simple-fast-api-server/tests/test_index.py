@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+
+from rag.documents import load_documents  # noqa: E402
+from rag.embeddings import CachedEmbeddings  # noqa: E402
+from rag.index import build_index, document_id, load_index  # noqa: E402
+
+
+def test_rebuilding_unchanged_documents_adds_nothing(tmp_path):
+    embeddings = CachedEmbeddings(
+        DeterministicFakeEmbedding(size=32), path=str(tmp_path / "cache.sqlite3")
+    )
+    index_dir = str(tmp_path / "index")
+
+    _, stats = build_index(load_documents(), embeddings, index_dir)
+    assert stats["added"] == len(load_documents())
+
+    _, stats = build_index(load_documents(), embeddings, index_dir)
+    assert stats["added"] == 0
+    assert stats["unchanged"] == len(load_documents())
+
+
+def test_changed_and_removed_documents_are_replaced(tmp_path):
+    embeddings = CachedEmbeddings(
+        DeterministicFakeEmbedding(size=32), path=str(tmp_path / "cache.sqlite3")
+    )
+    index_dir = str(tmp_path / "index")
+    docs = load_documents()
+    build_index(docs, embeddings, index_dir)
+
+    changed, removed, kept = docs
+    edited = Document(page_content=changed.page_content + " (revised)")
+    vectorstore, stats = build_index([edited, kept], embeddings, index_dir)
+
+    assert stats == {"documents": 2, "added": 1, "removed": 2, "unchanged": 1}
+    ids = set(vectorstore.index_to_docstore_id.values())
+    assert ids == {document_id(edited), document_id(kept)}
+    assert document_id(changed) not in ids
+    assert document_id(removed) not in ids
+
+    # The saved index is the updated one
+    assert set(load_index(embeddings, index_dir).index_to_docstore_id.values()) == ids
+
+
+def test_index_dir_points_at_the_latest_version(tmp_path):
+    embeddings = CachedEmbeddings(
+        DeterministicFakeEmbedding(size=32), path=str(tmp_path / "cache.sqlite3")
+    )
+    index_dir = tmp_path / "index"
+    docs = load_documents()
+    # An index saved as a plain directory is moved aside for the link
+    build_index(docs[:1], embeddings, str(tmp_path / "legacy"))
+    os.rename(os.path.realpath(tmp_path / "legacy"), index_dir)
+
+    for count in (2, 3, 1):
+        build_index(docs[:count], embeddings, str(index_dir))
+        assert os.path.islink(index_dir)
+        assert len(load_index(embeddings, str(index_dir)).index_to_docstore_id) == count
+
+    # The current and the replaced version are kept, older ones removed
+    versions = sorted(p.name for p in tmp_path.glob("index.*"))
+    assert len(versions) == 2
+    assert os.path.basename(os.path.realpath(index_dir)) in versions
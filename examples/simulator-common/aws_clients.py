@@ -0,0 +1,53 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_ENDPOINT = 'http://localstack:4566'
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_config(read_timeout=60):
+    """Connection pool, timeouts and retries shared by every simulator client."""
+    return Config(
+        max_pool_connections=int(os.getenv('BOTO_MAX_POOL_CONNECTIONS', 50)),
+        connect_timeout=5,
+        read_timeout=read_timeout,
+        retries={'max_attempts': 3, 'mode': 'standard'},
+        tcp_keepalive=True,
+    )
+
+
+def new_client(service, endpoint_env, read_timeout=60):
+    """Builds a client against the endpoint named by the `endpoint_env` variable."""
+    return boto3.session.Session().client(
+        service,
+        endpoint_url=os.getenv(endpoint_env, DEFAULT_ENDPOINT),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
+        region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1'),
+        config=client_config(read_timeout),
+    )
+
+
+def shared_client(service, endpoint_env, read_timeout=60):
+    """
+    Returns the process-wide client for `service`, creating it on first use.
+
+    One client per process: boto3 clients are thread-safe and keep a pool of
+    keep-alive connections, while building one costs tens of milliseconds and
+    memory (endpoint resolution, service model loading, credentials).
+    """
+    key = (service, endpoint_env)
+    client = _clients.get(key)
+    if client is None:
+        # Creating clients through the default session is not thread-safe
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = new_client(service, endpoint_env, read_timeout)
+                _clients[key] = client
+    return client
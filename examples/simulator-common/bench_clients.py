@@ -0,0 +1,160 @@
+"""
+Compares a new boto3 client per request (how the handlers used to work) with
+the shared client from aws_clients.py, for either simulator:
+
+    python bench_clients.py                    # SQS, 8 threads x 50 requests each
+    python bench_clients.py --threads 32 --requests 100
+    python bench_clients.py --service s3       # head_object calls straight to S3
+
+SQS requests look the queue URL up per client, or once for the shared one (as
+the SQS clients.py caches it). S3 requests are boto3 head_object calls made
+directly against LocalStack (not through the handler's HTTP API) on --key, or
+on a small probe object that is uploaded first and deleted afterwards; they
+measure the client cost behind the handlers' S3 calls. Needs the LocalStack services
+from docker-compose (SQS_ENDPOINT and S3_ENDPOINT default to
+http://localhost:4566 here).
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINT_ENVS = {'sqs': 'SQS_ENDPOINT', 's3': 'S3_ENDPOINT'}
+for endpoint_env in ENDPOINT_ENVS.values():
+    os.environ.setdefault(endpoint_env, 'http://localhost:4566')
+
+import boto3  # noqa: E402
+from aws_clients import shared_client  # noqa: E402
+
+PROBE_KEY = 'bench_clients.probe'
+
+_session_lock = threading.Lock()
+
+
+def _new_client(service):
+    # What every request used to do (under a lock, since the default session
+    # isn't safe to build clients from concurrently)
+    with _session_lock:
+        return boto3.client(
+            service,
+            endpoint_url=os.environ[ENDPOINT_ENVS[service]],
+            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
+            region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
+        )
+
+
+def _shared(service):
+    return shared_client(service, ENDPOINT_ENVS[service])
+
+
+def sqs_per_client(target):
+    client = _new_client('sqs')
+    queue_url = client.get_queue_url(QueueName=target['queue'])['QueueUrl']
+    client.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['ApproximateNumberOfMessages'])
+
+
+def sqs_shared(target):
+    _shared('sqs').get_queue_attributes(
+        QueueUrl=target['queue_url'], AttributeNames=['ApproximateNumberOfMessages']
+    )
+
+
+def s3_per_client(target):
+    _new_client('s3').head_object(Bucket=target['bucket'], Key=target['key'])
+
+
+def s3_shared(target):
+    _shared('s3').head_object(Bucket=target['bucket'], Key=target['key'])
+
+
+REQUESTS = {
+    'sqs': (sqs_per_client, sqs_shared),
+    's3': (s3_per_client, s3_shared),
+}
+
+
+def client_cost(service, count=10):
+    """Average time and traced memory to build one client."""
+    tracemalloc.start()
+    clients = []
+    start = time.perf_counter()
+    for _ in range(count):
+        clients.append(_new_client(service))
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / count, size / count
+
+
+def run_load(request, target, threads, requests):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(requests):
+            start = time.perf_counter()
+            request(target)
+            latency = time.perf_counter() - start
+            with lock:
+                latencies.append(latency)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(worker) for _ in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        'p99_ms': latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        'requests_per_second': len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--service', choices=REQUESTS, default='sqs')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread')
+    parser.add_argument('--queue', default=os.getenv('SQS_QUEUE_NAME', 'test-queue'))
+    parser.add_argument('--bucket', default=os.getenv('S3_BUCKET', 'test-bucket'))
+    parser.add_argument('--key', help='existing object to HEAD (default: upload a probe)')
+    args = parser.parse_args()
+
+    if args.service == 'sqs':
+        queue_url = _shared('sqs').get_queue_url(QueueName=args.queue)['QueueUrl']
+        target = {'queue': args.queue, 'queue_url': queue_url}
+    else:
+        target = {'bucket': args.bucket, 'key': args.key or PROBE_KEY}
+        if not args.key:
+            _shared('s3').put_object(Bucket=args.bucket, Key=PROBE_KEY, Body=b'probe')
+
+    try:
+        seconds, size = client_cost(args.service)
+        print(f"🔧 Building one {args.service} client: {seconds * 1000:.1f}ms, {size / 2**20:.1f}MB")
+
+        per_client, shared = REQUESTS[args.service]
+        # Warm-up, so both modes start with loaded service models
+        per_client(target)
+        shared(target)
+
+        endpoint = os.environ[ENDPOINT_ENVS[args.service]]
+        print(f"🚀 {args.threads} threads x {args.requests} requests against {endpoint}")
+        print(f"{'mode':<22} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9}")
+        for name, request in (('client per request', per_client), ('shared client', shared)):
+            r = run_load(request, target, args.threads, args.requests)
+            print(f"{name:<22} {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms {r['p99_ms']:7.1f}ms "
+                  f"{r['requests_per_second']:9.1f}")
+    finally:
+        if args.service == 's3' and not args.key:
+            _shared('s3').delete_object(Bucket=args.bucket, Key=PROBE_KEY)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load test for the simulators' Lambda HTTP server: how many requests per second
+an endpoint sustains at increasing numbers of concurrent clients.
+
+    python bench_http.py                                  # SQS GET /messages
+    python bench_http.py --url http://localhost:8080 --path /files   # S3
+    python bench_http.py --concurrency 1 8 32 64 --duration 10
+    python bench_http.py --url http://localhost:8080 --path "/files?limit=10" --no-keepalive
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_URL = 'http://localhost:8081'
+DEFAULT_PATH = '/messages'
+
+
+def _worker(url, deadline, keepalive, latencies, errors, lock):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    connection = None
+    while time.perf_counter() < deadline:
+        if connection is None:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers={} if keepalive else {'Connection': 'close'})
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 500
+        except (OSError, http.client.HTTPException):
+            ok = False
+        latency = time.perf_counter() - start
+        if not ok or not keepalive:
+            connection.close()
+            connection = None
+        with lock:
+            if ok:
+                latencies.append(latency)
+            else:
+                errors[0] += 1
+    if connection is not None:
+        connection.close()
+
+
+def run_level(url, concurrency, duration, keepalive):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(url, start + duration, keepalive, latencies, errors, lock),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {'requests': len(latencies), 'errors': errors[0], 'requests_per_second': len(latencies) / elapsed}
+    if latencies:
+        result['p50_ms'] = statistics.median(latencies) * 1000
+        result['p95_ms'] = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+        result['p99_ms'] = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default=DEFAULT_URL, help='server URL, optionally with the path')
+    parser.add_argument('--path', help=f'endpoint to request (default: the path in --url, else {DEFAULT_PATH})')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+    parser.add_argument('--duration', type=float, default=5, help='seconds per concurrency level')
+    parser.add_argument('--no-keepalive', action='store_true', help='open a new connection per request')
+    args = parser.parse_args()
+
+    url = args.url
+    if args.path or urlsplit(url).path in ('', '/'):
+        url = urljoin(url, args.path or DEFAULT_PATH)
+    keepalive = not args.no_keepalive
+    print(f"🚀 Load testing GET {url} ({'keep-alive' if keepalive else 'new connection per request'})")
+    print(f"{'clients':>8} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        r = run_level(url, concurrency, args.duration, keepalive)
+        if not r['requests']:
+            print(f"{concurrency:>8} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {r['errors']:>7}")
+            continue
+        print(f"{concurrency:>8} {r['requests_per_second']:9.1f} {r['p50_ms']:7.1f}ms "
+              f"{r['p95_ms']:7.1f}ms {r['p99_ms']:7.1f}ms {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
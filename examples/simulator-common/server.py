@@ -0,0 +1,83 @@
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAX_CONCURRENCY = int(os.getenv('LAMBDA_MAX_CONCURRENCY', 32))
+KEEPALIVE_TIMEOUT = float(os.getenv('LAMBDA_KEEPALIVE_TIMEOUT', 5))
+
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """
+    Serves each connection on its own thread, with at most `max_concurrency`
+    connections at once; further clients wait in the listen backlog. With
+    HTTP/1.1 keep-alive a connection keeps its thread between requests; see
+    KeepAliveHTTPHandler for how idle and waiting clients are handled.
+    """
+
+    # Let in-flight requests finish on shutdown; server_close() joins them
+    daemon_threads = False
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, max_concurrency=MAX_CONCURRENCY):
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Set while a new connection waits for a slot
+        self.saturated = False
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.saturated = True
+            self._slots.acquire()
+            self.saturated = False
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+class KeepAliveHTTPHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler that keeps connections open between requests (every
+    response must set Content-Length), closes them after `timeout` idle
+    seconds, and closes them after the current response while other
+    clients wait for a slot.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; don't hold the body back
+    disable_nagle_algorithm = True
+
+    def end_headers(self):
+        if getattr(self.server, 'saturated', False):
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+
+def serve(server):
+    """Runs until SIGINT/SIGTERM, then stops accepting and drains requests."""
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        print("\nShutting down lambda function...")
+        # shutdown() waits for serve_forever(), so it can't run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print("Lambda function stopped")
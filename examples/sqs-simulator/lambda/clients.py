@@ -0,0 +1,44 @@
+import os
+import sys
+import threading
+
+from botocore.exceptions import ClientError
+
+# aws_clients.py and server.py live in examples/simulator-common; the Docker
+# image copies them next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'simulator-common'))
+from aws_clients import shared_client  # noqa: E402
+
+_queue_urls = {}
+_queue_urls_lock = threading.Lock()
+
+
+def get_client(service='sqs'):
+    """Returns the shared client for `service`, creating it on first use."""
+    # read_timeout stays longer than the 20s long-poll wait
+    return shared_client(service, 'SQS_ENDPOINT', read_timeout=30)
+
+
+def get_queue_url(queue_name=None):
+    """Looks up a queue URL once and returns the cached value afterwards."""
+    queue_name = queue_name or os.getenv('SQS_QUEUE_NAME', 'test-queue')
+    queue_url = _queue_urls.get(queue_name)
+    if queue_url is None:
+        queue_url = get_client('sqs').get_queue_url(QueueName=queue_name)['QueueUrl']
+        with _queue_urls_lock:
+            _queue_urls[queue_name] = queue_url
+    return queue_url
+
+
+def forget_queue_url(queue_name=None):
+    """Drops a cached URL, e.g. after the queue was deleted and re-created."""
+    queue_name = queue_name or os.getenv('SQS_QUEUE_NAME', 'test-queue')
+    with _queue_urls_lock:
+        _queue_urls.pop(queue_name, None)
+
+
+def is_missing_queue(error):
+    return isinstance(error, ClientError) and error.response['Error']['Code'] in (
+        'AWS.SimpleQueueService.NonExistentQueue',
+        'QueueDoesNotExist',
+    )
@@ -0,0 +1,319 @@
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from clients import get_client, get_queue_url
+from producer import DECODE_ERRORS, decode_body
+
+MAX_BATCH = 10  # SQS limit for receive/delete/change-visibility batches
+# Treat {"event": "fail"} messages as failures, to try out retries and the DLQ
+SIMULATE_FAILURES = os.getenv('CONSUMER_SIMULATE_FAILURES', '').lower() in ('1', 'true', 'yes')
+
+
+class BatchConsumer:
+    """
+    Long-polling SQS consumer.
+
+    Poller threads receive up to 10 messages per call (waiting up to 20s when
+    the queue is empty) and hand each batch to a worker pool. A batch is
+    acknowledged with one delete_message_batch call; while a batch is still
+    being processed its visibility timeout is extended, so slow batches are
+    not redelivered to another consumer.
+
+    process_batch(messages) gets the raw SQS messages and returns the
+    MessageIds that failed (or None when all succeeded). Failed messages are
+    not deleted and become visible again after the timeout. If it raises,
+    the whole batch is treated as failed.
+
+    Stopping waits for the pollers' current long polls, i.e. up to
+    `wait_time` seconds; pass a lower wait_time for a consumer that has to
+    stop quickly.
+    """
+
+    def __init__(self, sqs_client, queue_url, process_batch, workers=8, pollers=2,
+                 wait_time=20, visibility_timeout=30, log_batches=True):
+        self.sqs = sqs_client
+        self.queue_url = queue_url
+        self.process_batch = process_batch
+        self.workers = workers
+        self.pollers = pollers
+        self.wait_time = wait_time
+        self.visibility_timeout = visibility_timeout
+        self.log_batches = log_batches
+
+        self._stop = threading.Event()
+        # Receive no more than the workers can take, plus one batch each queued
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._in_flight = {}  # batch id -> (received_at, last extended_at, messages)
+        self._in_flight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_ids = 0
+        self.stats = {
+            'batches': 0,
+            'received': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'deleted': 0,
+            'delete_errors': 0,
+            'visibility_extensions': 0,
+            'empty_receives': 0,
+        }
+        self.batch_latencies = []
+        self.started_at = None
+
+    def run(self, duration=None):
+        """Consume until stop() is called (or for `duration` seconds)."""
+        self.started_at = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sqs-worker')
+        threads = [
+            threading.Thread(target=self._poll, args=(executor,), name=f'sqs-poller-{i}', daemon=True)
+            for i in range(self.pollers)
+        ]
+        threads.append(threading.Thread(target=self._extend_visibility, name='sqs-visibility', daemon=True))
+        for thread in threads:
+            thread.start()
+
+        print(f"📡 Consuming {self.queue_url} with {self.pollers} pollers and {self.workers} workers")
+        try:
+            if duration is None:
+                while not self._stop.is_set():
+                    self._stop.wait(1)
+            else:
+                self._stop.wait(duration)
+        except KeyboardInterrupt:
+            print("\nStopping consumer...")
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            executor.shutdown(wait=True)
+            self.print_stats()
+        return self.summary()
+
+    def stop(self):
+        """
+        Asks the consumer to stop. A receive already waiting is not cut short,
+        so run() returns up to `wait_time` seconds later, once the batches
+        received by then are processed.
+        """
+        self._stop.set()
+
+    def _poll(self, executor):
+        while not self._stop.is_set():
+            self._slots.acquire()
+            try:
+                response = self.sqs.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=MAX_BATCH,
+                    WaitTimeSeconds=self.wait_time,
+                    VisibilityTimeout=self.visibility_timeout,
+                    AttributeNames=['All'],
+                    MessageAttributeNames=['All'],
+                )
+            except (ClientError, BotoCoreError) as e:
+                self._slots.release()
+                print(f"Error receiving messages: {e}")
+                self._stop.wait(1)
+                continue
+
+            messages = response.get('Messages', [])
+            if not messages:
+                self._slots.release()
+                with self._stats_lock:
+                    self.stats['empty_receives'] += 1
+                continue
+
+            received_at = time.perf_counter()
+            with self._in_flight_lock:
+                self._batch_ids += 1
+                batch_id = self._batch_ids
+                self._in_flight[batch_id] = [received_at, received_at, messages]
+            executor.submit(self._handle_batch, batch_id, messages, received_at)
+
+    def _handle_batch(self, batch_id, messages, received_at):
+        try:
+            try:
+                failed_ids = set(self.process_batch(messages) or [])
+            except Exception as e:
+                print(f"❌ Batch of {len(messages)} failed: {e}")
+                failed_ids = {message['MessageId'] for message in messages}
+
+            done = [message for message in messages if message['MessageId'] not in failed_ids]
+            deleted, delete_errors = self._delete(done)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(batch_id, None)
+            self._slots.release()
+
+        latency = time.perf_counter() - received_at
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['received'] += len(messages)
+            self.stats['succeeded'] += len(done)
+            self.stats['failed'] += len(failed_ids)
+            self.stats['deleted'] += deleted
+            self.stats['delete_errors'] += delete_errors
+            self.batch_latencies.append(latency)
+
+        if self.log_batches:
+            age = _oldest_age(messages)
+            age_text = f", oldest message {age:.1f}s old" if age is not None else ''
+            print(f"📦 Batch of {len(messages)}: {len(done)} ok, {len(failed_ids)} failed "
+                  f"in {latency * 1000:.0f}ms ({len(messages) / latency:.0f} msg/s{age_text})")
+
+    def _delete(self, messages):
+        if not messages:
+            return 0, 0
+        try:
+            response = self.sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {'Id': str(i), 'ReceiptHandle': message['ReceiptHandle']}
+                    for i, message in enumerate(messages)
+                ],
+            )
+        except (ClientError, BotoCoreError) as e:
+            print(f"Error deleting batch: {e}")
+            return 0, len(messages)
+        for failure in response.get('Failed', []):
+            print(f"Error deleting message {failure['Id']}: {failure.get('Message', failure['Code'])}")
+        return len(response.get('Successful', [])), len(response.get('Failed', []))
+
+    def _extend_visibility(self):
+        """Pushes back the visibility timeout of batches still being processed."""
+        interval = max(self.visibility_timeout / 3, 1)
+        while not self._stop.wait(interval):
+            self._extend_due(time.perf_counter())
+
+    def _extend_due(self, now):
+        with self._in_flight_lock:
+            due = [
+                (batch_id, list(batch[2])) for batch_id, batch in self._in_flight.items()
+                if now - batch[1] >= self.visibility_timeout / 2
+            ]
+        for batch_id, messages in due:
+            try:
+                response = self.sqs.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {
+                            'Id': str(i),
+                            'ReceiptHandle': message['ReceiptHandle'],
+                            'VisibilityTimeout': self.visibility_timeout,
+                        }
+                        for i, message in enumerate(messages)
+                    ],
+                )
+            except (ClientError, BotoCoreError) as e:
+                print(f"Error extending visibility: {e}")
+                continue
+
+            # E.g. an expired receipt handle: the message may be redelivered,
+            # and later extensions of it would only fail again
+            failed = {int(failure['Id']) for failure in response.get('Failed', [])}
+            for failure in response.get('Failed', []):
+                message = messages[int(failure['Id'])]
+                print(f"Error extending visibility of {message['MessageId']}: "
+                      f"{failure.get('Message', failure.get('Code'))}")
+            extended = [message for i, message in enumerate(messages) if i not in failed]
+            with self._in_flight_lock:
+                batch = self._in_flight.get(batch_id)
+                if batch is None:
+                    continue  # finished meanwhile
+                batch[1] = now
+                batch[2] = extended
+                received_at = batch[0]
+            if not extended:
+                continue
+            with self._stats_lock:
+                self.stats['visibility_extensions'] += 1
+            print(f"⏳ Extended visibility of {len(extended)} of {len(messages)} messages "
+                  f"in a batch in progress for {now - received_at:.0f}s")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        with self._stats_lock:
+            summary = dict(self.stats)
+            latencies = sorted(self.batch_latencies)
+        summary['elapsed_seconds'] = elapsed
+        summary['messages_per_second'] = summary['succeeded'] / elapsed if elapsed else 0
+        if latencies:
+            summary['batch_latency_p50_ms'] = statistics.median(latencies) * 1000
+            summary['batch_latency_p95_ms'] = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+        return summary
+
+    def print_stats(self):
+        summary = self.summary()
+        print("\n📊 Consumer stats")
+        print(f"   Batches: {summary['batches']}, messages: {summary['received']} "
+              f"({summary['succeeded']} ok, {summary['failed']} failed)")
+        print(f"   Deleted: {summary['deleted']} ({summary['delete_errors']} delete errors), "
+              f"visibility extensions: {summary['visibility_extensions']}")
+        print(f"   Throughput: {summary['messages_per_second']:.1f} msg/s "
+              f"({summary['messages_per_second'] * 60:.0f}/min) over {summary['elapsed_seconds']:.1f}s")
+        if 'batch_latency_p50_ms' in summary:
+            print(f"   Batch latency: p50 {summary['batch_latency_p50_ms']:.0f}ms, "
+                  f"p95 {summary['batch_latency_p95_ms']:.0f}ms")
+
+
+def _oldest_age(messages):
+    sent = [
+        int(message['Attributes']['SentTimestamp'])
+        for message in messages
+        if 'SentTimestamp' in message.get('Attributes', {})
+    ]
+    if not sent:
+        return None
+    return time.time() - min(sent) / 1000
+
+
+def process_records(records):
+    """
+    Handles price-file-ready events. Accepts SQS messages (`Body`) or Lambda
+    event records (`body`), compressed or not, and returns the message ids
+    that failed.
+    """
+    failed = []
+    for record in records:
+        message_id = record.get('MessageId') or record.get('messageId', '')
+        try:
+            body = decode_body(
+                record.get('Body', record.get('body', '')),
+                record.get('MessageAttributes', record.get('messageAttributes')),
+            )
+        except DECODE_ERRORS as e:
+            print(f"❌ {message_id}: can't decode body: {e}")
+            failed.append(message_id)
+            continue
+        try:
+            event = json.loads(body)
+        except ValueError:
+            event = {'message': body}
+        if not isinstance(event, dict):
+            event = {'message': event}
+        if SIMULATE_FAILURES and event.get('event') == 'fail':
+            failed.append(message_id)
+            continue
+        print(f"🎯 {message_id}: {event.get('event', 'message')} {event.get('key', event.get('message', ''))}")
+    return failed
+
+
+def main():
+    consumer = BatchConsumer(
+        get_client('sqs'),
+        get_queue_url(),
+        process_records,
+        workers=int(os.getenv('CONSUMER_WORKERS', 8)),
+        pollers=int(os.getenv('CONSUMER_POLLERS', 2)),
+        visibility_timeout=int(os.getenv('CONSUMER_VISIBILITY_TIMEOUT', 30)),
+    )
+    consumer.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,31 @@
-import boto3
 import os
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
 from botocore.exceptions import ClientError
+from clients import forget_queue_url, get_client, get_queue_url, is_missing_queue
+# From examples/simulator-common, put on sys.path by clients
+from server import BoundedThreadingHTTPServer, KeepAliveHTTPHandler, serve
+from consumer import process_records
+from producer import DECODE_ERRORS, decode_body
+
+def _listing_body(msg):
+    """Decoded body, or the raw one if it can't be decoded."""
+    try:
+        return decode_body(msg['Body'], msg.get('MessageAttributes'))
+    except DECODE_ERRORS:
+        return msg['Body']
 
 def lambda_handler(event, context=None):
-    """AWS Lambda handler for SQS events"""
-    print(f"Received event: {json.dumps(event, indent=2)}")
-    
+    """
+    AWS Lambda handler for SQS events.
+
+    Returns the failed message ids as `batchItemFailures` (partial batch
+    response), so Lambda only retries those instead of the whole batch.
+    """
+    failures = []
     try:
         if 'Records' in event:
-            for record in event['Records']:
-                message_body = record.get('body', '')
-                receipt_handle = record.get('receiptHandle', '')
-                message_id = record.get('messageId', '')
-                
-                print(f"🎯 SQS Message Received!")
-                print(f"   Message ID: {message_id}")
-                print(f"   Body: {message_body}")
-                print(f"   Receipt Handle: {receipt_handle[:20]}...")
-                print("-" * 50)
+            print(f"🎯 Received {len(event['Records'])} SQS records")
+            failures = process_records(event['Records'])
         else:
             print("No SQS records found in event")
             
@@ -32,30 +38,36 @@ def lambda_handler(event, context=None):
     
     return {
         'statusCode': 200,
-        'body': json.dumps('Lambda function executed successfully')
+        'body': json.dumps('Lambda function executed successfully'),
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]
     }
 
-class LambdaHTTPHandler(BaseHTTPRequestHandler):
+class LambdaHTTPHandler(KeepAliveHTTPHandler):
     """HTTP handler to simulate Lambda invocation"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
     
     def do_GET(self):
         """Handle GET requests to list SQS messages"""
         try:
             if self.path == '/messages':
-                sqs_client = boto3.client(
-                    'sqs',
-                    endpoint_url=os.getenv('SQS_ENDPOINT', 'http://localstack:4566'),
-                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
-                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
-                    region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-                )
-                
+                sqs_client = get_client('sqs')
                 queue_name = os.getenv('SQS_QUEUE_NAME', 'test-queue')
                 
                 try:
-                    # Get queue URL
-                    queue_url_response = sqs_client.get_queue_url(QueueName=queue_name)
-                    queue_url = queue_url_response['QueueUrl']
+                    queue_url = get_queue_url(queue_name)
                     
                     # Receive messages (up to 10)
                     response = sqs_client.receive_message(
@@ -70,7 +82,7 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
                         for msg in response['Messages']:
                             messages.append({
                                 'messageId': msg['MessageId'],
-                                'body': msg['Body'],
+                                'body': _listing_body(msg),
                                 'receiptHandle': msg['ReceiptHandle'],
                                 'md5OfBody': msg['MD5OfBody'],
                                 'attributes': msg.get('Attributes', {}),
@@ -83,34 +95,24 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
                         AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
                     )
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json(200, {
                         'messages': messages,
                         'queueName': queue_name,
                         'queueUrl': queue_url,
                         'approximateNumberOfMessages': queue_attrs['Attributes'].get('ApproximateNumberOfMessages', '0'),
                         'approximateNumberOfMessagesNotVisible': queue_attrs['Attributes'].get('ApproximateNumberOfMessagesNotVisible', '0')
-                    }).encode('utf-8'))
+                    })
                     
                 except ClientError as e:
-                    self.send_response(404)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    if is_missing_queue(e):
+                        forget_queue_url(queue_name)
+                    self._send_json(404, {'error': str(e)})
             else:
-                self.send_response(404)
-                self.end_headers()
+                self._send_empty(404)
                 
         except Exception as e:
             print(f"Error handling GET request: {e}")
-            self.send_response(500)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+            self._send_json(500, {'error': str(e)})
     
     def do_POST(self):
         try:
@@ -123,86 +125,51 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
                     data = json.loads(body)
                     message_body = data.get('message', '')
                     
-                    sqs_client = boto3.client(
-                        'sqs',
-                        endpoint_url=os.getenv('SQS_ENDPOINT', 'http://localstack:4566'),
-                        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
-                        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
-                        region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-                    )
-                    
-                    queue_name = os.getenv('SQS_QUEUE_NAME', 'test-queue')
-                    queue_url_response = sqs_client.get_queue_url(QueueName=queue_name)
-                    queue_url = queue_url_response['QueueUrl']
+                    sqs_client = get_client('sqs')
+                    queue_url = get_queue_url()
                     
                     response = sqs_client.send_message(
                         QueueUrl=queue_url,
                         MessageBody=message_body
                     )
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json(200, {
                         'messageId': response['MessageId'],
                         'md5OfBody': response['MD5OfBody']
-                    }).encode('utf-8'))
+                    })
                     
                 elif self.path == '/delete-message':
                     # Delete message from SQS
                     data = json.loads(body)
                     receipt_handle = data.get('receiptHandle', '')
                     
-                    sqs_client = boto3.client(
-                        'sqs',
-                        endpoint_url=os.getenv('SQS_ENDPOINT', 'http://localstack:4566'),
-                        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
-                        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
-                        region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
-                    )
-                    
-                    queue_name = os.getenv('SQS_QUEUE_NAME', 'test-queue')
-                    queue_url_response = sqs_client.get_queue_url(QueueName=queue_name)
-                    queue_url = queue_url_response['QueueUrl']
+                    sqs_client = get_client('sqs')
+                    queue_url = get_queue_url()
                     
                     sqs_client.delete_message(
                         QueueUrl=queue_url,
                         ReceiptHandle=receipt_handle
                     )
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'success': True}).encode('utf-8'))
+                    self._send_json(200, {'success': True})
                     
                 else:
                     # Default lambda handler
                     event = json.loads(body)
                     response = lambda_handler(event)
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps(response).encode('utf-8'))
+                    self._send_json(200, response)
             else:
                 event = {}
                 response = lambda_handler(event)
                 
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps(response).encode('utf-8'))
+                self._send_json(200, response)
             
         except Exception as e:
             print(f"Error handling request: {e}")
-            self.send_response(500)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+            if is_missing_queue(e):
+                forget_queue_url()
+            self._send_json(500, {'error': str(e)})
     
     def do_OPTIONS(self):
         """Handle preflight CORS requests"""
@@ -210,6 +177,7 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def log_message(self, format, *args):
@@ -221,13 +189,9 @@ def main():
     port = int(os.getenv('LAMBDA_PORT', 8081))
     print(f"🚀 Lambda function server starting on port {port}...")
     
-    server = HTTPServer(('0.0.0.0', port), LambdaHTTPHandler)
-    
-    try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\nShutting down lambda function...")
-        server.shutdown()
+    server = BoundedThreadingHTTPServer(('0.0.0.0', port), LambdaHTTPHandler)
+    serve(server)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,275 @@
+import base64
+import gzip
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+MAX_BATCH = 10  # SQS limit for send_message_batch
+MAX_BATCH_BYTES = 256 * 1024  # SQS limit for the whole batch payload
+MAX_ATTEMPTS = 3
+# Message attribute that marks a gzip+base64 encoded body
+ENCODING_ATTRIBUTE = 'content-encoding'
+GZIP_BASE64 = 'gzip+base64'
+# What decode_body raises for a body that isn't valid gzip+base64
+DECODE_ERRORS = (ValueError, OSError, EOFError, zlib.error)
+
+
+def encode_body(body, compress_threshold):
+    """Returns (body, message attributes) to send for `body`."""
+    if compress_threshold is None or len(body.encode('utf-8')) < compress_threshold:
+        return body, {}
+    compressed = base64.b64encode(gzip.compress(body.encode('utf-8'))).decode('ascii')
+    if len(compressed) >= len(body.encode('utf-8')):
+        return body, {}
+    return compressed, {ENCODING_ATTRIBUTE: {'DataType': 'String', 'StringValue': GZIP_BASE64}}
+
+
+def decode_body(body, attributes):
+    """
+    Reverses encode_body. Takes the MessageAttributes of a received message
+    (`StringValue`) or of a Lambda event record (`stringValue`).
+    """
+    encoding = (attributes or {}).get(ENCODING_ATTRIBUTE, {})
+    if (encoding.get('StringValue') or encoding.get('stringValue')) == GZIP_BASE64:
+        return gzip.decompress(base64.b64decode(body)).decode('utf-8')
+    return body
+
+
+def _attribute_size(name, value):
+    """Bytes a message attribute adds to the payload: name, DataType and value, as SQS counts them."""
+    data = value.get('StringValue') or value.get('BinaryValue') or b''
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return len(name.encode('utf-8')) + len(value.get('DataType', '').encode('utf-8')) + len(data)
+
+
+class _Pending:
+    __slots__ = ('body', 'attributes', 'size', 'future', 'attempts')
+
+    def __init__(self, body, attributes, future):
+        self.body = body
+        self.attributes = attributes
+        self.size = len(body.encode('utf-8')) + sum(
+            _attribute_size(name, value) for name, value in attributes.items()
+        )
+        self.future = future
+        self.attempts = 0
+
+
+class BatchProducer:
+    """
+    Buffers messages and sends them with send_message_batch, 10 per call.
+
+    A batch goes out as soon as it is full (10 messages or close to the 256KB
+    batch limit) or `linger` seconds after its first message, so single
+    messages are not held back for long; up to `senders` batches are in
+    flight at once. send() returns a Future with the MessageId. Entries that
+    fail with a server-side error are retried; bodies of at least
+    `compress_threshold` bytes are gzipped (see decode_body).
+    """
+
+    def __init__(self, sqs_client, queue_url, linger=0.05, compress_threshold=None, senders=4,
+                 log_batches=False):
+        self.sqs = sqs_client
+        self.queue_url = queue_url
+        self.linger = linger
+        self.compress_threshold = compress_threshold
+        self.log_batches = log_batches
+
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._first_at = None
+        self._unresolved = set()  # futures of messages not sent (or failed) yet
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'messages': 0,
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'batches': 0,
+            'compressed': 0,
+            'body_bytes': 0,
+            'sent_bytes': 0,
+        }
+        self.started_at = time.perf_counter()
+        # Several batches can be in flight at once
+        self._senders = [
+            threading.Thread(target=self._run, name=f'sqs-producer-{i}', daemon=True)
+            for i in range(senders)
+        ]
+        for sender in self._senders:
+            sender.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send(self, body, attributes=None):
+        """Queues one message; returns a Future that resolves to its MessageId."""
+        future = Future()
+        encoded, encoding = encode_body(body, self.compress_threshold)
+        message_attributes = dict(attributes or {}, **encoding)
+        pending = _Pending(encoded, message_attributes, future)
+        with self._stats_lock:
+            self.stats['messages'] += 1
+            self.stats['body_bytes'] += len(body.encode('utf-8'))
+            self.stats['compressed'] += bool(encoding)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('producer is closed')
+            if self._buffer_bytes + pending.size > MAX_BATCH_BYTES:
+                # Doesn't fit next to what is buffered: send that first
+                self._first_at = float('-inf')
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: not self._buffer)
+            self._add(pending)
+            self._unresolved.add(future)
+        future.add_done_callback(self._resolved)
+        return future
+
+    def _resolved(self, future):
+        with self._condition:
+            self._unresolved.discard(future)
+
+    def flush(self):
+        """Sends everything buffered now and waits for it."""
+        with self._condition:
+            futures = list(self._unresolved)
+            if self._buffer:
+                self._first_at = float('-inf')  # due immediately
+            self._condition.notify_all()
+        for future in futures:
+            future.exception()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for sender in self._senders:
+            sender.join()
+
+    def _add(self, pending):
+        if not self._buffer:
+            self._first_at = time.monotonic()
+        self._buffer.append(pending)
+        self._buffer_bytes += pending.size
+        self._condition.notify_all()
+
+    def _take_batch(self):
+        """Waits for a full or lingered batch; None once closed and drained."""
+        with self._condition:
+            while True:
+                if self._buffer:
+                    full = len(self._buffer) >= MAX_BATCH or self._buffer_bytes >= MAX_BATCH_BYTES * 0.9
+                    remaining = self._first_at + self.linger - time.monotonic()
+                    if full or remaining <= 0 or self._closed:
+                        break
+                    self._condition.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+            # Cut by count and by bytes: retries put back at the front can
+            # make the buffer larger than one batch may be
+            taken = 0
+            batch_bytes = 0
+            for pending in self._buffer[:MAX_BATCH]:
+                if taken and batch_bytes + pending.size > MAX_BATCH_BYTES:
+                    break
+                taken += 1
+                batch_bytes += pending.size
+            batch = self._buffer[:taken]
+            self._buffer = self._buffer[taken:]
+            self._buffer_bytes -= batch_bytes
+            self._first_at = time.monotonic() if self._buffer else None
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        entries = []
+        for i, pending in enumerate(batch):
+            entry = {'Id': str(i), 'MessageBody': pending.body}
+            if pending.attributes:
+                entry['MessageAttributes'] = pending.attributes
+            entries.append(entry)
+        start = time.perf_counter()
+        try:
+            response = self.sqs.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+        except ClientError as e:
+            response = {'Failed': [
+                {'Id': entry['Id'], 'SenderFault': False, 'Code': e.response['Error']['Code'], 'Message': str(e)}
+                for entry in entries
+            ]}
+        except BotoCoreError as e:
+            # Connection errors and timeouts: retry the whole batch
+            response = {'Failed': [
+                {'Id': entry['Id'], 'SenderFault': False, 'Code': type(e).__name__, 'Message': str(e)}
+                for entry in entries
+            ]}
+
+        for result in response.get('Successful', []):
+            batch[int(result['Id'])].future.set_result(result['MessageId'])
+        retry = []
+        failed = 0
+        for failure in response.get('Failed', []):
+            pending = batch[int(failure['Id'])]
+            pending.attempts += 1
+            if not failure.get('SenderFault') and pending.attempts < MAX_ATTEMPTS:
+                retry.append(pending)
+                continue
+            failed += 1
+            pending.future.set_exception(
+                RuntimeError(f"{failure.get('Code')}: {failure.get('Message', 'send failed')}")
+            )
+
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['sent'] += len(response.get('Successful', []))
+            self.stats['failed'] += failed
+            self.stats['retried'] += len(retry)
+            self.stats['sent_bytes'] += sum(pending.size for pending in batch)
+        if self.log_batches:
+            print(f"📤 Batch of {len(batch)} sent in {(time.perf_counter() - start) * 1000:.0f}ms")
+        if retry:
+            time.sleep(0.1 * 2 ** retry[0].attempts)
+            with self._condition:
+                # Retries go ahead of newer messages
+                for pending in retry:
+                    self._buffer.insert(0, pending)
+                    self._buffer_bytes += pending.size
+                self._first_at = float('-inf')
+                self._condition.notify_all()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started_at
+        with self._stats_lock:
+            summary = dict(self.stats)
+        summary['elapsed_seconds'] = elapsed
+        summary['messages_per_second'] = summary['sent'] / elapsed if elapsed else 0
+        summary['messages_per_batch'] = summary['sent'] / summary['batches'] if summary['batches'] else 0
+        return summary
+
+    def print_stats(self):
+        summary = self.summary()
+        print("\n📊 Producer stats")
+        print(f"   Sent: {summary['sent']} of {summary['messages']} messages ({summary['failed']} failed, "
+              f"{summary['retried']} retried) in {summary['batches']} batches "
+              f"({summary['messages_per_batch']:.1f} per batch)")
+        print(f"   Throughput: {summary['messages_per_second']:.1f} msg/s over {summary['elapsed_seconds']:.1f}s")
+        if summary['compressed']:
+            print(f"   Compressed {summary['compressed']} bodies: {summary['body_bytes'] / 2**10:.0f}KB "
+                  f"-> {summary['sent_bytes'] / 2**10:.0f}KB sent")
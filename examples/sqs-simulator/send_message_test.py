@@ -1,28 +1,23 @@
-import boto3
 import os
 import sys
 import json
 from botocore.exceptions import ClientError
 
-def send_message_to_sqs(message_body):
-    """Send a message to SQS queue using LocalStack"""
+# Bodies from this size on are gzipped by the bulk producer
+BULK_COMPRESS_THRESHOLD = 8 * 1024
+
+def send_message_to_sqs(message_body, show_count=False):
+    """Send a message to SQS queue using LocalStack, on the shared client and cached queue URL"""
     
     print(f"Sending message to SQS queue: {message_body}")
     
-    sqs_client = boto3.client(
-        'sqs',
-        endpoint_url='http://localhost:4566',
-        aws_access_key_id='test',
-        aws_secret_access_key='test',
-        region_name='us-east-1'
-    )
-    
+    clients, _ = _producer_modules()
+    sqs_client = clients.get_client('sqs')
     queue_name = 'test-queue'
     
     try:
-        # Get queue URL
-        queue_url_response = sqs_client.get_queue_url(QueueName=queue_name)
-        queue_url = queue_url_response['QueueUrl']
+        # Looked up once per process, then served from the cache
+        queue_url = clients.get_queue_url(queue_name)
         print(f"Queue URL: {queue_url}")
         
         # Send message
@@ -35,18 +30,18 @@ def send_message_to_sqs(message_body):
         print(f"   Message ID: {response['MessageId']}")
         print(f"   MD5 of Body: {response['MD5OfBody']}")
         
-        # Get queue attributes to show message count
-        queue_attrs = sqs_client.get_queue_attributes(
-            QueueUrl=queue_url,
-            AttributeNames=['ApproximateNumberOfMessages']
-        )
-        
-        message_count = queue_attrs['Attributes']['ApproximateNumberOfMessages']
-        print(f"   Messages in queue: {message_count}")
+        # Costs one more API call, so only on request (--count)
+        if show_count:
+            queue_attrs = sqs_client.get_queue_attributes(
+                QueueUrl=queue_url,
+                AttributeNames=['ApproximateNumberOfMessages']
+            )
+            message_count = queue_attrs['Attributes']['ApproximateNumberOfMessages']
+            print(f"   Messages in queue: {message_count}")
         
     except ClientError as e:
-        error_code = e.response['Error']['Code']
-        if error_code == 'AWS.SimpleQueueService.NonExistentQueue':
+        if clients.is_missing_queue(e):
+            clients.forget_queue_url(queue_name)
             print(f"Error: Queue '{queue_name}' does not exist!")
             print("Make sure LocalStack services are running with: docker-compose up")
         else:
@@ -61,20 +56,12 @@ def receive_messages_from_sqs():
     
     print("Receiving messages from SQS queue...")
     
-    sqs_client = boto3.client(
-        'sqs',
-        endpoint_url='http://localhost:4566',
-        aws_access_key_id='test',
-        aws_secret_access_key='test',
-        region_name='us-east-1'
-    )
-    
+    clients, _ = _producer_modules()
+    sqs_client = clients.get_client('sqs')
     queue_name = 'test-queue'
     
     try:
-        # Get queue URL
-        queue_url_response = sqs_client.get_queue_url(QueueName=queue_name)
-        queue_url = queue_url_response['QueueUrl']
+        queue_url = clients.get_queue_url(queue_name)
         
         # Receive messages
         response = sqs_client.receive_message(
@@ -101,13 +88,70 @@ def receive_messages_from_sqs():
         print(f"Unexpected error: {e}")
         sys.exit(1)
 
+def consume_messages_from_sqs(duration=None):
+    """Run the batch consumer: long-poll, process and delete messages"""
+    clients, _ = _producer_modules()
+    from consumer import BatchConsumer, process_records
+
+    try:
+        queue_url = clients.get_queue_url('test-queue')
+    except ClientError as e:
+        print(f"Error getting queue URL: {e}")
+        print("Make sure LocalStack services are running with: docker-compose up")
+        sys.exit(1)
+    BatchConsumer(clients.get_client('sqs'), queue_url, process_records).run(duration)
+
+def _producer_modules():
+    """The producer and shared client from lambda/, pointed at LocalStack on localhost"""
+    os.environ.setdefault('SQS_ENDPOINT', 'http://localhost:4566')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda'))
+    import clients
+    import producer
+    return clients, producer
+
+def send_messages_in_batches(messages, compress_threshold=BULK_COMPRESS_THRESHOLD):
+    """Send many messages with send_message_batch (10 per call), looking the queue URL up once"""
+    clients, producer = _producer_modules()
+    try:
+        queue_url = clients.get_queue_url('test-queue')
+    except ClientError as e:
+        print(f"Error getting queue URL: {e}")
+        print("Make sure LocalStack services are running with: docker-compose up")
+        sys.exit(1)
+
+    sent = 0
+    with producer.BatchProducer(clients.get_client('sqs'), queue_url, compress_threshold=compress_threshold) as batch_producer:
+        futures = [batch_producer.send(message) for message in messages]
+        for future in futures:
+            try:
+                future.result()
+                sent += 1
+            except Exception as e:
+                print(f"❌ Failed to send message: {e}")
+    batch_producer.print_stats()
+    return sent
+
+def read_messages(path=None):
+    """One message per non-empty line of a file, or of stdin for '-' / no path"""
+    source = sys.stdin if path in (None, '-') else open(path, 'r', encoding='utf-8')
+    try:
+        for line in source:
+            line = line.rstrip('\n')
+            if line.strip():
+                yield line
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
 def main():
     """Main function to demonstrate SQS operations"""
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python send_message_test.py send '<message>'")
+        print("  python send_message_test.py send '<message>' [--count]")
         print("  python send_message_test.py receive")
         print("  python send_message_test.py demo")
+        print("  python send_message_test.py consume [seconds]")
+        print("  python send_message_test.py bulk [file|-]   (one message per line)")
         sys.exit(1)
     
     action = sys.argv[1].lower()
@@ -118,11 +162,21 @@ def main():
             print("Usage: python send_message_test.py send '<message>'")
             sys.exit(1)
         message_body = sys.argv[2]
-        send_message_to_sqs(message_body)
+        send_message_to_sqs(message_body, show_count='--count' in sys.argv[3:])
         
     elif action == 'receive':
         receive_messages_from_sqs()
         
+    elif action == 'consume':
+        duration = float(sys.argv[2]) if len(sys.argv) > 2 else None
+        consume_messages_from_sqs(duration)
+        
+    elif action == 'bulk':
+        path = sys.argv[2] if len(sys.argv) > 2 else None
+        print(f"🚀 Sending messages from {path if path not in (None, '-') else 'stdin'} in batches...")
+        sent = send_messages_in_batches(read_messages(path))
+        print(f"\n✅ Sent {sent} messages.")
+        
     elif action == 'demo':
         # Send some demo messages
         demo_messages = [
@@ -134,16 +188,14 @@ def main():
         ]
         
         print("🚀 Demo: Sending sample messages to SQS...")
-        for i, message in enumerate(demo_messages, 1):
-            print(f"\n--- Sending message {i}/{len(demo_messages)} ---")
-            send_message_to_sqs(message)
+        send_messages_in_batches(demo_messages)
         
         print(f"\n✅ Demo completed! Sent {len(demo_messages)} messages.")
         print("You can now view them in the web UI at http://localhost:3001")
         
     else:
         print(f"Unknown action: {action}")
-        print("Available actions: send, receive, demo")
+        print("Available actions: send, receive, demo, consume, bulk")
         sys.exit(1)
 
 if __name__ == "__main__":
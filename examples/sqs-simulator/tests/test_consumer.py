@@ -0,0 +1,59 @@
+from consumer import BatchConsumer
+
+
+class FakeSQS:
+    def __init__(self, failed_handles=()):
+        self.failed_handles = set(failed_handles)
+        self.visibility_calls = []
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        self.visibility_calls.append([entry['ReceiptHandle'] for entry in Entries])
+        return {
+            'Successful': [{'Id': e['Id']} for e in Entries if e['ReceiptHandle'] not in self.failed_handles],
+            'Failed': [
+                {'Id': e['Id'], 'Code': 'ReceiptHandleIsInvalid', 'SenderFault': True}
+                for e in Entries if e['ReceiptHandle'] in self.failed_handles
+            ],
+        }
+
+
+def messages(*handles):
+    return [{'MessageId': f'id-{handle}', 'ReceiptHandle': handle} for handle in handles]
+
+
+def consumer(sqs, *batches):
+    consumer = BatchConsumer(sqs, 'queue-url', lambda batch: None, visibility_timeout=30)
+    for batch_id, batch in enumerate(batches, 1):
+        consumer._in_flight[batch_id] = [0.0, 0.0, batch]
+    return consumer
+
+
+def test_failed_extensions_are_not_counted_or_retried():
+    sqs = FakeSQS(failed_handles={'expired'})
+    sqs_consumer = consumer(sqs, messages('ok', 'expired'))
+
+    sqs_consumer._extend_due(20.0)
+    assert sqs_consumer.stats['visibility_extensions'] == 1
+    assert sqs_consumer._in_flight[1][1] == 20.0
+
+    # The next extension only asks for the handle that still works
+    sqs_consumer._extend_due(40.0)
+    assert sqs.visibility_calls == [['ok', 'expired'], ['ok']]
+
+
+def test_batch_with_only_failed_extensions_is_not_counted():
+    sqs_consumer = consumer(FakeSQS(failed_handles={'expired'}), messages('expired'))
+
+    sqs_consumer._extend_due(20.0)
+    assert sqs_consumer.stats['visibility_extensions'] == 0
+
+
+def test_finished_batch_is_left_alone():
+    sqs = FakeSQS()
+    sqs_consumer = consumer(sqs, messages('ok'))
+    sqs.change_message_visibility_batch = (
+        lambda **kwargs: sqs_consumer._in_flight.pop(1) and {'Successful': [{'Id': '0'}]}
+    )
+
+    sqs_consumer._extend_due(20.0)
+    assert 1 not in sqs_consumer._in_flight
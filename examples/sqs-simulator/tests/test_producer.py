@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import Future
+
+from botocore.exceptions import ClientError
+
+from producer import MAX_BATCH_BYTES, BatchProducer, _Pending
+
+
+class FakeSQS:
+    """Fails the first batch with a server error and rejects oversized batches like SQS."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def send_message_batch(self, QueueUrl, Entries):
+        size = sum(len(entry['MessageBody'].encode('utf-8')) for entry in Entries)
+        with self.lock:
+            self.calls.append((len(Entries), size))
+            first = len(self.calls) == 1
+        if size > MAX_BATCH_BYTES:
+            raise ClientError({'Error': {'Code': 'AWS.SimpleQueueService.BatchRequestTooLong'}},
+                              'SendMessageBatch')
+        if first:
+            raise ClientError({'Error': {'Code': 'InternalError'}}, 'SendMessageBatch')
+        return {'Successful': [{'Id': entry['Id'], 'MessageId': entry['MessageBody'][:8]}
+                               for entry in Entries]}
+
+
+def test_retried_messages_are_batched_within_the_byte_limit():
+    sqs = FakeSQS()
+    bodies = [f'{n:08d}' + 'x' * (100 * 1024) for n in range(5)]
+
+    with BatchProducer(sqs, 'queue-url', linger=0.01, senders=1) as producer:
+        futures = [producer.send(body) for body in bodies]
+        message_ids = [future.result(timeout=10) for future in futures]
+
+    assert message_ids == [body[:8] for body in bodies]
+    assert sqs.calls[0][0] == 2  # the failed batch, retried ahead of newer messages
+    assert all(size <= MAX_BATCH_BYTES for _, size in sqs.calls)
+    assert producer.stats['retried'] == 2
+    assert producer.stats['failed'] == 0
+
+
+def test_binary_attributes_count_towards_the_size():
+    attributes = {
+        'checksum': {'DataType': 'Binary', 'BinaryValue': b'\x00' * 32},
+        'source': {'DataType': 'String', 'StringValue': 'crawler'},
+    }
+
+    pending = _Pending('body', attributes, Future())
+    assert pending.size == len('body') + len('checksum') + len('Binary') + 32 \
+        + len('source') + len('String') + len('crawler')